@@ -1,14 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional, Tuple
+from app.core.metrics import CONTENT_TYPE, PHASE_SECONDS, metrics
 from app.services.changelog_generator import ChangelogGenerator
-from app.models.changelog import ChangelogEntry
-from app.db.session import get_db
+from app.services.changelog_search import changelog_search, match_expression
+from app.services.commit_cache import commit_cache
+from app.services.commit_index import commit_index
+from app.services.github_http import github_http
+from app.services.rate_limiter import rate_limiter
+from app.services.job_queue import job_queue
+from app.services.llm_cache import llm_cache
+from app.models.changelog import ChangelogCommit, ChangelogEntry, ChangelogJob, commit_rows, headline_values
+from app.db.session import SessionLocal, get_async_db
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
+import base64
 import json
 from app.exceptions import ChangelogError
-from sqlalchemy import desc
+from sqlalchemy import and_, desc, or_, select
 
 router = APIRouter()
 api_router = router
@@ -16,19 +28,92 @@ api_router = router
 class GenerateChangelogRequest(BaseModel):
     repository: str
     commit_shas: List[str]
+    bypass_cache: bool = False
+
+class GenerateFromCompareRequest(BaseModel):
+    repository: str
+    base: str  # Tag, branch or SHA
+    head: str
+    bypass_cache: bool = False
 
 class GetCommitsByDateRequest(BaseModel):
     repository: str
     start_date: str
     end_date: str
+
+def get_generator(request: Request) -> ChangelogGenerator:
+    """The application-scoped generator created in the lifespan handler"""
+    return request.app.state.generator
+
+def _new_changelog(repository: str, changelog_data: dict) -> ChangelogEntry:
+    return ChangelogEntry(
+        repository=repository,
+        version="",  # TODO: Implement versioning
+        changes=json.dumps(changelog_data),
+        author="",  # TODO: Implement author tracking
+        status="generated",
+        date=datetime.utcnow(),
+        commits=commit_rows(changelog_data),
+        **headline_values(changelog_data)
+    )
+
+def _save_changelog(db: Session, repository: str, changelog_data: dict) -> ChangelogEntry:
+    """Create a new changelog entry in the database"""
+    changelog_entry = _new_changelog(repository, changelog_data)
+    
+    with PHASE_SECONDS.time(phase="db_commit"):
+        db.add(changelog_entry)
+        db.flush()
+        changelog_search.index(db, changelog_entry.id, repository, changelog_data)
+        db.commit()
+    db.refresh(changelog_entry)
+    return changelog_entry
+
+async def _save_changelog_async(db: AsyncSession, repository: str, changelog_data: dict) -> ChangelogEntry:
+    """_save_changelog on the async engine"""
+    changelog_entry = _new_changelog(repository, changelog_data)
+
+    with PHASE_SECONDS.time(phase="db_commit"):
+        db.add(changelog_entry)
+        await db.flush()
+        await changelog_search.index_async(db, changelog_entry.id, repository, changelog_data)
+        await db.commit()
+    await db.refresh(changelog_entry)
+    return changelog_entry
+
+def _generated_changelog(changelog_entry: ChangelogEntry, changelog_data: dict) -> dict:
+    """Format a freshly generated changelog to match the ViewChangelogs format"""
+    return {
+        "id": changelog_entry.id,
+        "repository": changelog_entry.repository,
+        "version": changelog_entry.version,
+        "author": changelog_entry.author,
+        "status": changelog_entry.status,
+        "date": changelog_entry.date.strftime("%b %d, %Y"),
+        "type": changelog_data.get("type", "Unknown"),
+        "description": changelog_data.get("description", "No description available"),
+        "impact": changelog_data.get("impact", "No impact details"),
+        "commit_count": changelog_data.get("commit_count", 0),
+        "commits": [
+            {
+                "sha": commit["sha"][:7],  # Shorten SHA to 7 characters
+                "message": commit["message"],
+                "url": commit["url"]
+            }
+            for commit in changelog_data.get("commits", [])
+        ]
+    }
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
     
 @router.get("/changelog/{changelog_id}", tags=["changelog"])
-def get_changelog(changelog_id: int, db: Session = Depends(get_db)):
+async def get_changelog(changelog_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Get a specific changelog by ID.
     """
     try:
-        changelog = db.query(ChangelogEntry).filter(ChangelogEntry.id == changelog_id).first()
+        changelog = await db.get(ChangelogEntry, changelog_id)
         if not changelog:
             raise HTTPException(
                 status_code=404,
@@ -44,7 +129,7 @@ def get_changelog(changelog_id: int, db: Session = Depends(get_db)):
                 "id": changelog.id,
                 "repository": changelog.repository,
                 "version": changelog.version,
-                "changes": json.loads(changelog.changes),
+                "changes": json.loads(changelog.changes) if changelog.changes else None,
                 "author": changelog.author,
                 "status": changelog.status,
                 "date": changelog.date.isoformat()
@@ -61,26 +146,32 @@ def get_changelog(changelog_id: int, db: Session = Depends(get_db)):
         )
 
 @router.post("/commits", tags=["changelog"])
-def get_commits_by_date(
+async def get_commits_by_date(
     request: GetCommitsByDateRequest,
-    db: Session = Depends(get_db)
+    generator: ChangelogGenerator = Depends(get_generator)
 ):
     """
     Get commit SHAs within a specified date range.
+
+    Served from the local commit index; only commits newer than the repository's
+    sync watermark (or outside the range indexed so far) are fetched upstream.
+    The body is streamed as SHAs arrive, so listed commits come first and the rest
+    of the range follows from the index; `success` is sent last and is false, with
+    an `error`, if listing fails part way.
     """
+    shas = generator.iter_shas_by_date_range(request.repository, request.start_date, request.end_date)
     try:
-        generator = ChangelogGenerator()
-        # First get the SHAs from the date range
-        shas = generator.fetch_shas_by_date_range(
-            request.repository,
-            request.start_date,
-            request.end_date
+        # Invalid input and a failing first page are still reported with a status code
+        first = await run_in_threadpool(next, shas, None)
+    except ChangelogError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": e.message,
+                "type": e.error_type,
+                "details": e.details
+            }
         )
-        
-        return {
-            "success": True,
-            "shas": shas
-        }
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -90,67 +181,48 @@ def get_commits_by_date(
             }
         )
 
+    def body():
+        yield '{"shas": ['
+        error = None
+        if first is not None:
+            yield json.dumps(first)
+            try:
+                for sha in shas:
+                    yield ", " + json.dumps(sha)
+            except ChangelogError as e:
+                error = {"error": e.message, "type": e.error_type, "details": e.details}
+            except Exception as e:
+                error = {"error": str(e), "type": "GenerationError"}
+        if error is not None:
+            yield '], "success": false, "error": ' + json.dumps(error, default=str) + '}'
+        else:
+            yield '], "success": true}'
+
+    return StreamingResponse(body(), media_type="application/json")
+
 @router.post("/generate", tags=["changelog"])
-def generate_changelog(
+async def generate_changelog(
     request: GenerateChangelogRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    generator: ChangelogGenerator = Depends(get_generator)
 ):
     """
     Generate a changelog summary for specific commits.
     """
     try:
-        generator = ChangelogGenerator()
-        changelog_data = generator.generate_from_shas(
+        # Generation makes blocking GitHub and Anthropic calls
+        changelog_data = await run_in_threadpool(
+            generator.generate_from_shas,
             request.repository,
-            request.commit_shas
+            request.commit_shas,
+            use_cache=not request.bypass_cache
         )
 
-        # Create a new changelog entry in the database
-        changelog_entry = ChangelogEntry(
-            repository=request.repository,
-            version="",  # TODO: Implement versioning
-            changes=json.dumps(changelog_data),
-            author="",  # TODO: Implement author tracking
-            status="generated",
-            date=datetime.utcnow()
-        )
-        
-        db.add(changelog_entry)
-        db.commit()
-        db.refresh(changelog_entry)
-        
-        # Format the changelog data to match ViewChangelogs format
-        formatted_changelog = {
-            "type": changelog_data.get("type", "Unknown"),
-            "date": changelog_entry.date.strftime("%b %d, %Y"),
-            "description": changelog_data.get("description", "No description available"),
-            "impact": changelog_data.get("impact", "No impact details"),
-            "commit_count": changelog_data.get("commit_count", 0),
-            "commits": [
-                {
-                    "sha": commit["sha"][:7],  # Shorten SHA to 7 characters
-                    "message": commit["message"],
-                    "url": commit["url"]
-                }
-                for commit in changelog_data.get("commits", [])
-            ]
-        }
+        changelog_entry = await _save_changelog_async(db, request.repository, changelog_data)
 
         return {
             "success": True,
-            "changelog": {
-                "id": changelog_entry.id,
-                "repository": changelog_entry.repository,
-                "version": changelog_entry.version,
-                "author": changelog_entry.author,
-                "status": changelog_entry.status,
-                "date": formatted_changelog["date"],
-                "type": formatted_changelog["type"],
-                "description": formatted_changelog["description"],
-                "impact": formatted_changelog["impact"],
-                "commit_count": formatted_changelog["commit_count"],
-                "commits": formatted_changelog["commits"]
-            }
+            "changelog": _generated_changelog(changelog_entry, changelog_data)
         }
     except ChangelogError as e:
         # Handle ChangelogError specifically
@@ -172,23 +244,253 @@ def generate_changelog(
             }
         )
 
-@router.get("/changelogs", tags=["changelog"])
-def get_changelogs(
-    db: Session = Depends(get_db)
+@router.post("/generate/compare", tags=["changelog"])
+async def generate_changelog_from_compare(
+    request: GenerateFromCompareRequest,
+    db: AsyncSession = Depends(get_async_db),
+    generator: ChangelogGenerator = Depends(get_generator)
 ):
     """
-    Get all generated changelogs.
+    Generate a changelog summary for all commits between two refs (e.g. tag to tag).
     """
     try:
-        print("Fetching changelogs from database")
-        changelogs = db.query(ChangelogEntry).order_by(desc(ChangelogEntry.date)).all()
-        print(f"Found {len(changelogs)} changelogs")
-        
-        if not changelogs:
-            return {
-                "success": True,
-                "changelogs": []
+        changelog_data = await run_in_threadpool(
+            generator.generate_from_compare,
+            request.repository,
+            request.base,
+            request.head,
+            use_cache=not request.bypass_cache
+        )
+
+        changelog_entry = await _save_changelog_async(db, request.repository, changelog_data)
+
+        return {
+            "success": True,
+            "changelog": _generated_changelog(changelog_entry, changelog_data)
+        }
+    except ChangelogError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": e.message,
+                "type": e.error_type,
+                "details": e.details
+            }
+        )
+    except Exception as e:
+        print(f"Unexpected error generating changelog: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": str(e),
+                "type": "GenerationError"
+            }
+        )
+
+@router.post("/generate/stream", tags=["changelog"])
+def generate_changelog_stream(
+    request: GenerateChangelogRequest,
+    generator: ChangelogGenerator = Depends(get_generator)
+):
+    """
+    Generate a changelog summary as a server-sent event stream.
+
+    Emits `progress` events while commits are fetched, `token` events with Claude's
+    output as it arrives, then `done` with the stored changelog (or `error`).
+    """
+    def event_stream():
+        # The request-scoped session is closed before a streaming body is sent
+        db = SessionLocal()
+        try:
+            for event in generator.stream_from_shas(
+                request.repository,
+                request.commit_shas,
+                use_cache=not request.bypass_cache
+            ):
+                if event["event"] == "changelog":
+                    changelog_entry = _save_changelog(db, request.repository, event["data"])
+                    yield _sse("done", {
+                        "success": True,
+                        "changelog": _generated_changelog(changelog_entry, event["data"])
+                    })
+                else:
+                    yield _sse(event["event"], event["data"])
+        except ChangelogError as e:
+            yield _sse("error", {
+                "error": e.message,
+                "type": e.error_type,
+                "details": e.details
+            })
+        except Exception as e:
+            print(f"Unexpected error generating changelog: {str(e)}")
+            yield _sse("error", {
+                "error": str(e),
+                "type": "GenerationError"
+            })
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+def _job_status(changelog_entry: ChangelogEntry, job: ChangelogJob) -> dict:
+    return {
+        "id": changelog_entry.id,
+        "repository": changelog_entry.repository,
+        "status": changelog_entry.status,
+        "attempts": job.attempts,
+        "error": json.loads(job.error) if job.error else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
+
+async def _get_job(db: AsyncSession, job_id: int):
+    row = (await db.execute(
+        select(ChangelogEntry, ChangelogJob).join(
+            ChangelogJob, ChangelogJob.entry_id == ChangelogEntry.id
+        ).where(ChangelogEntry.id == job_id)
+    )).first()
+    if not row:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": "Job not found",
+                "type": "NotFound"
+            }
+        )
+    return row
+
+@router.post("/jobs", tags=["jobs"], status_code=202)
+async def submit_changelog_job(request: GenerateChangelogRequest):
+    """
+    Queue changelog generation for specific commits and return immediately.
+    Poll /jobs/{job_id} for status and fetch /jobs/{job_id}/result when generated.
+    """
+    changelog_entry = await job_queue.submit_async(
+        request.repository,
+        request.commit_shas,
+        use_cache=not request.bypass_cache
+    )
+    return {
+        "success": True,
+        "job": {
+            "id": changelog_entry.id,
+            "repository": changelog_entry.repository,
+            "status": changelog_entry.status
+        }
+    }
+
+@router.get("/jobs/{job_id}", tags=["jobs"])
+async def get_changelog_job(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get the status of a queued changelog generation job.
+    """
+    changelog_entry, job = await _get_job(db, job_id)
+    return {
+        "success": True,
+        "job": _job_status(changelog_entry, job)
+    }
+
+@router.get("/jobs/{job_id}/result", tags=["jobs"])
+async def get_changelog_job_result(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get the changelog produced by a finished job.
+    """
+    changelog_entry, job = await _get_job(db, job_id)
+    if changelog_entry.status == "failed":
+        error = json.loads(job.error) if job.error else {"error": "Job failed", "type": "GenerationError"}
+        raise HTTPException(status_code=400, detail=error)
+    if not changelog_entry.changes:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "error": f"Job is {changelog_entry.status}",
+                "type": "NotReady",
+                "job": _job_status(changelog_entry, job)
+            }
+        )
+
+    return {
+        "success": True,
+        "changelog": _generated_changelog(changelog_entry, json.loads(changelog_entry.changes))
+    }
+
+def _encode_cursor(date: datetime, entry_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{date.isoformat()}|{entry_id}".encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        date, entry_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(date), int(entry_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "Invalid cursor",
+                "type": "InvalidCursor"
             }
+        )
+
+# Columns of the listing projection; `changes` is only loaded on request
+CHANGELOG_SUMMARY_COLUMNS = (
+    ChangelogEntry.id,
+    ChangelogEntry.repository,
+    ChangelogEntry.version,
+    ChangelogEntry.author,
+    ChangelogEntry.status,
+    ChangelogEntry.date,
+    ChangelogEntry.change_type,
+    ChangelogEntry.description,
+    ChangelogEntry.impact,
+    ChangelogEntry.commit_count
+)
+
+@router.get("/changelogs", tags=["changelog"])
+async def get_changelogs(
+    repository: Optional[str] = None,
+    status: Optional[str] = None,
+    change_type: Optional[str] = Query(None, alias="type"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    include_changes: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get generated changelogs, newest first, one page at a time.
+
+    Pages are keyed on (date, id): pass the returned `next_cursor` to get the next
+    page. Filters on repository, status and type are each served by a composite
+    index. `changes` holds the headline fields (type, description, impact,
+    commit_count) unless include_changes is set, in which case the full stored
+    changelog is returned.
+    """
+    try:
+        columns = CHANGELOG_SUMMARY_COLUMNS + ((ChangelogEntry.changes,) if include_changes else ())
+        query = select(*columns)
+        if repository:
+            query = query.where(ChangelogEntry.repository == repository)
+        if status:
+            query = query.where(ChangelogEntry.status == status)
+        if change_type:
+            query = query.where(ChangelogEntry.change_type == change_type)
+        if cursor:
+            cursor_date, cursor_id = _decode_cursor(cursor)
+            query = query.where(or_(
+                ChangelogEntry.date < cursor_date,
+                and_(ChangelogEntry.date == cursor_date, ChangelogEntry.id < cursor_id)
+            ))
+
+        rows = (await db.execute(
+            query.order_by(desc(ChangelogEntry.date), desc(ChangelogEntry.id)).limit(limit + 1)
+        )).all()
+        next_cursor = _encode_cursor(rows[limit - 1].date, rows[limit - 1].id) if len(rows) > limit else None
 
         return {
             "success": True,
@@ -197,14 +499,17 @@ def get_changelogs(
                     "id": changelog.id,
                     "repository": changelog.repository,
                     "version": changelog.version,
-                    "changes": json.loads(changelog.changes),
+                    "changes": _listed_changes(changelog, include_changes),
                     "author": changelog.author,
                     "status": changelog.status,
-                    "date": changelog.date.isoformat()
+                    "date": changelog.date.isoformat() if changelog.date else None
                 }
-                for changelog in changelogs
-            ]
+                for changelog in rows[:limit]
+            ],
+            "next_cursor": next_cursor
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching changelogs: {str(e)}")
         raise HTTPException(
@@ -213,8 +518,7 @@ def get_changelogs(
                 "error": str(e),
                 "type": "DatabaseError"
             }
-        )
-        
+        )        
         # Add error details if available
         if error_data['details'].get('errors'):
             for error in error_data['details']['errors']:
@@ -241,13 +545,186 @@ def get_changelogs(
             detail=error_data
         )
 
+def _listed_changes(changelog, include_changes: bool) -> Optional[dict]:
+    if include_changes:
+        return json.loads(changelog.changes) if changelog.changes else None
+    if changelog.description is None:
+        # Queued, running or failed entries have no changelog yet
+        return None
+    return {
+        "type": changelog.change_type,
+        "description": changelog.description,
+        "impact": changelog.impact,
+        "commit_count": changelog.commit_count
+    }
+
+@router.get("/commits/{sha}/changelogs", tags=["changelog"])
+async def get_changelogs_for_commit(
+    sha: str,
+    repository: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get the changelogs that include a commit, newest first, one page at a time.
+    Accepts a full SHA or a prefix of at least 7 characters. Pages are keyed on
+    (date, id) as in GET /changelogs: pass the returned `next_cursor` to continue.
+    """
+    sha = sha.lower()
+    if len(sha) < 7 or len(sha) > 40 or any(c not in "0123456789abcdef" for c in sha):
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "Expected a commit SHA or a prefix of at least 7 hexadecimal characters",
+                "type": "InvalidSha"
+            }
+        )
+    try:
+        if len(sha) == 40:
+            sha_filter = ChangelogCommit.sha == sha
+        else:
+            # Range on the sha index rather than LIKE, which SQLite will not index
+            sha_filter = and_(ChangelogCommit.sha >= sha, ChangelogCommit.sha < sha + "g")
+        query = select(*CHANGELOG_SUMMARY_COLUMNS).join(
+            ChangelogCommit, ChangelogCommit.entry_id == ChangelogEntry.id
+        ).where(sha_filter)
+        if repository:
+            query = query.where(ChangelogEntry.repository == repository)
+        if cursor:
+            cursor_date, cursor_id = _decode_cursor(cursor)
+            query = query.where(or_(
+                ChangelogEntry.date < cursor_date,
+                and_(ChangelogEntry.date == cursor_date, ChangelogEntry.id < cursor_id)
+            ))
+        rows = (await db.execute(
+            query.distinct().order_by(desc(ChangelogEntry.date), desc(ChangelogEntry.id)).limit(limit + 1)
+        )).all()
+        next_cursor = _encode_cursor(rows[limit - 1].date, rows[limit - 1].id) if len(rows) > limit else None
+
+        return {
+            "success": True,
+            "changelogs": [
+                {
+                    "id": changelog.id,
+                    "repository": changelog.repository,
+                    "version": changelog.version,
+                    "changes": _listed_changes(changelog, False),
+                    "author": changelog.author,
+                    "status": changelog.status,
+                    "date": changelog.date.isoformat() if changelog.date else None
+                }
+                for changelog in rows[:limit]
+            ],
+            "next_cursor": next_cursor
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": str(e),
+                "type": "DatabaseError"
+            }
+        )
+
+@router.get("/changelogs/search", tags=["changelog"])
+async def search_changelogs(
+    q: str = Query(..., min_length=1, max_length=500),
+    repository: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Full-text search over generated changelogs, best match first.
+
+    Matches type, description, impact, repository and commit messages; every word
+    in `q` must appear and the last one may be a prefix. Each result carries a
+    `snippet` with matches wrapped in <mark> and its bm25 `score` (lower ranks
+    higher). Pass the returned `next_offset` to get the next page.
+    """
+    if not changelog_search.available(db.bind):
+        raise HTTPException(
+            status_code=501,
+            detail={
+                "error": "Search requires an SQLite database with FTS5",
+                "type": "SearchUnavailable"
+            }
+        )
+    match = match_expression(q)
+    if match is None:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "Search query has no words to match",
+                "type": "InvalidQuery"
+            }
+        )
+    try:
+        rows = (await db.execute(
+            changelog_search.query(match, repository).limit(limit + 1).offset(offset)
+        )).all()
+
+        return {
+            "success": True,
+            "changelogs": [
+                {
+                    "id": changelog.id,
+                    "repository": changelog.repository,
+                    "version": changelog.version,
+                    "changes": _listed_changes(changelog, False),
+                    "author": changelog.author,
+                    "status": changelog.status,
+                    "date": changelog.date.isoformat() if changelog.date else None,
+                    "snippet": changelog.snippet,
+                    "score": changelog.score
+                }
+                for changelog in rows[:limit]
+            ],
+            "next_offset": offset + limit if len(rows) > limit else None
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": str(e),
+                "type": "DatabaseError"
+            }
+        )
+
+@router.get("/changelogs/repositories", tags=["changelog"])
+async def get_changelog_repositories(db: AsyncSession = Depends(get_async_db)):
+    """
+    Get the distinct repositories that have changelogs.
+    """
+    try:
+        rows = (await db.execute(
+            select(ChangelogEntry.repository).distinct().order_by(ChangelogEntry.repository)
+        )).all()
+        return {
+            "success": True,
+            "repositories": [repository for (repository,) in rows if repository]
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": str(e),
+                "type": "DatabaseError"
+            }
+        )
+
 @router.get("/entries", tags=["changelog"])
-async def get_changelog_entries(db: Session = Depends(get_db)):
+async def get_changelog_entries(db: AsyncSession = Depends(get_async_db)):
     """
     Get all published changelog entries.
     """
     try:
-        entries = db.query(ChangelogEntry).filter(ChangelogEntry.status == "published").all()
+        entries = (await db.execute(
+            select(ChangelogEntry).where(ChangelogEntry.status == "published")
+        )).scalars().all()
         return {"entries": entries}
     except Exception as e:
         raise HTTPException(
@@ -257,3 +734,50 @@ async def get_changelog_entries(db: Session = Depends(get_db)):
                 "type": type(e).__name__
             }
         )
+
+@router.get("/cache/stats", tags=["cache"])
+def get_cache_stats():
+    """
+    Get hit/miss counters for the commit and LLM response caches, commit index sync counts
+    and how many GitHub requests were answered with 304 Not Modified.
+    """
+    return {
+        "success": True,
+        "commit_cache": commit_cache.stats(),
+        "commit_index": commit_index.stats(),
+        "github_http": github_http.stats(),
+        "github_rate_limit": rate_limiter.stats(),
+        "llm_cache": llm_cache.stats()
+    }
+
+def _cache_metrics():
+    """Cache counters kept by the services themselves, read at scrape time"""
+    caches = {
+        "commit": commit_cache.stats(),
+        "llm": llm_cache.stats()
+    }
+    http = github_http.stats()
+    # A 304 revalidation is the GitHub response cache's hit
+    caches["github_http"] = {
+        "hits": http["not_modified"],
+        "misses": http["requests"] - http["not_modified"],
+        "hit_ratio": http["not_modified_ratio"]
+    }
+    return [
+        ("changelog_cache_hits_total", "counter", "Cache lookups answered from the cache",
+         [({"cache": name}, stats["hits"]) for name, stats in caches.items()]),
+        ("changelog_cache_misses_total", "counter", "Cache lookups that had to go upstream",
+         [({"cache": name}, stats["misses"]) for name, stats in caches.items()]),
+        ("changelog_cache_hit_ratio", "gauge", "Hits over lookups since the process started",
+         [({"cache": name}, stats["hit_ratio"]) for name, stats in caches.items()])
+    ]
+
+metrics.register_collector(_cache_metrics)
+
+@router.get("/metrics", tags=["metrics"], response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Phase latencies, Claude token usage, GitHub requests and rate limit, and cache
+    hit ratios in the Prometheus text exposition format.
+    """
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Changelog Generator"
@@ -7,16 +7,95 @@ class Settings(BaseSettings):
     
     # Anthropic
     ANTHROPIC_API_KEY: str
+    ANTHROPIC_BASE_URL: Optional[str] = None  # Defaults to the public API
     MAX_TOKENS_PER_REQUEST: int = 10000
-    MAX_CHANGES_PER_FILE: int = 5
+    MAX_CHANGES_PER_FILE: int = 40  # Changed lines kept per file; the prompt budget decides how many are sent
+    DIFF_MAX_SCAN_LINES: int = 5000  # Patch lines parsed per file; huge generated diffs stop early
+    COMMIT_MAX_FILES: int = 300  # Files summarized per commit; the rest are counted in one aggregate line
+    COMMIT_PRECLASSIFY_ENABLED: bool = True  # Collapse dependency bumps, merges and chores into aggregate lines
+    COMMIT_CLUSTERING_ENABLED: bool = True  # Cancel revert pairs and fold duplicates and follow-ups into one prompt unit
+    COMMIT_MAX_FILE_PAGES: int = 10  # Pages of a commit's file list fetched from GitHub (up to 300 files each)
+    PROMPT_INPUT_TOKEN_BUDGET: int = 24000
+    CLAUDE_SHARDING_ENABLED: bool = True
+    CLAUDE_SHARD_MAX_INPUT_TOKENS: int = 20000
+    CLAUDE_SHARD_CONCURRENCY: int = 4
+    ANTHROPIC_MAX_CONNECTIONS: int = 20
+    ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    ANTHROPIC_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    ANTHROPIC_TIMEOUT_SECONDS: float = 600.0
     
     # GitHub
     GITHUB_CLIENT_ID: str
     GITHUB_CLIENT_SECRET: str
     GITHUB_TOKEN: str
+    GITHUB_API_URL: str = "https://api.github.com"  # GitHub Enterprise or a local stand-in
+    GITHUB_FETCH_CONCURRENCY: int = 8
+    GITHUB_HTTP_POOL_CONNECTIONS: int = 4  # Hosts kept in the connection pool
+    GITHUB_HTTP_POOL_MAXSIZE: int = 16  # Keep-alive connections per host; at least GITHUB_FETCH_CONCURRENCY
+    GITHUB_HTTP_TIMEOUT_SECONDS: float = 30.0
+    REPOSITORY_CACHE_TTL_SECONDS: int = 3600
+    REPOSITORY_NEGATIVE_CACHE_TTL_SECONDS: int = 300
+    COMMIT_NEGATIVE_CACHE_TTL_SECONDS: int = 300  # Missing SHAs may still be pushed later
+    REPOSITORY_CACHE_MAX_ENTRIES: int = 1024
+    
+    # Commit index for date-range queries
+    COMMIT_INDEX_ENABLED: bool = True
+    COMMIT_INDEX_OVERLAP_SECONDS: int = 24 * 3600  # Re-listed before the watermark to catch late-arriving commits
+    COMMIT_INDEX_MIN_SYNC_SECONDS: int = 60
+    
+    # Commit sources: "github" (REST API) or "git" (local mirror clone)
+    COMMIT_SOURCE: str = "github"
+    COMMIT_SOURCE_OVERRIDES: Dict[str, str] = {}  # Per-repository source, e.g. {"owner/repo": "git"}
+    GIT_MIRROR_ROOT: str = "./mirrors"
+    GIT_MIRROR_URL_TEMPLATE: str = "https://github.com/{repository}.git"
+    GIT_MIRROR_REFRESH_SECONDS: int = 60
+    GIT_COMMAND_TIMEOUT_SECONDS: int = 600
     
     # Database
     SQLALCHEMY_DATABASE_URI: str = "sqlite:///./changelog.db"
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None  # Derived from SQLALCHEMY_DATABASE_URI when unset
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    
+    # Commit cache
+    COMMIT_CACHE_ENABLED: bool = True
+    COMMIT_CACHE_MAX_ENTRIES: int = 50000
+    COMMIT_CACHE_MEMORY_ENTRIES: int = 1024
+    
+    # GitHub rate-limit scheduling, shared across processes through the database
+    GITHUB_RATE_LIMIT_ENABLED: bool = True
+    GITHUB_RATE_LIMIT_RESERVE: int = 50  # Requests held back from each window
+    GITHUB_RATE_LIMIT_PACE_BELOW: int = 500  # Spread the rest of the window evenly below this many requests
+    GITHUB_RATE_LIMIT_MAX_WAIT_SECONDS: int = 300  # Longest a request waits for capacity before failing
+    GITHUB_RATE_LIMIT_SYNC_EVERY: int = 20  # Requests claimed locally between writes of the shared budget
+    GITHUB_RATE_LIMIT_SYNC_INTERVAL_SECONDS: float = 5.0  # Re-read the shared budget at least this often
+    
+    # Conditional GitHub requests (ETag / Last-Modified revalidation)
+    GITHUB_HTTP_CACHE_ENABLED: bool = True
+    GITHUB_HTTP_CACHE_MAX_ENTRIES: int = 20000
+    GITHUB_HTTP_CACHE_MEMORY_ENTRIES: int = 512
+    
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 5000
+    LLM_CACHE_MEMORY_ENTRIES: int = 256
+    
+    # Full-text search over changelogs (SQLite FTS5)
+    CHANGELOG_SEARCH_ENABLED: bool = True
+    
+    # Prometheus metrics (/metrics)
+    METRICS_ENABLED: bool = True
+    
+    # Background jobs
+    JOB_WORKER_CONCURRENCY: int = 2
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_LEASE_SECONDS: int = 120  # Renewed by a heartbeat every third of this while the job runs
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_DELAY_SECONDS: int = 30
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000"]
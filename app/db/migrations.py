@@ -0,0 +1,152 @@
+import json
+import logging
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+from app.models.changelog import Base, commit_rows, headline_values
+from app.services.changelog_search import SEARCH_TABLE, changelog_search
+
+logger = logging.getLogger(__name__)
+
+# Columns added to existing tables after their first release: {table: [(column, DDL type)]}
+ADDED_COLUMNS = {
+    "commit_cache": [
+        ("files", "TEXT"),
+        ("files_summary", "TEXT"),
+        ("format_version", "INTEGER"),
+    ],
+    "changelog_jobs": [
+        ("owner", "VARCHAR"),
+    ],
+    "changelog_entries": [
+        ("change_type", "VARCHAR"),
+        ("description", "TEXT"),
+        ("impact", "TEXT"),
+        ("commit_count", "INTEGER"),
+    ],
+}
+
+# Rows backfilled per batch when populating new columns
+BACKFILL_BATCH_SIZE = 1000
+
+
+def run_migrations(engine) -> None:
+    """Apply additive schema changes that Base.metadata.create_all cannot make to existing tables"""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+
+    with engine.begin() as connection:
+        for table, columns in ADDED_COLUMNS.items():
+            if table not in tables:
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table)}
+            for name, ddl in columns:
+                if name not in existing:
+                    logger.info(f"Adding column {table}.{name}")
+                    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+        # Indexes declared on models whose tables already existed
+        for table in Base.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    logger.info(f"Creating index {index.name}")
+                    index.create(connection)
+
+        _run_once(connection, "changelog_headlines", _backfill_changelog_headlines)
+        _run_once(connection, "changelog_commits", _backfill_changelog_commits)
+        if changelog_search.available(connection):
+            changelog_search.create(connection)
+            # A missing FTS table was just created empty and needs indexing again
+            _run_once(connection, "changelog_search", changelog_search.backfill, rerun=SEARCH_TABLE not in tables)
+
+
+def _run_once(connection, name: str, backfill, rerun: bool = False) -> None:
+    """
+    Run a backfill unless applied_migrations records it as done, then record it.
+
+    Backfills stay idempotent, so workers starting together may both run one; the
+    marker insert is conditional and never conflicts.
+    """
+    if not rerun and connection.execute(
+        text("SELECT 1 FROM applied_migrations WHERE name = :name"), {"name": name}
+    ).first():
+        return
+    backfill(connection)
+    connection.execute(text(
+        "INSERT INTO applied_migrations (name, applied_at) SELECT :name, :now "
+        "WHERE NOT EXISTS (SELECT 1 FROM applied_migrations WHERE name = :name)"
+    ), {"name": name, "now": datetime.utcnow()})
+
+
+def _backfill_changelog_headlines(connection) -> None:
+    """Copy headline fields out of the `changes` JSON of entries stored before they had columns"""
+    total = 0
+    last_id = 0
+    while True:
+        rows = connection.execute(text(
+            "SELECT id, changes FROM changelog_entries "
+            "WHERE id > :last_id AND description IS NULL AND changes IS NOT NULL ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        updates = []
+        for entry_id, changes in rows:
+            try:
+                changelog_data = json.loads(changes)
+            except ValueError:
+                changelog_data = {}
+            if not isinstance(changelog_data, dict):
+                changelog_data = {}
+            updates.append(dict(headline_values(changelog_data), id=entry_id))
+        connection.execute(text(
+            "UPDATE changelog_entries SET change_type = :change_type, description = :description, "
+            "impact = :impact, commit_count = :commit_count WHERE id = :id"
+        ), updates)
+        total += len(rows)
+
+    if total:
+        logger.info(f"Backfilled headline fields for {total} changelog entries")
+
+
+def _backfill_changelog_commits(connection) -> None:
+    """Populate changelog_commits for entries stored before commits had their own table"""
+    total = 0
+    last_id = 0
+    while True:
+        rows = connection.execute(text(
+            "SELECT id, changes FROM changelog_entries "
+            "WHERE id > :last_id AND changes IS NOT NULL AND commit_count > 0 AND NOT EXISTS ("
+            "SELECT 1 FROM changelog_commits WHERE changelog_commits.entry_id = changelog_entries.id"
+            ") ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        inserts = []
+        for entry_id, changes in rows:
+            try:
+                changelog_data = json.loads(changes)
+            except ValueError:
+                continue
+            if not isinstance(changelog_data, dict):
+                continue
+            inserts.extend(
+                {"entry_id": entry_id, "position": row.position, "sha": row.sha, "message": row.message, "url": row.url}
+                for row in commit_rows(changelog_data)
+            )
+        if inserts:
+            connection.execute(text(
+                "INSERT INTO changelog_commits (entry_id, position, sha, message, url) "
+                "VALUES (:entry_id, :position, :sha, :message, :url)"
+            ), inserts)
+        total += len(rows)
+
+    if total:
+        logger.info(f"Backfilled commits for {total} changelog entries")
@@ -1,13 +1,71 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+# Async drivers used when SQLALCHEMY_ASYNC_DATABASE_URI is not set
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+def _is_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite"
+
+def _engine_options(url) -> dict:
+    if _is_sqlite(url) and url.database in (None, "", ":memory:"):
+        # In-memory databases live on a single connection
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": True,
+    }
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    # WAL lets readers proceed while a writer commits; busy_timeout makes writers wait instead of failing
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+def async_database_url(sync_url: str) -> str:
+    """Async counterpart of a sync database URL (aiosqlite for SQLite, asyncpg for Postgres)"""
+    url = make_url(sync_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {url.get_backend_name()}; set SQLALCHEMY_ASYNC_DATABASE_URI")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+sync_url = make_url(settings.SQLALCHEMY_DATABASE_URI)
+engine = create_engine(sync_url, **_engine_options(sync_url))
+if _is_sqlite(sync_url):
+    event.listen(engine, "connect", _set_sqlite_pragmas)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_url = make_url(settings.SQLALCHEMY_ASYNC_DATABASE_URI or async_database_url(settings.SQLALCHEMY_DATABASE_URI))
+async_options = _engine_options(async_url)
+if _is_sqlite(async_url) and async_options:
+    # aiosqlite defaults to NullPool, reopening the file (and re-running the pragmas) per session
+    async_options["poolclass"] = AsyncAdaptedQueuePool
+async_engine = create_async_engine(async_url, **async_options)
+if _is_sqlite(async_url):
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
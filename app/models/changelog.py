@@ -1,11 +1,42 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 from datetime import datetime
+from typing import Any, Dict, List
 
 Base = declarative_base()
 
+def headline_values(changelog_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Headline fields of a changelog, stored in their own columns so listings never parse `changes`"""
+    return {
+        "change_type": changelog_data.get("type"),
+        "description": changelog_data.get("description") or "",
+        "impact": changelog_data.get("impact"),
+        "commit_count": changelog_data.get("commit_count")
+    }
+
+def commit_rows(changelog_data: Dict[str, Any]) -> List["ChangelogCommit"]:
+    """Child rows for the commits listed in a changelog, in order"""
+    return [
+        ChangelogCommit(
+            position=position,
+            sha=(commit.get("sha") or "").lower(),
+            message=commit.get("message"),
+            url=commit.get("url")
+        )
+        for position, commit in enumerate(changelog_data.get("commits") or [])
+        if isinstance(commit, dict)
+    ]
+
 class ChangelogEntry(Base):
     __tablename__ = "changelog_entries"
+    __table_args__ = (
+        # Keyset pagination on (date, id), optionally filtered by repository or status
+        Index("ix_changelog_entries_date_id", "date", "id"),
+        Index("ix_changelog_entries_repository_date_id", "repository", "date", "id"),
+        Index("ix_changelog_entries_status_date_id", "status", "date", "id"),
+        Index("ix_changelog_entries_change_type_date_id", "change_type", "date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     repository = Column(String, index=True)
@@ -13,7 +44,150 @@ class ChangelogEntry(Base):
     date = Column(DateTime, default=datetime.utcnow)
     changes = Column(Text)
     author = Column(String)
-    status = Column(String)  # "draft", "published", "archived"
+    status = Column(String)  # "queued", "running", "generated", "failed", "draft", "published", "archived"
+    change_type = Column(String)
+    description = Column(Text)
+    impact = Column(Text)
+    commit_count = Column(Integer)
+
+    commits = relationship(
+        "ChangelogCommit",
+        order_by="ChangelogCommit.position",
+        cascade="all, delete-orphan"
+    )
 
     def __repr__(self):
         return f"<ChangelogEntry {self.version} for {self.repository}>"
+
+class ChangelogCommit(Base):
+    __tablename__ = "changelog_commits"
+
+    entry_id = Column(Integer, ForeignKey("changelog_entries.id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    sha = Column(String(40), index=True)
+    message = Column(Text)
+    url = Column(String)
+
+    def __repr__(self):
+        return f"<ChangelogCommit {self.sha[:7]} in {self.entry_id}>"
+
+class ChangelogJob(Base):
+    __tablename__ = "changelog_jobs"
+
+    entry_id = Column(Integer, ForeignKey("changelog_entries.id"), primary_key=True)
+    repository = Column(String)
+    commit_shas = Column(Text)  # JSON list of SHAs
+    use_cache = Column(Boolean, default=True)
+    attempts = Column(Integer, default=0)
+    error = Column(Text)  # JSON error details of the last failed attempt
+    lease_token = Column(String)
+    leased_until = Column(DateTime, index=True)
+    owner = Column(String)  # host:pid of the worker holding the lease
+    available_at = Column(DateTime, default=datetime.utcnow, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<ChangelogJob {self.entry_id} for {self.repository}>"
+
+class CachedCommit(Base):
+    __tablename__ = "commit_cache"
+
+    repository = Column(String, primary_key=True)
+    sha = Column(String(40), primary_key=True)
+    url = Column(String)
+    github_url = Column(String)
+    message = Column(Text)
+    author = Column(String)
+    date = Column(String)
+    changes_summary = Column(Text)
+    truncated_diff = Column(Text)
+    files = Column(Text)  # JSON list of per-file changes
+    files_summary = Column(Text)  # Aggregate line for commits with more files than were summarized
+    format_version = Column(Integer)  # COMMIT_FORMAT_VERSION the row was processed with
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_accessed = Column(DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<CachedCommit {self.sha[:7]} for {self.repository}>"
+
+class CachedLLMResponse(Base):
+    __tablename__ = "llm_response_cache"
+
+    key = Column(String(64), primary_key=True)
+    model = Column(String)
+    response = Column(Text)
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    last_accessed = Column(DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<CachedLLMResponse {self.key[:12]} for {self.model}>"
+
+class IndexedCommit(Base):
+    __tablename__ = "commit_index"
+    __table_args__ = (
+        Index("ix_commit_index_repository_committed_at", "repository", "committed_at"),
+    )
+
+    repository = Column(String, primary_key=True)
+    sha = Column(String(40), primary_key=True)
+    committed_at = Column(DateTime, nullable=False)  # UTC
+    indexed_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<IndexedCommit {self.sha[:7]} for {self.repository}>"
+
+class SyncWatermark(Base):
+    __tablename__ = "sync_watermarks"
+
+    repository = Column(String, primary_key=True)
+    source = Column(String)  # Commit source the index was synced from
+    covered_since = Column(DateTime)  # The index is complete for committed dates in [covered_since, covered_until]
+    covered_until = Column(DateTime)
+    last_sha = Column(String(40))  # Newest commit seen
+    last_committed_at = Column(DateTime)
+    synced_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<SyncWatermark {self.repository} until {self.covered_until}>"
+
+class CachedHTTPResponse(Base):
+    __tablename__ = "github_http_cache"
+
+    key = Column(String(64), primary_key=True)  # Hash of URL, query parameters and credentials
+    url = Column(String)
+    etag = Column(String)
+    last_modified = Column(String)
+    headers = Column(Text)  # JSON of the response headers kept for replay (e.g. Link)
+    body = Column(Text)
+    revalidated_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_accessed = Column(DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<CachedHTTPResponse {self.url}>"
+
+class GitHubRateLimit(Base):
+    __tablename__ = "github_rate_limits"
+
+    key = Column(String(64), primary_key=True)  # Hash of the credentials the limit applies to
+    limit = Column(Integer)
+    remaining = Column(Integer)  # Requests left in the current window; None until GitHub reports it
+    reset_at = Column(DateTime)  # When the window resets (UTC)
+    next_request_at = Column(DateTime)  # Earliest time the next request may start when pacing
+    blocked_until = Column(DateTime)  # Set from Retry-After or an exhausted limit
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<GitHubRateLimit {self.key[:12]} remaining {self.remaining}>"
+
+class AppliedMigration(Base):
+    __tablename__ = "applied_migrations"
+
+    name = Column(String, primary_key=True)  # One-off data migration (backfill) that has completed
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AppliedMigration {self.name}>"
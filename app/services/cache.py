@@ -0,0 +1,95 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with hit/miss counters and optional per-entry TTL"""
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key in self._data:
+                value, expires_at = self._data[key]
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+class EvictionSchedule:
+    """
+    Decides when a size-bounded table needs an eviction pass without counting its rows on every insert.
+
+    The row count is read during a pass and then tracked from this process's own inserts. A pass is
+    due once the estimate exceeds max_entries, or after `recount_every` inserts so rows added by other
+    processes are noticed. Each pass evicts down to max_entries minus `slack` rows, so passes run at
+    most once per `slack` inserts.
+    """
+
+    def __init__(self, max_entries: int, slack_fraction: float = 0.05, recount_every: int = 1000):
+        self.max_entries = max_entries
+        self.slack = max(1, int(max_entries * slack_fraction))
+        self.recount_every = recount_every
+        self._estimate: Optional[int] = None
+        self._since_count = 0
+        self._lock = Lock()
+
+    def due(self, inserted: int = 1) -> bool:
+        with self._lock:
+            self._since_count += inserted
+            if self._estimate is None or self._since_count >= self.recount_every:
+                return True
+            self._estimate += inserted
+            return self._estimate > self.max_entries
+
+    def overflow(self, rows: int) -> int:
+        """Rows to evict from a table currently holding `rows`"""
+        return rows - (self.max_entries - self.slack) if rows > self.max_entries else 0
+
+    def counted(self, rows: int) -> None:
+        """Record the row count left after a pass"""
+        with self._lock:
+            self._estimate = rows
+            self._since_count = 0
@@ -1,33 +1,67 @@
 import anthropic
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Optional
-import requests
-import re
+from typing import Dict, Generator, Iterator, List, Optional, Tuple
 from app.exceptions import ChangelogError
-from typing_extensions import TypedDict
 import logging
 from app.core.config import settings
+from app.core.metrics import CLAUDE_REQUESTS, CLAUDE_TOKENS, PHASE_SECONDS
+from app.services.commit_cache import commit_cache
+from app.services.commit_classifier import REVERTED, commit_classifier, commit_refs
+from app.services.commit_clusterer import commit_clusterer
+from app.services.commit_data import CommitData, FileChange
+from app.services.commit_index import commit_index
+from app.services.commit_source import CommitSource
+from app.services.git_source import LocalGitCommitSource
+from app.services.github_source import GitHubCommitSource
+from app.services.llm_cache import llm_cache, prompt_cache_key
+from app.services.prompt_builder import PromptBuilder
 
 # Configure logging (moved to config)
 logger = logging.getLogger(__name__)
 
-class CommitData(TypedDict):
-    sha: str
-    github_url: str
-    changes_summary: str
-    truncated_diff: str
-
-# Initialize Claude client
-anthropic_client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-
 # Constants from config
 MAX_TOKENS_PER_REQUEST = settings.MAX_TOKENS_PER_REQUEST
-MAX_CHANGES_PER_FILE = settings.MAX_CHANGES_PER_FILE
+GITHUB_FETCH_CONCURRENCY = settings.GITHUB_FETCH_CONCURRENCY
+CLAUDE_SHARD_MAX_INPUT_TOKENS = settings.CLAUDE_SHARD_MAX_INPUT_TOKENS
+CLAUDE_SHARD_CONCURRENCY = settings.CLAUDE_SHARD_CONCURRENCY
+PROMPT_INPUT_TOKEN_BUDGET = settings.PROMPT_INPUT_TOKEN_BUDGET
+
+def _drain(iterator: Generator):
+    """Run a generator to completion and return its return value"""
+    while True:
+        try:
+            next(iterator)
+        except StopIteration as stop:
+            return stop.value
+
+def create_anthropic_client() -> anthropic.Anthropic:
+    """
+    Claude client with a bounded keep-alive connection pool.
+
+    The pool is built from the SDK's own client and limits types, so it always matches
+    the HTTP package the installed SDK was built on.
+    """
+    limits = type(anthropic.DEFAULT_CONNECTION_LIMITS)
+    return anthropic.Anthropic(
+        api_key=settings.ANTHROPIC_API_KEY,
+        base_url=settings.ANTHROPIC_BASE_URL,
+        http_client=anthropic.DefaultHttpxClient(
+            limits=limits(
+                max_connections=settings.ANTHROPIC_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.ANTHROPIC_KEEPALIVE_EXPIRY_SECONDS
+            ),
+            timeout=anthropic.Timeout(settings.ANTHROPIC_TIMEOUT_SECONDS)
+        )
+    )
 
 class ChangelogGenerator:
     def __init__(self):
         self.model = "claude-sonnet-4-20250514"
+        self.temperature = 0.1  # Lower temperature for more consistent output
         self.system_prompt = """
         You are a professional changelog generator for developer tools.
         Your task is to analyze git commits and generate a concise, user-friendly changelog.
@@ -49,263 +83,211 @@ class ChangelogGenerator:
         
         IMPORTANT: Only respond with the JSON object. Do not include any additional text or explanations.
         """
+        self.shard_system_prompt = """
+        You are a professional changelog generator for developer tools.
+        Your task is to summarize one batch of git commits from a larger release.
+        Focus on changes that would be relevant to end-users.
+        Format the output as valid JSON with the following structure:
+        {
+            "type": "string",  # e.g., "fix", "feature", "performance"
+            "description": "string",
+            "impact": "string"
+        }
+        
+        IMPORTANT: Only respond with the JSON object. Do not include any additional text or explanations.
+        """
+        self.reduce_system_prompt = """
+        You are a professional changelog generator for developer tools.
+        Your task is to merge partial changelog summaries for batches of commits
+        into one concise, user-friendly changelog entry covering the whole release.
+        Format the output as valid JSON with the following structure:
+        {
+            "type": "string",  # the dominant type, e.g., "fix", "feature", "performance"
+            "description": "string",
+            "impact": "string"
+        }
+        
+        IMPORTANT: Only respond with the JSON object. Do not include any additional text or explanations.
+        """
+        self.anthropic_client = create_anthropic_client()
         self.github_token = settings.GITHUB_TOKEN
         if not self.github_token:
             raise ValueError("GITHUB_TOKEN not found in environment variables")
+        
+        self.sources: Dict[str, CommitSource] = {
+            "github": GitHubCommitSource(self.github_token),
+            "git": LocalGitCommitSource(settings.GIT_MIRROR_ROOT, settings.GIT_MIRROR_URL_TEMPLATE)
+        }
 
-    def fetch_commit(self, repository: str, sha: str) -> CommitData:
-        """Fetch a specific commit from GitHub API with validation"""
-        try:
-            # Validate SHA format
-            if not re.match(r'^[0-9a-f]{40}$', sha):
-                raise ChangelogError(
-                    error_type="invalid_format",
-                    message=f"Invalid commit SHA format: {sha}. Please provide a full 40-character hexadecimal string.",
-                    details={
-                        "sha": sha,
-                        "expected_format": "40-character hexadecimal string",
-                        "example": "a1b2c3d4e5f6a7b8c9d0e1f2a3b4c5d6e7f8a9b0"
-                    }
-                )
-            
-            # First validate repository exists
-            repo_url = f"https://api.github.com/repos/{repository}"
-            headers = {
-                "Accept": "application/vnd.github.v3+json"
-            }
-            
-            # Add authentication if token is available
-            if self.github_token:
-                headers["Authorization"] = f"Bearer {self.github_token}"
-            
-            # Check if repository exists
-            repo_response = requests.get(repo_url, headers=headers)
-            if repo_response.status_code != 200:
-                error_data = repo_response.json()
-                error_msg = error_data.get('message', 'Unknown error')
-                raise ChangelogError(
-                    error_type="repository_not_found",
-                    message=f"Repository not found: {repository}",
-                    repository=repository,
-                    details={
-                        "error": error_msg,
-                        "status_code": repo_response.status_code
-                    }
-                )
-
-            # Get commit details with retry logic
-            commit_url = f"https://api.github.com/repos/{repository}/commits/{sha}"
-            max_retries = 3
-            retry_delay = 1  # seconds
-            
-            for attempt in range(max_retries):
-                try:
-                    commit_response = requests.get(commit_url, headers=headers)
-                    commit_response.raise_for_status()
-                    commit_data = commit_response.json()
-                    break
-                except requests.exceptions.HTTPError as e:
-                    if e.response.status_code == 404:
-                        raise ChangelogError(
-                            error_type="commit_not_found",
-                            message=f"Commit not found: {sha} in repository {repository}",
-                            sha=sha,
-                            repository=repository,
-                            details={
-                                "error": e.response.json().get('message', 'Not found'),
-                                "status_code": e.response.status_code
-                            }
-                        )
-                    elif e.response.status_code == 403:
-                        raise ChangelogError(
-                            error_type="github_rate_limit",
-                            message="GitHub API rate limit exceeded",
-                            details={
-                                "error": e.response.json().get('message', 'Rate limit exceeded'),
-                                "status_code": e.response.status_code
-                            }
-                        )
-                    else:
-                        raise ChangelogError(
-                            error_type="github_api_error",
-                            message=f"GitHub API error: {e.response.status_code}",
-                            details={
-                                "error": e.response.json().get('message', 'Unknown error'),
-                                "status_code": e.response.status_code
-                            }
-                        )
-                except requests.exceptions.RequestException as e:
-                    if attempt == max_retries - 1:  # Last attempt
-                        raise ChangelogError(
-                            error_type="network_error",
-                            message=f"Failed to fetch commit details after {max_retries} attempts",
-                            details={
-                                "error": str(e),
-                                "attempts": max_retries,
-                                "repository": repository,
-                                "sha": sha
-                            }
-                        )
-                    logger.warning(f"Attempt {attempt + 1} failed, retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
-                    continue
-                except json.JSONDecodeError as e:
-                    if attempt == max_retries - 1:  # Last attempt
-                        raise ChangelogError(
-                            error_type="invalid_response",
-                            message="Invalid response from GitHub API",
-                            details={
-                                "error": str(e),
-                                "attempts": max_retries,
-                                "repository": repository,
-                                "sha": sha
-                            }
-                        )
-                    logger.warning(f"Invalid response format, retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
-                    continue
-                except Exception as e:
-                    raise ChangelogError(
-                        error_type="unknown_error",
-                        message=f"Unexpected error fetching commit details: {str(e)}",
-                        details={
-                            "error": str(e),
-                            "repository": repository,
-                            "sha": sha
-                        }
-                    )
-            
-            # Format changes summary
-            files_changed = commit_data.get('files', [])
-            changes_summary = []
-            for file in files_changed:
-                filename = file.get('filename', '')
-                changes = []
-                if file.get('status'):
-                    changes.append(f"Status: {file['status']}")
-                if file.get('additions'):
-                    changes.append(f"Additions: {file['additions']} lines")
-                if file.get('deletions'):
-                    changes.append(f"Deletions: {file['deletions']} lines")
-                if changes:
-                    changes_summary.append(f"File: {filename} ({', '.join(changes)})")
-            
-            # Create truncated diff
-            truncated_diff = []
-            for file in files_changed:
-                filename = file.get('filename', '')
-                patch = file.get('patch', '')
-                if patch:
-                    # Split patch into chunks
-                    lines = patch.split('\n')
-                    
-                    # Find the first few changes (added/removed lines)
-                    changes = []
-                    for line in lines:
-                        if line.startswith('+') or line.startswith('-'):
-                            changes.append(line)
-                        if len(changes) >= MAX_CHANGES_PER_FILE:  # Show up to 5 changes per file
-                            break
-                    
-                    # Format the changes
-                    if changes:
-                        change_text = '\n'.join(changes)
-                        if len(changes) < len(lines):
-                            change_text += "\n... (more changes not shown)"
-                        truncated_diff.append(f"File: {filename}\n{change_text}")
-            
-            # Add both summary and truncated diff to commit data
-            commit_data["changes_summary"] = "\n".join(changes_summary) if changes_summary else "\nNo changes found\n"
-            commit_data["truncated_diff"] = "\n\n".join(truncated_diff) if truncated_diff else "\nNo diff available\n"
-            
-            return commit_data
-            
-        except Exception as e:
+    def close(self) -> None:
+        """Release pooled connections held by the Claude client"""
+        self.anthropic_client.close()
+
+    def source_for(self, repository: str) -> CommitSource:
+        """Commit source configured for a repository (COMMIT_SOURCE_OVERRIDES, else COMMIT_SOURCE)"""
+        name = settings.COMMIT_SOURCE_OVERRIDES.get(repository, settings.COMMIT_SOURCE)
+        if name not in self.sources:
             raise ChangelogError(
-                error_type="api_error",
-                message=f"Failed to fetch commit details: {str(e)}",
-                details={"sha": sha, "error": str(e)}
+                error_type="invalid_config",
+                message=f"Unknown commit source: {name}",
+                repository=repository,
+                details={"source": name, "available": sorted(self.sources)}
             )
+        return self.sources[name]
 
+    def ensure_repository(self, repository: str) -> None:
+        """
+        Validate that a repository exists.
 
+        Raises:
+            ChangelogError: If the repository does not exist or cannot be accessed
+        """
+        with PHASE_SECONDS.time(phase="repo_check"):
+            self.source_for(repository).ensure_repository(repository)
+
+    def fetch_commit(self, repository: str, sha: str) -> CommitData:
+        """Fetch a specific commit from the repository's commit source with validation"""
+        return self.source_for(repository).fetch_commit(repository, sha)
+
+    def fetch_commits(
+        self,
+        repository: str,
+        shas: List[str],
+        max_workers: Optional[int] = None,
+        use_cache: bool = True
+    ) -> List[CommitData]:
+        """
+        Fetch multiple commits concurrently, keeping results in input order.
+        Commits already in the commit cache are served without touching GitHub.
+
+        Args:
+            repository: GitHub repository in format 'owner/repo'
+            shas: List of commit SHAs to fetch
+            max_workers: Maximum number of concurrent GitHub requests (defaults to GITHUB_FETCH_CONCURRENCY)
+            use_cache: Read and store commits in the commit cache
+
+        Returns:
+            List[CommitData]: Commit data in the same order as `shas`
+
+        Raises:
+            ChangelogError: If any SHA failed to fetch; every per-SHA failure is listed in details["errors"]
+        """
+        return _drain(self.iter_fetch_commits(repository, shas, max_workers, use_cache))
+
+    def iter_fetch_commits(
+        self,
+        repository: str,
+        shas: List[str],
+        max_workers: Optional[int] = None,
+        use_cache: bool = True
+    ) -> Generator[Tuple[int, int], None, List[CommitData]]:
+        """
+        Generator form of fetch_commits.
+
+        Yields (completed, total) after the cache lookup and as each commit arrives,
+        then returns the commit data in input order.
+        """
+        if not shas:
+            return []
+
+        started = time.perf_counter()
+        cached = commit_cache.get_many(repository, shas) if use_cache else {}
+        results: List[Optional[CommitData]] = [cached.get(sha) for sha in shas]
+        pending = [index for index, commit in enumerate(results) if commit is None]
+        errors: List[ChangelogError] = []
+        failed_shas: List[str] = []
+        completed = len(shas) - len(pending)
+        yield completed, len(shas)
+
+        if pending:
+            # Validate the repository once up front instead of per SHA
+            self.ensure_repository(repository)
+
+            workers = max(1, min(max_workers or GITHUB_FETCH_CONCURRENCY, len(pending)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="commit-fetch") as executor:
+                futures = {executor.submit(self.fetch_commit, repository, shas[index]): index for index in pending}
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        results[index] = future.result()
+                    except ChangelogError as e:
+                        errors.append(e)
+                        failed_shas.append(shas[index])
+                    completed += 1
+                    yield completed, len(shas)
+
+            if use_cache:
+                commit_cache.put_many(repository, [results[index] for index in pending if results[index] is not None])
+        PHASE_SECONDS.observe(time.perf_counter() - started, phase="commit_fetch")
+
+        if errors:
+            error_types = {e.error_type for e in errors}
+            invalid_shas = [sha for sha, e in zip(failed_shas, errors) if e.error_type == "invalid_format"]
+            missing_shas = [sha for sha, e in zip(failed_shas, errors) if e.error_type == "commit_not_found"]
+
+            if error_types == {"invalid_format"}:
+                error_type, message = "invalid_format", "Some SHAs have invalid format"
+            elif error_types == {"commit_not_found"}:
+                error_type, message = "not_found", "Some SHAs were not found in the repository"
+            elif len(error_types) == 1:
+                # Shared failure such as a missing repository or rate limit
+                error_type, message = errors[0].error_type, errors[0].message
+            else:
+                error_type, message = "commit_fetch_error", f"Failed to fetch {len(errors)} of {len(shas)} commits"
+
+            raise ChangelogError(
+                error_type=error_type,
+                message=message,
+                invalid_shas=invalid_shas,
+                missing_shas=missing_shas,
+                repository=repository,
+                details={
+                    "errors": [
+                        {
+                            "sha": sha,
+                            "type": e.error_type,
+                            "message": e.message,
+                            "details": e.details
+                        }
+                        for sha, e in zip(failed_shas, errors)
+                    ]
+                }
+            )
+
+        return results
 
     def fetch_shas_by_date_range(self, repository: str, start_date: str, end_date: str) -> List[str]:
         """
         Fetch commit SHAs within a specified date range.
+
+        Answered from the local commit index; only the parts of the range the index
+        has not synced yet are listed from the commit source.
         """
+        start_dt, end_dt = self._parse_date_range(start_date, end_date)
         try:
-            # Parse dates with timezone information
-            start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            
-            # Add timezone information to make sure we capture the full day
-            start_dt = start_dt.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_dt = end_dt.replace(hour=23, minute=59, second=59, microsecond=999999)
-            
-            # Convert to timestamps
-            start_timestamp = start_dt.timestamp()
-            end_timestamp = end_dt.timestamp()
-            
-            # Get repository commits with pagination
-            commits_url = f"https://api.github.com/repos/{repository}/commits"
-            headers = {
-                "Accept": "application/vnd.github.v3+json"
-            }
-            
-            if self.github_token:
-                headers["Authorization"] = f"Bearer {self.github_token}"
-            
-            all_commits = []
-            page = 1
-            
-            while True:
-                params = {
-                    "page": page,
-                    "per_page": 100,
-                    "since": start_dt.isoformat(),
-                    "until": end_dt.isoformat()
-                }
-                
-                response = requests.get(commits_url, headers=headers, params=params)
-                if response.status_code != 200:
-                    error_data = response.json()
-                    error_msg = error_data.get('message', 'Unknown error')
-                    raise ChangelogError(
-                        error_type="api_error",
-                        message=f"Failed to fetch commits: {error_msg}",
-                        details={"status_code": response.status_code, "error": error_msg}
-                    )
-                
-                commits = response.json()
-                if not commits:
-                    break
-                
-                all_commits.extend(commits)
-                page += 1
-                
-                # If we got fewer than per_page results, we're done
-                if len(commits) < 100:
-                    break
-            
-            # Extract SHAs from all commits
-            shas = [commit['sha'] for commit in all_commits]
-            
-            return shas
+            return commit_index.shas_between(self.source_for(repository), repository, start_dt, end_dt)
 
-        except ValueError as e:
-            raise ChangelogError(
-                error_type="invalid_input",
-                message="Invalid date format",
-                details={"error": str(e)}
-            )
-        except requests.RequestException as e:
+        except ChangelogError:
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching SHAs: {str(e)}")
             raise ChangelogError(
-                error_type="network_error",
-                message="Failed to connect to GitHub API",
+                error_type="generation_error",
+                message="Failed to fetch SHAs",
                 details={"error": str(e)}
             )
+
+    def iter_shas_by_date_range(self, repository: str, start_date: str, end_date: str) -> Iterator[str]:
+        """
+        Streaming fetch_shas_by_date_range: yields SHAs as listing pages arrive, so callers
+        can start fetching commit details before enumeration finishes. Order is not guaranteed.
+        """
+        start_dt, end_dt = self._parse_date_range(start_date, end_date)
+        try:
+            yield from commit_index.iter_shas_between(self.source_for(repository), repository, start_dt, end_dt)
+
+        except ChangelogError:
+            raise
         except Exception as e:
             logger.error(f"Error fetching SHAs: {str(e)}")
             raise ChangelogError(
@@ -314,83 +296,89 @@ class ChangelogGenerator:
                 details={"error": str(e)}
             )
 
+    def _parse_date_range(self, start_date: str, end_date: str) -> Tuple[datetime, datetime]:
         try:
-            # Get all commits using pagination
-             # Get commits using pagination with date range filtering
-            all_commits = []
-            page = 1
-            while True:
-                # Add date range parameters to the request
-                params = {
-                    'page': page,
-                    'per_page': 100,  # GitHub API max per page
-                    'since': start_dt.isoformat(),
-                    'until': end_dt.isoformat()
-                }
-                
-                # Debug logging of API parameters
-                logger.info(f"API Request Parameters: {params}")
-                
-                response = requests.get(commits_url, headers=headers, params=params)
-                if response.status_code != 200:
-                    error_data = response.json()
-                    error_msg = error_data.get('message', 'Unknown error')
-                    logger.error(f"API Response: {response.text}")
-                    raise Exception(f"Failed to fetch commits: {error_msg}")
-                
-                commits = response.json()
-                if not commits:
-                    break
-                
-                # Debug logging of commits received
-                logger.info(f"\nReceived {len(commits)} commits from page {page}")
-                for commit in commits:
-                    commit_date = commit['commit']['author']['date']
-                    logger.info(f"Commit {commit['sha']} date: {commit_date}")
-                
-                all_commits.extend(commits)
-                page += 1
-                
-                # If we're getting fewer than 100 commits, we've likely reached the end
-                if len(commits) < 100:
-                    break
-
-            # Filter commits by date range
-            filtered_commits = []
-            for commit in all_commits:
-                # Parse the commit date with timezone
-                commit_date_str = commit['commit']['author']['date']
-                commit_dt = datetime.fromisoformat(commit_date_str.replace('Z', '+00:00'))
-                commit_timestamp = commit_dt.timestamp()
-                
-                # Debug logging
-                logger.info(f"\nProcessing commit: {commit['sha']}")
-                logger.info(f"Commit date: {commit_dt.isoformat()}")
-                logger.info(f"Commit timestamp: {commit_timestamp}")
-                logger.info(f"Start timestamp: {start_timestamp}")
-                logger.info(f"End timestamp: {end_timestamp}")
-                logger.info(f"Is within range: {start_timestamp <= commit_timestamp <= end_timestamp}")
-                
-                if start_timestamp <= commit_timestamp <= end_timestamp:
-                    filtered_commits.append(commit['sha'])
-                    logger.info(f"Added commit: {commit['sha']} at {commit_dt.isoformat()}")
-                else:
-                    logger.info(f"Skipped commit: {commit['sha']} at {commit_dt.isoformat()} - outside range")
-
-            return filtered_commits
+            # Parse dates with timezone information
+            start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+            end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+        except ValueError as e:
+            raise ChangelogError(
+                error_type="invalid_input",
+                message="Invalid date format",
+                details={"error": str(e)}
+            )
+
+        # Add timezone information to make sure we capture the full day
+        start_dt = start_dt.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_dt = end_dt.replace(hour=23, minute=59, second=59, microsecond=999999)
+        return start_dt, end_dt
+
+    def fetch_compare(
+        self,
+        repository: str,
+        base: str,
+        head: str,
+        use_cache: bool = True
+    ) -> Tuple[List[CommitData], List[FileChange]]:
+        """
+        Fetch the commits between two refs (tag, branch or SHA).
+
+        With the GitHub source this uses the compare API, which costs a handful of requests
+        for a whole release but only reports file changes for the range as a whole; commits
+        already in the commit cache are upgraded to their full per-commit data.
+
+        Returns:
+            Tuple[List[CommitData], List[FileChange]]: Commits oldest first, and the range's file changes
+
+        Raises:
+            ChangelogError: If the repository or either ref cannot be found
+        """
+        source = self.source_for(repository)
+        with PHASE_SECONDS.time(phase="repo_check"):
+            source.ensure_repository(repository)
+        with PHASE_SECONDS.time(phase="commit_fetch"):
+            commits, range_files = source.compare(repository, base, head)
+
+        if not use_cache:
+            return commits, range_files
+
+        # Prefer full per-commit data where we already have it
+        cached = commit_cache.get_many(repository, [commit['sha'] for commit in commits if not commit.get('files')])
+        return [cached.get(commit['sha']) or commit for commit in commits], range_files
+
+    def generate_from_compare(self, repository: str, base: str, head: str, use_cache: bool = True) -> Dict:
+        """
+        Generate a changelog entry for every commit between two refs, e.g. tag to tag.
+
+        Raises:
+            ChangelogError: If either ref is not found or the range contains no commits
+        """
+        commits, range_files = self.fetch_compare(repository, base, head, use_cache=use_cache)
+        if not commits:
+            raise ChangelogError(
+                error_type="no_commits",
+                message=f"No commits between {base} and {head}",
+                repository=repository,
+                details={"base": base, "head": head}
+            )
+
+        try:
+            changelog = _drain(self._iter_generate(repository, commits, use_cache=use_cache, range_files=range_files))
+            return self._format_changelog(changelog)
 
         except Exception as e:
             error_msg = str(e)
-            print(f"Error fetching commits: {error_msg}")
-            raise Exception(f"Failed to fetch commits: {error_msg}")
+            logger.error(f"Error generating changelog: {error_msg}")
+            raise Exception(f"Failed to generate changelog: {error_msg}")
 
-    def generate_from_shas(self, repository: str, shas: List[str]) -> Dict:
+    def generate_from_shas(self, repository: str, shas: List[str], use_cache: bool = True) -> Dict:
         """
         Generate a changelog entry from multiple commit SHAs
         
         Args:
             repository: GitHub repository in format 'owner/repo'
             shas: List of commit SHAs to include in changelog
+            use_cache: Serve commits and identical prompts from the commit and LLM response caches
             
         Returns:
             Dict: Changelog entry with type, description, and impact
@@ -398,149 +386,319 @@ class ChangelogGenerator:
         Raises:
             ChangelogError: If any SHA is invalid or not found in the repository
         """
-        # Validate SHAs and track errors
-        invalid_shas = []
-        missing_shas = []
-        if invalid_shas:
-            raise ChangelogError(
-                error_type="invalid_format",
-                message="Some SHAs have invalid format",
-                invalid_shas=invalid_shas,
-                details={"invalid_shas": invalid_shas}
-            )
+        # Fetch all commits concurrently; invalid or missing SHAs are reported together
+        commits = self.fetch_commits(repository, shas, use_cache=use_cache)
         
-        if missing_shas:
-            raise ChangelogError(
-                error_type="not_found",
-                message="Some SHAs were not found in the repository",
-                missing_shas=missing_shas,
-                details={"missing_shas": missing_shas}
+        # Generate changelog using Claude
+        try:
+            changelog = _drain(self._iter_generate(repository, commits, use_cache=use_cache))
+            return self._format_changelog(changelog)
+            
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"Error generating changelog: {error_msg}")
+            raise Exception(f"Failed to generate changelog: {error_msg}")
+
+    def stream_from_shas(self, repository: str, shas: List[str], use_cache: bool = True) -> Iterator[Dict]:
+        """
+        Generate a changelog entry while reporting progress.
+
+        Yields events as {"event": name, "data": payload}:
+            progress: {"stage": "fetch" | "shards", "completed": n, "total": N}
+            token: {"text": chunk} for each piece of Claude's final output as it arrives
+            changelog: the formatted changelog entry (always the last event)
+
+        Raises:
+            ChangelogError: If any SHA is invalid or not found in the repository
+        """
+        fetch = self.iter_fetch_commits(repository, shas, use_cache=use_cache)
+        while True:
+            try:
+                completed, total = next(fetch)
+            except StopIteration as stop:
+                commits = stop.value
+                break
+            yield {"event": "progress", "data": {"stage": "fetch", "completed": completed, "total": total}}
+
+        try:
+            changelog = yield from self._iter_generate(repository, commits, use_cache=use_cache, stream=True)
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"Error generating changelog: {error_msg}")
+            raise Exception(f"Failed to generate changelog: {error_msg}")
+
+        yield {"event": "changelog", "data": self._format_changelog(changelog)}
+
+    def _iter_generate(
+        self,
+        repository: str,
+        commits: List[CommitData],
+        use_cache: bool = True,
+        stream: bool = False,
+        range_files: Optional[List[FileChange]] = None
+    ) -> Generator[Dict, None, Dict]:
+        """
+        Run the Claude phase, yielding shard progress and (when streaming) output token events.
+
+        Revert pairs are cancelled, then dependency bumps, merges and routine chores are
+        collapsed into aggregate lines; when nothing else is left the entry is built locally
+        without calling Claude. The remaining commits are clustered so duplicates and
+        follow-up fixes reach Claude as one unit.
+        """
+        # Order commits deterministically so the same set always yields the same prompt
+        commits = sorted(commits, key=lambda commit: (commit.get('date', ''), commit['sha']))
+
+        with PHASE_SECONDS.time(phase="classify"):
+            remaining, reverted = commit_clusterer.cancel_reverts(commits)
+            substantive, collapsed = commit_classifier.partition(remaining)
+            if reverted:
+                collapsed[REVERTED] = reverted
+        if collapsed and not substantive:
+            return commit_classifier.changelog(collapsed)
+        routine_lines = commit_classifier.aggregate_lines(collapsed)
+
+        with PHASE_SECONDS.time(phase="cluster"):
+            units = [commit_clusterer.prompt_unit(cluster) for cluster in commit_clusterer.cluster(substantive)]
+
+        shards = self._shard_commits(units)
+        if len(shards) == 1:
+            changelog = yield from self._iter_claude(
+                self._build_prompt(repository, units, range_files, routine_lines),
+                use_cache=use_cache,
+                stream=stream
             )
-        
-        # If we get here, all SHAs are valid and exist in the repository
-        commits = []
-        for sha in shas:
-            commit_data = self.fetch_commit(repository, sha)
-            commits.append(commit_data)
-        
-        # Create a prompt for Claude
-        prompt = f"""
-        You are a changelog generator. Generate a comprehensive changelog entry that summarizes multiple commits.
+        else:
+            changelog = yield from self._iter_sharded(
+                repository,
+                shards,
+                use_cache=use_cache,
+                stream=stream,
+                range_files=range_files,
+                routine_lines=routine_lines
+            )
+
+        if collapsed or len(units) < len(substantive):
+            # Claude saw aggregate lines and merged units; list every commit individually
+            changelog['commits'] = commit_refs(commits)
+        return changelog
+
+    def _build_prompt(
+        self,
+        repository: str,
+        commits: List[CommitData],
+        range_files: Optional[List[FileChange]] = None,
+        routine_lines: Optional[List[str]] = None
+    ) -> str:
+        """Create a prompt for Claude describing the given commits within PROMPT_INPUT_TOKEN_BUDGET"""
+        with PHASE_SECONDS.time(phase="prompt_build"):
+            return PromptBuilder(PROMPT_INPUT_TOKEN_BUDGET).build(repository, commits, range_files, routine_lines)
+
+    def _shard_commits(self, commits: List[CommitData]) -> List[List[CommitData]]:
+        """Split commits into batches whose compact prompt size fits CLAUDE_SHARD_MAX_INPUT_TOKENS"""
+        if not settings.CLAUDE_SHARDING_ENABLED:
+            return [commits]
+
+        builder = PromptBuilder(PROMPT_INPUT_TOKEN_BUDGET)
+        shards: List[List[CommitData]] = [[]]
+        shard_tokens = 0
+        for commit in commits:
+            tokens = builder.compact_tokens(commit)
+            if shards[-1] and shard_tokens + tokens > CLAUDE_SHARD_MAX_INPUT_TOKENS:
+                shards.append([])
+                shard_tokens = 0
+            shards[-1].append(commit)
+            shard_tokens += tokens
+        return shards
+
+    def _iter_sharded(
+        self,
+        repository: str,
+        shards: List[List[CommitData]],
+        use_cache: bool = True,
+        stream: bool = False,
+        range_files: Optional[List[FileChange]] = None,
+        routine_lines: Optional[List[str]] = None
+    ) -> Generator[Dict, None, Dict]:
+        """
+        Map-reduce generation for large commit sets.
+
+        Each shard is summarized by a concurrent Claude call, then a final call merges the
+        partial summaries. The commit list is assembled locally so no call has to echo it back.
+        """
+        logger.info(f"Generating changelog for {repository} in {len(shards)} shards")
+        partial_keys = ['type', 'description', 'impact']
+
+        partials: List[Optional[Dict]] = [None] * len(shards)
+        workers = max(1, min(CLAUDE_SHARD_CONCURRENCY, len(shards)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="claude-shard") as executor:
+            futures = {
+                executor.submit(
+                    _drain,
+                    self._iter_claude(
+                        self._build_prompt(repository, shard),
+                        system_prompt=self.shard_system_prompt,
+                        required_keys=partial_keys,
+                        use_cache=use_cache
+                    )
+                ): index
+                for index, shard in enumerate(shards)
+            }
+            for completed, future in enumerate(as_completed(futures), start=1):
+                partials[futures[future]] = future.result()
+                yield {"event": "progress", "data": {"stage": "shards", "completed": completed, "total": len(shards)}}
+
+        summaries = [
+            {
+                "type": partial["type"],
+                "description": partial["description"],
+                "impact": partial["impact"],
+                "commit_count": len(shard)
+            }
+            for partial, shard in zip(partials, shards)
+        ]
+        reduce_prompt = f"""
+        Merge these partial changelog summaries into a single changelog entry.
         
         Repository: {repository}
         
-        Commits:
+        Partial summaries:
+        {json.dumps(summaries, indent=2)}
         """
-        
-        # Add each commit's details to the prompt
-        for commit in commits:
-            author = commit.get('author', {}).get('login', '')
-            date = datetime.strptime(commit.get('commit', {}).get('author', {}).get('date', ''), '%Y-%m-%dT%H:%M:%SZ').strftime('%Y-%m-%d')
-            commit_message = commit.get('commit', {}).get('message', '')
-            github_url = commit.get('github_url', '')
-            changes_summary = commit.get('changes_summary', '')
-            
-            prompt += f"""
-            URL: {commit['url']}
-            
-            Commit SHA: {commit['sha']}
-            Author: {author}
-            Date: {date}
-            Message: {commit_message}
-            
-            Changes Summary:
-            {changes_summary}
-            """
-        
-        # Create a more structured prompt with clear instructions
-        prompt = """
-        4. Do not include any additional text or explanations
-        5. If you cannot determine the type, use "chore"
-        6. If you cannot determine the impact, use "Internal improvements"
-        
-        Repository: " + repository + "
-        
-        Commits:
+        if routine_lines:
+            reduce_prompt += PromptBuilder(PROMPT_INPUT_TOKEN_BUDGET).routine_section(routine_lines)
+        if range_files:
+            reduce_prompt += PromptBuilder(PROMPT_INPUT_TOKEN_BUDGET).range_section(range_files, PROMPT_INPUT_TOKEN_BUDGET // 2)
+        changelog = yield from self._iter_claude(
+            reduce_prompt,
+            system_prompt=self.reduce_system_prompt,
+            required_keys=partial_keys,
+            use_cache=use_cache,
+            stream=stream
+        )
+
+        changelog['commits'] = commit_refs([commit for shard in shards for commit in shard])
+        return changelog
+
+    def _iter_claude(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        required_keys: Optional[List[str]] = None,
+        use_cache: bool = True,
+        stream: bool = False
+    ) -> Generator[Dict, None, Dict]:
         """
+        Send a prompt to Claude and return the parsed, validated JSON object.
+
+        Identical requests (same model, system prompt, temperature and normalized prompt)
+        are answered from the LLM response cache; with use_cache False the cache is
+        neither read nor written. When stream is True, output text is yielded as token
+        events while Claude generates it.
+        """
+        system_prompt = system_prompt or self.system_prompt
+        cache_key = prompt_cache_key(self.model, system_prompt, self.temperature, prompt)
+        if use_cache:
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        else:
+            llm_cache.record_bypass()
+
+        request = dict(
+            model=self.model,
+            max_tokens=MAX_TOKENS_PER_REQUEST,
+            temperature=self.temperature,
+            system=system_prompt,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        started = time.perf_counter()
+        try:
+            if stream:
+                chunks = []
+                with self.anthropic_client.messages.stream(**request) as response:
+                    for text in response.text_stream:
+                        chunks.append(text)
+                        yield {"event": "token", "data": {"text": text}}
+                    usage = response.get_final_message().usage
+                content = "".join(chunks)
+            else:
+                response = self.anthropic_client.messages.create(**request)
+                usage = response.usage
+                # Get the first text block from Claude's response
+                content = response.content[0].text if response.content else ""
+        except Exception:
+            CLAUDE_REQUESTS.inc(model=self.model, outcome="error")
+            raise
+        finally:
+            PHASE_SECONDS.observe(time.perf_counter() - started, phase="claude_call")
+        CLAUDE_REQUESTS.inc(model=self.model, outcome="success")
+        if usage is not None:
+            CLAUDE_TOKENS.inc(usage.input_tokens, model=self.model, direction="input")
+            CLAUDE_TOKENS.inc(usage.output_tokens, model=self.model, direction="output")
+
+        with PHASE_SECONDS.time(phase="json_parse"):
+            changelog = self._parse_changelog(content, required_keys)
+
+        if use_cache:
+            llm_cache.set(cache_key, self.model, changelog)
+        return changelog
+
+    def _parse_changelog(self, content: str, required_keys: Optional[List[str]] = None) -> Dict:
+        # Clean the content by removing any markdown formatting
+        content = content.strip()
         
-        # Add each commit's details to the prompt
-        for commit in commits:
-            author = commit.get('author', {}).get('login', '')
-            date = datetime.strptime(commit.get('commit', {}).get('author', {}).get('date', ''), '%Y-%m-%dT%H:%M:%SZ').strftime('%Y-%m-%d')
-            commit_message = commit.get('commit', {}).get('message', '')
-            github_url = commit.get('github_url', '')
-            changes_summary = commit.get('changes_summary', '')
-            
-            prompt += f"""
-            URL: {commit['url']}
+        # If content is empty or not JSON, raise an error
+        if not content:
+            raise ValueError("Claude's response was empty")
             
-            Commit SHA: {commit['sha']}
-            Author: {author}
-            Date: {date}
-            Message: {commit_message}
-            
-            Changes Summary:
-            {changes_summary}
-            """
+        # First try to remove markdown code block if present
+        if content.startswith('```json') and content.endswith('```'):
+            # Extract content between code block markers
+            content = content[7:-3].strip()  # Remove ```json at start and ``` at end
         
-        # Generate changelog using Claude
         try:
-            # Lower temperature for more consistent output
-            response = anthropic_client.messages.create(
-                model=self.model,
-                max_tokens=MAX_TOKENS_PER_REQUEST,
-                temperature=0.1,  # Lower temperature for more consistent output
-                system=self.system_prompt,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            # Get the first text block from Claude's response
-            content = response.content[0].text if response.content else ""
+            changelog = json.loads(content)
+        except json.JSONDecodeError as e:
+            # Log the actual response we received for debugging
+            logger.error(f"Invalid JSON response from Claude: {content}")
             
-            # Clean the content by removing any markdown formatting
-            content = content.strip()
-            
-            # If content is empty or not JSON, raise an error
-            if not content:
-                raise ValueError("Claude's response was empty")
-                
-            # Try to parse the JSON
+            # Try to find JSON object within the text
+            json_start = content.find('{')
+            json_end = content.rfind('}') + 1
+            if json_start == -1 or json_end <= json_start:
+                raise ValueError(f"Invalid JSON response from Claude: {str(e)}")
             try:
-                # First try to remove markdown code block if present
-                if content.startswith('```json') and content.endswith('```'):
-                    # Extract content between code block markers
-                    content = content[8:-3].strip()  # Remove ```json at start and ``` at end
-                
-                # Remove any leading/trailing whitespace
-                content = content.strip()
-                
-                # Try to parse the JSON
-                changelog = json.loads(content)
-                
-                # Basic validation of the JSON structure
-                if not isinstance(changelog, dict):
-                    raise ValueError("Response is not a JSON object")
-                
-                required_keys = ['type', 'description', 'impact', 'commit_count', 'commits']
-                missing_keys = [k for k in required_keys if k not in changelog]
-                if missing_keys:
-                    raise ValueError(f"Missing required keys: {missing_keys}")
-                
-                # Format the commits as a collapsible list
-                commit_count = len(changelog['commits'])
-                changelog['commit_count'] = commit_count
-                
-                # Format the output with a collapsible commit list
-                commit_details = []
-                for commit in changelog['commits']:
-                    commit_message = commit.get('message', '').split('\n')[0]  # Get first line of message
-                    commit_details.append(f"""
+                changelog = json.loads(content[json_start:json_end])
+            except json.JSONDecodeError:
+                raise ValueError(f"Invalid JSON response from Claude: {str(e)}")
+        
+        # Basic validation of the JSON structure
+        if not isinstance(changelog, dict):
+            raise ValueError("Response is not a JSON object")
+        
+        required_keys = required_keys or ['type', 'description', 'impact', 'commit_count', 'commits']
+        missing_keys = [k for k in required_keys if k not in changelog]
+        if missing_keys:
+            raise ValueError(f"Missing required keys: {missing_keys}")
+        
+        return changelog
+
+    def _format_changelog(self, changelog: Dict) -> Dict:
+        # Format the commits as a collapsible list
+        commit_count = len(changelog['commits'])
+        changelog['commit_count'] = commit_count
+        
+        # Format the output with a collapsible commit list
+        commit_details = []
+        for commit in changelog['commits']:
+            commit_message = commit.get('message', '').split('\n')[0]  # Get first line of message
+            commit_details.append(f"""
 - {commit['url']} - {commit_message}
   - SHA: {commit['sha']}
 """)
-                
-                commit_list = '\n'.join(commit_details)
-                changelog['formatted_output'] = f"""
+        
+        commit_list = '\n'.join(commit_details)
+        changelog['formatted_output'] = f"""
 Generated Changelog
 Type: {changelog['type']}
 Description: {changelog['description']}
@@ -555,61 +713,5 @@ Number of Commits: {commit_count}
 
 </details>
 """
-                
-                return changelog
-                
-            except json.JSONDecodeError as e:
-                # Log the actual response we received for debugging
-                logger.error(f"Invalid JSON response from Claude: {content}")
-                
-                # Try to fix common JSON parsing issues
-                try:
-                    # Try to find JSON object within the text
-                    json_start = content.find('{')
-                    json_end = content.rfind('}') + 1
-                    if json_start != -1 and json_end != -1:
-                        # Extract just the JSON object
-                        json_content = content[json_start:json_end]
-                        # Process commits into changelog format
-                        changelog = self.process_commits(commits)
-                        
-                        # Add GitHub URLs to commits
-                        for commit in changelog.get('commits', []):
-                            if commit.get('sha'):
-                                commit['github_url'] = f"https://github.com/{owner}/{repo}/commit/{commit['sha']}"
-
-                        return changelog
-                except Exception:
-                    pass
-                
-                raise ValueError(f"Invalid JSON response from Claude: {str(e)}")
-            
-        except Exception as e:
-            error_msg = str(e)
-            logger.error(f"Error generating changelog: {error_msg}")
-            raise Exception(f"Failed to generate changelog: {error_msg}")
-
-
-            commits_url = f"https://api.github.com/repos/{repository}/commits"
-            headers = {
-                "Accept": "application/vnd.github.v3+json"
-            }
         
-            if self.github_token:
-                headers["Authorization"] = f"Bearer {self.github_token}"
-
-            try:
-                # Get all commits using pagination
-                all_commits = []
-            except Exception as e:
-                raise Exception(f"An unexpected error occurred: {str(e)}")           
-
-            # Return the raw commit data for debugging
-            return {
-                "raw_commits": all_commits,
-                "start_date": start_date,
-                "end_date": end_date
-            }
-
-        except Exception as e:
-            raise Exception(f"Failed to fetch commits: {str(e)}")
\ No newline at end of file
+        return changelog
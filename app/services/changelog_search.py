@@ -0,0 +1,141 @@
+import logging
+import re
+from typing import Dict, Optional
+
+from sqlalchemy import Float, column, func, literal_column, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.changelog import ChangelogEntry
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = "changelog_search"
+
+# Indexed columns, in FTS table order, with their bm25 weights
+SEARCH_COLUMNS = (
+    ("repository", 1.0),
+    ("change_type", 2.0),
+    ("description", 10.0),
+    ("impact", 5.0),
+    ("commits", 3.0),
+)
+
+SNIPPET_OPEN = "<mark>"
+SNIPPET_CLOSE = "</mark>"
+SNIPPET_TOKENS = 16
+
+search_table = table(SEARCH_TABLE, column("rowid"), *(column(name) for name, _ in SEARCH_COLUMNS))
+
+
+def search_document(repository: str, changelog_data: Dict) -> Dict[str, str]:
+    """Text indexed for a generated changelog"""
+    return {
+        "repository": repository or "",
+        "change_type": changelog_data.get("type") or "",
+        "description": changelog_data.get("description") or "",
+        "impact": changelog_data.get("impact") or "",
+        "commits": "\n".join(commit.get("message") or "" for commit in changelog_data.get("commits", []))
+    }
+
+
+def match_expression(query: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for free text: every word must appear, the last one as a prefix.
+    Words are quoted so user input can never be parsed as FTS5 query syntax.
+    """
+    words = re.findall(r"\w+", query)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+
+class ChangelogSearch:
+    """
+    Full-text index over generated changelogs, backed by an SQLite FTS5 table.
+
+    Each changelog is indexed (rowid = changelog_entries.id) in the same transaction
+    that stores it, so search never lags behind what /changelogs returns. Results
+    are ranked with bm25, weighting description and impact above commit messages,
+    type and repository. On databases other than SQLite the index is not maintained
+    and search reports itself unavailable.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def available(self, bind) -> bool:
+        return self.enabled and bind.dialect.name == "sqlite"
+
+    def create(self, connection) -> None:
+        """Create the FTS table if missing"""
+        if not self.available(connection):
+            return
+
+        names = ", ".join(name for name, _ in SEARCH_COLUMNS)
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5({names}, tokenize='porter unicode61')"
+        ))
+
+    def backfill(self, connection) -> None:
+        """Index changelogs stored before the FTS table existed"""
+        if not self.available(connection):
+            return
+
+        names = ", ".join(name for name, _ in SEARCH_COLUMNS)
+        result = connection.execute(text(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {names}) "
+            "SELECT e.id, COALESCE(e.repository, ''), COALESCE(e.change_type, ''), e.description, COALESCE(e.impact, ''), "
+            "COALESCE((SELECT group_concat(c.message, char(10)) FROM changelog_commits c WHERE c.entry_id = e.id), '') "
+            "FROM changelog_entries e WHERE e.description IS NOT NULL "
+            f"AND NOT EXISTS (SELECT 1 FROM {SEARCH_TABLE} s WHERE s.rowid = e.id)"
+        ))
+        if result.rowcount:
+            logger.info(f"Indexed {result.rowcount} changelog entries for search")
+
+    def index(self, db: Session, entry_id: int, repository: str, changelog_data: Dict) -> None:
+        """Index a stored changelog; call before the session commits"""
+        if self.available(db.get_bind()):
+            db.execute(*self._insert(entry_id, repository, changelog_data))
+
+    async def index_async(self, db: AsyncSession, entry_id: int, repository: str, changelog_data: Dict) -> None:
+        """index() on an async session"""
+        if self.available(db.bind):
+            await db.execute(*self._insert(entry_id, repository, changelog_data))
+
+    def query(self, match: str, repository: Optional[str] = None):
+        """Select matching changelogs with a snippet and bm25 score (lower is better), best first"""
+        fts = literal_column(SEARCH_TABLE)
+        score = func.bm25(fts, *(weight for _, weight in SEARCH_COLUMNS), type_=Float).label("score")
+        snippet = func.snippet(fts, -1, SNIPPET_OPEN, SNIPPET_CLOSE, "…", SNIPPET_TOKENS).label("snippet")
+        statement = select(
+            ChangelogEntry.id,
+            ChangelogEntry.repository,
+            ChangelogEntry.version,
+            ChangelogEntry.author,
+            ChangelogEntry.status,
+            ChangelogEntry.date,
+            ChangelogEntry.change_type,
+            ChangelogEntry.description,
+            ChangelogEntry.impact,
+            ChangelogEntry.commit_count,
+            snippet,
+            score
+        ).select_from(search_table).join(
+            ChangelogEntry, ChangelogEntry.id == search_table.c.rowid
+        ).where(text(f"{SEARCH_TABLE} MATCH :match").bindparams(match=match))
+        if repository:
+            statement = statement.where(ChangelogEntry.repository == repository)
+        return statement.order_by(score, ChangelogEntry.id)
+
+    def _insert(self, entry_id: int, repository: str, changelog_data: Dict):
+        names = [name for name, _ in SEARCH_COLUMNS]
+        statement = text(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(names)}) "
+            f"VALUES (:rowid, {', '.join(':' + name for name in names)})"
+        )
+        return statement, dict(search_document(repository, changelog_data), rowid=entry_id)
+
+
+changelog_search = ChangelogSearch(enabled=settings.CHANGELOG_SEARCH_ENABLED)
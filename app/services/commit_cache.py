@@ -0,0 +1,147 @@
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.changelog import CachedCommit
+from app.services.cache import EvictionSchedule, LRUCache
+from app.services.commit_data import COMMIT_FORMAT_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Fields of CommitData persisted per (repository, sha)
+CACHED_FIELDS = ("sha", "url", "github_url", "message", "author", "date", "changes_summary", "truncated_diff", "files_summary")
+
+
+class CommitCache:
+    """
+    Content-addressed cache of processed commits keyed by (repository, sha).
+
+    Commits are immutable once addressed by a full SHA, so entries only go stale when
+    the processing changes: rows from another COMMIT_FORMAT_VERSION count as misses
+    and are overwritten when the commit is stored again. The table is bounded by
+    COMMIT_CACHE_MAX_ENTRIES and evicts least recently used rows.
+    An optional in-process LRU sits in front of the database.
+    """
+
+    def __init__(self, max_entries: int, memory_entries: int, enabled: bool = True):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.eviction = EvictionSchedule(max_entries)
+        self.memory = LRUCache(memory_entries)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_many(self, repository: str, shas: List[str]) -> Dict[str, Dict]:
+        """Return cached commit data for the given SHAs, keyed by SHA"""
+        if not self.enabled or not shas:
+            return {}
+
+        found: Dict[str, Dict] = {}
+        remaining = []
+        for sha in dict.fromkeys(shas):
+            commit = self.memory.get((repository, sha))
+            if commit is not None:
+                found[sha] = dict(commit)
+            else:
+                remaining.append(sha)
+
+        if remaining:
+            db = SessionLocal()
+            try:
+                rows = db.query(CachedCommit).filter(
+                    CachedCommit.repository == repository,
+                    CachedCommit.sha.in_(remaining),
+                    CachedCommit.format_version == COMMIT_FORMAT_VERSION
+                ).all()
+                if rows:
+                    db.query(CachedCommit).filter(
+                        CachedCommit.repository == repository,
+                        CachedCommit.sha.in_([row.sha for row in rows])
+                    ).update({CachedCommit.last_accessed: datetime.utcnow()}, synchronize_session=False)
+                    db.commit()
+                for row in rows:
+                    commit = {field: getattr(row, field) for field in CACHED_FIELDS}
+                    commit["files"] = json.loads(row.files) if row.files else []
+                    self.memory.set((repository, row.sha), commit)
+                    found[row.sha] = dict(commit)
+            except Exception as e:
+                logger.warning(f"Commit cache lookup failed: {str(e)}")
+            finally:
+                db.close()
+
+        self.hits += len(found)
+        self.misses += len(shas) - len(found)
+        return found
+
+    def put_many(self, repository: str, commits: List[Dict]) -> None:
+        """Store processed commits and evict the least recently used rows beyond the size bound"""
+        if not self.enabled or not commits:
+            return
+
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            for commit in commits:
+                entry = {field: commit.get(field) for field in CACHED_FIELDS}
+                db.merge(CachedCommit(
+                    repository=repository,
+                    files=json.dumps(commit.get("files") or []),
+                    format_version=COMMIT_FORMAT_VERSION,
+                    created_at=now,
+                    last_accessed=now,
+                    **entry
+                ))
+                self.memory.set((repository, entry["sha"]), dict(entry, files=commit.get("files") or []))
+            db.commit()
+            self._evict(db, len(commits))
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Commit cache store failed: {str(e)}")
+        finally:
+            db.close()
+
+    def _evict(self, db, inserted: int) -> None:
+        if not self.eviction.due(inserted):
+            return
+        rows = db.query(func.count(CachedCommit.sha)).scalar()
+        overflow = self.eviction.overflow(rows)
+        self.eviction.counted(rows - overflow)
+        if overflow <= 0:
+            return
+
+        stale = db.query(CachedCommit.repository, CachedCommit.sha).order_by(
+            CachedCommit.last_accessed
+        ).limit(overflow).all()
+        for repository, sha in stale:
+            db.query(CachedCommit).filter(
+                CachedCommit.repository == repository,
+                CachedCommit.sha == sha
+            ).delete(synchronize_session=False)
+            self.memory.delete((repository, sha))
+        db.commit()
+        self.evictions += len(stale)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "max_entries": self.max_entries,
+            "memory": self.memory.stats()
+        }
+
+
+commit_cache = CommitCache(
+    max_entries=settings.COMMIT_CACHE_MAX_ENTRIES,
+    memory_entries=settings.COMMIT_CACHE_MEMORY_ENTRIES,
+    enabled=settings.COMMIT_CACHE_ENABLED
+)
@@ -0,0 +1,173 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+# Conventional-commit header: type(scope)!: subject
+CONVENTIONAL_PATTERN = re.compile(r'^(?P<type>[A-Za-z]+)(?:\((?P<scope>[^)]*)\))?(?P<breaking>!)?:\s*(?P<subject>\S.*)$')
+MERGE_PATTERN = re.compile(
+    r"^Merge (?:pull request #\d+|branch\b|branches\b|remote-tracking branch\b|tag\b|commit\b|'[^']+' into\b)"
+)
+# A version on its own ("4.17.21", "v2", "1.2.0-rc.1"), not a bare year or count
+VERSION = r'(?:v\d+(?:\.[\w-]+)*|\d+(?:\.[\w-]+)+)'
+# "Bump lodash from 4.17.20 to 4.17.21": a version pair marks a bump whoever wrote it
+BUMP_PATTERN = re.compile(
+    r'^(?:bump|update|upgrade|pin)\s+(?:(?:the\s+)?dependency\s+)?(?P<package>[\w@./-]+)'
+    r'(?:\s+(?:group|requirement))?\s+from\s+' + VERSION + r'\s+to\s+' + VERSION + r'\b',
+    re.IGNORECASE
+)
+# Package named by a bump subject ("Update dependency requests to v2.32.0", "bump the npm group ...");
+# only trusted for commits already known to be dependency updates (bot author or deps scope)
+PACKAGE_PATTERN = re.compile(
+    r'^(?:bump|update|upgrade|pin)\s+(?:(?:the\s+)?dependency\s+)?(?P<package>[\w@./-]+)'
+    r'(?:\s+(?:group|requirement))?(?:\s+from\s+\S+)?\s+to\s+v?\d',
+    re.IGNORECASE
+)
+
+DEPENDENCY_BOTS = {
+    "dependabot[bot]", "dependabot-preview[bot]", "renovate[bot]", "renovate-bot",
+    "greenkeeper[bot]", "depfu[bot]", "pyup-bot", "snyk-bot", "pre-commit-ci[bot]"
+}
+DEPENDENCY_TYPES = {"deps", "dep", "dependencies"}
+DEPENDENCY_SCOPES = {"deps", "deps-dev", "dev-deps", "dependencies"}
+
+# Conventional types with no user-facing effect
+ROUTINE_TYPES = {"chore", "ci", "build", "style"}
+
+# Package names listed on the dependency aggregate line
+MAX_LISTED_PACKAGES = 5
+
+DEPENDENCY, MERGE, ROUTINE = "dependency", "merge", "routine"
+# Commits cancelled out by a revert in the same range (see commit_clusterer)
+REVERTED = "reverted"
+
+
+def parse_conventional(message: str) -> Optional[Dict[str, str]]:
+    """type, scope, subject and breaking ("!" or BREAKING CHANGE footer) of a conventional-commit message"""
+    subject = (message or '').split('\n', 1)[0].strip()
+    match = CONVENTIONAL_PATTERN.match(subject)
+    if not match:
+        return None
+    return {
+        "type": match.group("type").lower(),
+        "scope": (match.group("scope") or "").strip().lower(),
+        "subject": match.group("subject").strip(),
+        "breaking": "!" if match.group("breaking") or "BREAKING CHANGE" in (message or '') else ""
+    }
+
+
+class CommitClassifier:
+    """
+    Cheap local triage of commits before any prompt is built.
+
+    Dependency bumps (bot authors, deps types and scopes, "Bump x from 1.2 to 1.3"),
+    merge commits and routine conventional types (chore, ci, build, style) carry
+    little for a changelog reader, so they are collapsed into one aggregate line
+    per kind instead of being sent to Claude with their diffs. Breaking changes
+    are never collapsed.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def classify(self, commit: Dict) -> Optional[str]:
+        """DEPENDENCY, MERGE or ROUTINE for commits that can be collapsed, else None"""
+        message = commit.get('message') or ''
+        subject = message.split('\n', 1)[0].strip()
+        conventional = parse_conventional(message)
+        if conventional and conventional["breaking"]:
+            return None
+
+        if MERGE_PATTERN.match(subject):
+            return MERGE
+        if (commit.get('author') or '').lower() in DEPENDENCY_BOTS or BUMP_PATTERN.match(subject):
+            return DEPENDENCY
+        if conventional:
+            if conventional["type"] in DEPENDENCY_TYPES or conventional["scope"] in DEPENDENCY_SCOPES:
+                return DEPENDENCY
+            if conventional["type"] in ROUTINE_TYPES:
+                return ROUTINE
+        return None
+
+    def partition(self, commits: List[Dict]) -> Tuple[List[Dict], Dict[str, List[Dict]]]:
+        """Split commits into those that need Claude and the collapsible ones grouped by kind, keeping order"""
+        if not self.enabled:
+            return commits, {}
+        substantive: List[Dict] = []
+        collapsed: Dict[str, List[Dict]] = {}
+        for commit in commits:
+            kind = self.classify(commit)
+            if kind is None:
+                substantive.append(commit)
+            else:
+                collapsed.setdefault(kind, []).append(commit)
+        return substantive, collapsed
+
+    def aggregate_lines(self, collapsed: Dict[str, List[Dict]]) -> List[str]:
+        """One line per kind, e.g. "14 dependency updates (lodash, requests, ...)" """
+        lines = []
+        dependencies = collapsed.get(DEPENDENCY) or []
+        if dependencies:
+            packages = list(dict.fromkeys(
+                match.group("package")
+                for match in (PACKAGE_PATTERN.match(self._subject(commit)) for commit in dependencies)
+                if match
+            ))
+            listed = ", ".join(packages[:MAX_LISTED_PACKAGES]) + (", ..." if len(packages) > MAX_LISTED_PACKAGES else "")
+            lines.append(
+                f"{len(dependencies)} dependency update{'s' if len(dependencies) != 1 else ''}"
+                + (f" ({listed})" if listed else "")
+            )
+        merges = collapsed.get(MERGE) or []
+        if merges:
+            lines.append(f"{len(merges)} merge commit{'s' if len(merges) != 1 else ''}")
+        routine = collapsed.get(ROUTINE) or []
+        if routine:
+            types = sorted({(parse_conventional(commit.get('message') or '') or {}).get("type", "") for commit in routine} - {""})
+            lines.append(
+                f"{len(routine)} maintenance commit{'s' if len(routine) != 1 else ''}"
+                + (f" ({', '.join(types)})" if types else "")
+            )
+        reverted = collapsed.get(REVERTED) or []
+        if reverted:
+            lines.append(
+                f"{len(reverted)} commit{'s' if len(reverted) != 1 else ''} cancelled out by reverts within the range"
+            )
+        return lines
+
+    def changelog(self, collapsed: Dict[str, List[Dict]]) -> Dict:
+        """Changelog entry for a set of commits that are all collapsible, built without Claude"""
+        lines = self.aggregate_lines(collapsed)
+        description = "; ".join(lines)
+        commits = sorted(
+            (commit for group in collapsed.values() for commit in group),
+            key=lambda commit: (commit.get('date', ''), commit['sha'])
+        )
+        only_dependencies = set(collapsed) == {DEPENDENCY}
+        return {
+            "type": "dependencies" if only_dependencies else "chore",
+            "description": description[:1].upper() + description[1:],
+            "impact": "Dependency updates" if only_dependencies else "Internal improvements",
+            "commit_count": len(commits),
+            "commits": commit_refs(commits)
+        }
+
+    def _subject(self, commit: Dict) -> str:
+        subject = (commit.get('message') or '').split('\n', 1)[0].strip()
+        conventional = parse_conventional(subject)
+        return conventional["subject"] if conventional else subject
+
+
+def commit_refs(commits: List[Dict]) -> List[Dict]:
+    """The {sha, url, message} records listed in a changelog entry"""
+    return [
+        {
+            "sha": commit['sha'],
+            "url": commit.get('github_url') or commit.get('url', ''),
+            "message": commit.get('message', '')
+        }
+        for commit in commits
+    ]
+
+
+commit_classifier = CommitClassifier(enabled=settings.COMMIT_PRECLASSIFY_ENABLED)
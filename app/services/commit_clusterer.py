@@ -0,0 +1,227 @@
+import hashlib
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.diff_processor import MAX_CHANGES_PER_FILE
+
+# Subject of a `git revert` commit, and the line it adds to the body
+REVERT_PATTERN = re.compile(r'^Revert "(?P<subject>.+)"$')
+REVERTS_SHA_PATTERN = re.compile(r'This reverts commit (?P<sha>[0-9a-f]{7,40})')
+# fixup!/squash!/amend! commits name the subject of the commit they amend
+AUTOSQUASH_PATTERN = re.compile(r'^(?:fixup|squash|amend)!\s+(?P<subject>.+)$')
+FOLLOWUP_PATTERN = re.compile(
+    r'\b(?:typos?|nits?|lint(?:ing)?|formatting|whitespace|oops|wip|cleanup|clean up'
+    r'|review (?:comments|feedback)|address (?:review|comments|feedback)|(?:minor|small) fix(?:es)?)\b',
+    re.IGNORECASE
+)
+WORD_PATTERN = re.compile(r'[a-z0-9]{3,}')
+STOPWORDS = {"the", "and", "for", "with", "from", "into", "when", "this", "that", "fix", "add", "update"}
+
+# Changed lines up to which a "fix typo"-style commit is folded into the change it follows up
+FOLLOWUP_MAX_LINES = 30
+# Share of a follow-up's paths that must fall inside the earlier change
+FOLLOWUP_PATH_COVERAGE = 0.5
+# Otherwise both touched paths and subject words must be this similar (Jaccard)
+PATH_SIMILARITY = 0.5
+MESSAGE_SIMILARITY = 0.5
+# Commits folded into one prompt unit at most
+MAX_CLUSTER_SIZE = 25
+
+
+def subject(commit: Dict) -> str:
+    return (commit.get('message') or '').split('\n', 1)[0].strip()
+
+
+def patch_id(commit: Dict) -> Optional[str]:
+    """
+    Content fingerprint of a commit's change, independent of SHA, message and line numbers.
+
+    Like `git patch-id` it matches cherry-picks and squash duplicates of the same change.
+    Built from each file's full-patch hash, so it is None unless every file of the commit
+    was listed and its patch read in full.
+    """
+    files = commit.get('files') or []
+    if not files or commit.get('files_summary') or any(not f.get('patch_hash') for f in files):
+        return None
+    digest = hashlib.sha1()
+    for file in sorted(files, key=lambda f: f.get('filename', '')):
+        digest.update(f"{file.get('filename', '')}\0{file['patch_hash']}\n".encode())
+    return digest.hexdigest()
+
+
+def paths(commit: Dict) -> Set[str]:
+    return {f.get('filename', '') for f in commit.get('files') or []}
+
+
+def words(text: str) -> Set[str]:
+    return set(WORD_PATTERN.findall(text.lower())) - STOPWORDS
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def _changed_lines(commit: Dict) -> int:
+    return sum((f.get('additions') or 0) + (f.get('deletions') or 0) for f in commit.get('files') or [])
+
+
+class CommitClusterer:
+    """
+    Shrink long commit ranges before prompting.
+
+    Reverts are cancelled against the commits they revert when both are in the range and
+    the revert names its target with a "This reverts commit <sha>" line.
+    The remaining commits are grouped into prompt units: identical changes (same patch-id,
+    e.g. cherry-picks and squash duplicates), fixup!/squash! commits, small follow-ups such
+    as "fix typo" that stay within an earlier change's paths, and commits whose paths and
+    subjects both closely match. Each unit is sent to Claude as one commit; every SHA is
+    still listed in the resulting entry.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def cancel_reverts(self, commits: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Split commits (oldest first) into those left and revert pairs that cancel out"""
+        if not self.enabled:
+            return commits, []
+
+        earlier: List[str] = []
+        cancelled: Set[str] = set()
+        for commit in commits:
+            target = self._revert_target(commit, earlier)
+            if target is not None and target not in cancelled:
+                cancelled.update((target, commit['sha']))
+            earlier.append(commit['sha'])
+
+        return (
+            [commit for commit in commits if commit['sha'] not in cancelled],
+            [commit for commit in commits if commit['sha'] in cancelled]
+        )
+
+    def cluster(self, commits: List[Dict]) -> List[List[Dict]]:
+        """Group commits (oldest first) into prompt units, ordered by their first commit"""
+        if not self.enabled:
+            return [[commit] for commit in commits]
+
+        clusters: List[List[Dict]] = []
+        cluster_paths: List[Set[str]] = []
+        by_patch: Dict[str, int] = {}
+        by_subject: Dict[str, int] = {}
+        by_path: Dict[str, List[int]] = {}
+        for commit in commits:
+            identity = patch_id(commit)
+            touched = paths(commit)
+            index = self._match(commit, identity, touched, clusters, cluster_paths, by_patch, by_subject, by_path)
+            if index is None:
+                index = len(clusters)
+                clusters.append([])
+                cluster_paths.append(set())
+            clusters[index].append(commit)
+            for path in touched - cluster_paths[index]:
+                by_path.setdefault(path, []).append(index)
+            cluster_paths[index] |= touched
+            if identity is not None:
+                by_patch.setdefault(identity, index)
+            by_subject.setdefault(subject(commit), index)
+        return clusters
+
+    def prompt_unit(self, cluster: List[Dict]) -> Dict:
+        """One commit record standing for a cluster: the first commit, with the others' files merged in"""
+        lead = cluster[0]
+        if len(cluster) == 1:
+            return lead
+
+        files: Dict[str, Dict] = {}
+        seen_patches: Set[str] = set()
+        notes = []
+        for commit in cluster:
+            identity = patch_id(commit)
+            if identity is not None and identity in seen_patches:
+                notes.append(f"- {commit['sha'][:7]} {subject(commit)} (same change)")
+                continue
+            if identity is not None:
+                seen_patches.add(identity)
+            if commit is not lead:
+                notes.append(f"- {commit['sha'][:7]} {subject(commit)}")
+            for file in commit.get('files') or []:
+                merged = files.get(file.get('filename', ''))
+                if merged is None:
+                    files[file.get('filename', '')] = dict(file, changes=list(file.get('changes') or []))
+                    continue
+                merged['additions'] = (merged.get('additions') or 0) + (file.get('additions') or 0)
+                merged['deletions'] = (merged.get('deletions') or 0) + (file.get('deletions') or 0)
+                merged['total_changes'] = (merged.get('total_changes') or 0) + (file.get('total_changes') or 0)
+                room = MAX_CHANGES_PER_FILE - len(merged['changes'])
+                merged['changes'].extend((file.get('changes') or [])[:max(room, 0)])
+
+        message = (lead.get('message') or '').rstrip()
+        message += "\n\nRelated commits folded into this one:\n" + "\n".join(notes)
+        return dict(
+            lead,
+            message=message,
+            files=list(files.values()),
+            files_summary="; ".join(commit['files_summary'] for commit in cluster if commit.get('files_summary'))
+        )
+
+    def _revert_target(self, commit: Dict, earlier: List[str]) -> Optional[str]:
+        """
+        SHA of the earlier commit in the range that this commit reverts, if any.
+
+        Only the trailer `git revert` writes counts: a matching subject or an inverse-looking
+        diff can belong to a partial revert, which still changes the code.
+        """
+        if not REVERT_PATTERN.match(subject(commit)):
+            return None
+        sha_match = REVERTS_SHA_PATTERN.search(commit.get('message') or '')
+        if not sha_match:
+            return None
+        reverted = sha_match.group('sha')
+        named = [sha for sha in earlier if sha.startswith(reverted)]
+        return named[0] if len(named) == 1 else None
+
+    def _match(
+        self,
+        commit: Dict,
+        identity: Optional[str],
+        touched: Set[str],
+        clusters: List[List[Dict]],
+        cluster_paths: List[Set[str]],
+        by_patch: Dict[str, int],
+        by_subject: Dict[str, int],
+        by_path: Dict[str, List[int]]
+    ) -> Optional[int]:
+        """Index of the cluster this commit joins, or None to start a new one"""
+        def open_cluster(index: Optional[int]) -> Optional[int]:
+            return index if index is not None and len(clusters[index]) < MAX_CLUSTER_SIZE else None
+
+        if identity is not None and identity in by_patch:
+            return open_cluster(by_patch[identity])
+        autosquash = AUTOSQUASH_PATTERN.match(subject(commit))
+        if autosquash:
+            return open_cluster(by_subject.get(autosquash.group('subject')))
+        if not touched:
+            return None
+
+        followup = FOLLOWUP_PATTERN.search(subject(commit)) is not None and _changed_lines(commit) <= FOLLOWUP_MAX_LINES
+        subject_words = words(subject(commit))
+        best, best_score = None, 0.0
+        for index in sorted({index for path in touched for index in by_path.get(path, [])}):
+            if len(clusters[index]) >= MAX_CLUSTER_SIZE:
+                continue
+            if followup:
+                score = len(touched & cluster_paths[index]) / len(touched)
+                if score < FOLLOWUP_PATH_COVERAGE:
+                    continue
+            else:
+                score = jaccard(touched, cluster_paths[index])
+                if score < PATH_SIMILARITY or jaccard(subject_words, words(subject(clusters[index][0]))) < MESSAGE_SIMILARITY:
+                    continue
+            # The latest matching change wins ties; follow-ups usually trail what they fix
+            if score >= best_score:
+                best, best_score = index, score
+        return best
+
+
+commit_clusterer = CommitClusterer(enabled=settings.COMMIT_CLUSTERING_ENABLED)
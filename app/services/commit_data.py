@@ -0,0 +1,153 @@
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from typing_extensions import TypedDict
+
+from app.core.config import settings
+from app.services.diff_processor import select_changes
+
+class FileChange(TypedDict):
+    filename: str
+    status: str
+    additions: int
+    deletions: int
+    changes: List[str]  # Most informative added/removed lines (up to MAX_CHANGES_PER_FILE), in file order
+    total_changes: int
+    patch_hash: Optional[str]  # Hash of the whole patch (see select_changes), None when it was not read in full
+
+class CommitData(TypedDict):
+    sha: str
+    url: str
+    github_url: str
+    message: str
+    author: str
+    date: str
+    changes_summary: str
+    truncated_diff: str
+    files: List[FileChange]
+    files_summary: str  # "412 files across 9 directories ..." when only some files are in `files`
+
+# Version of the processing behind CommitData (line selection, patch hashes); bump it whenever
+# select_changes or FileSummary output changes so cached commits are processed again
+COMMIT_FORMAT_VERSION = 2
+
+# Files summarized in detail per commit; the rest only count towards FileSummary.aggregate()
+MAX_FILES_PER_COMMIT = settings.COMMIT_MAX_FILES
+
+class FileSummary:
+    """
+    Builds the per-file records of one commit from GitHub file entries fed one
+    page at a time. Only the first max_files files are summarized; each file's
+    patch is reduced to its selected lines as it arrives, so raw pages can be
+    dropped as soon as they are added. Later files only update the totals.
+    """
+
+    def __init__(self, max_files: int = MAX_FILES_PER_COMMIT):
+        self.max_files = max_files
+        self.files: List[FileChange] = []
+        self.total_files = 0
+        self.additions = 0
+        self.deletions = 0
+        self.directories = set()
+        # Set when the file list was cut short (page cap or a failed page), so totals are lower bounds
+        self.incomplete = False
+        self._summary_lines: List[str] = []
+        self._diff_sections: List[str] = []
+
+    def add_page(self, files_changed: Iterable[Dict]) -> None:
+        for file in files_changed:
+            self.add(file)
+
+    def add(self, file: Dict) -> None:
+        filename = file.get('filename', '')
+        additions = file.get('additions', 0)
+        deletions = file.get('deletions', 0)
+        self.total_files += 1
+        self.additions += additions or 0
+        self.deletions += deletions or 0
+        self.directories.add(filename.rsplit('/', 1)[0] if '/' in filename else '.')
+        if len(self.files) >= self.max_files:
+            return
+
+        stats = []
+        if file.get('status'):
+            stats.append(f"Status: {file['status']}")
+        if additions:
+            stats.append(f"Additions: {additions} lines")
+        if deletions:
+            stats.append(f"Deletions: {deletions} lines")
+        if stats:
+            self._summary_lines.append(f"File: {filename} ({', '.join(stats)})")
+
+        # Keep the most informative changed lines of each file; the prompt builder decides how many to show
+        changes, total_changes, patch_hash = select_changes(filename, file.get('patch'), additions, deletions)
+        self.files.append(FileChange(
+            filename=filename,
+            status=file.get('status', ''),
+            additions=additions,
+            deletions=deletions,
+            changes=changes,
+            total_changes=total_changes,
+            patch_hash=patch_hash
+        ))
+
+        if changes:
+            change_text = '\n'.join(changes)
+            if total_changes > len(changes):
+                change_text += "\n... (more changes not shown)"
+            self._diff_sections.append(f"File: {filename}\n{change_text}")
+
+    def aggregate(self) -> str:
+        """One line describing the whole file list when not every file was summarized, else empty"""
+        if len(self.files) == self.total_files and not self.incomplete:
+            return ""
+        directories = len(self.directories)
+        return (
+            f"{'At least ' if self.incomplete else ''}{self.total_files} files across "
+            f"{directories} director{'y' if directories == 1 else 'ies'} "
+            f"(+{self.additions}/-{self.deletions} lines); details for the first {len(self.files)}"
+        )
+
+    def result(self) -> Tuple[List[FileChange], str, str]:
+        """The FileChange records plus the rendered summary and truncated diff"""
+        summary_lines = list(self._summary_lines)
+        aggregate = self.aggregate()
+        if aggregate:
+            summary_lines.append(aggregate)
+        return (
+            self.files,
+            "\n".join(summary_lines) if summary_lines else "\nNo changes found\n",
+            "\n\n".join(self._diff_sections) if self._diff_sections else "\nNo diff available\n"
+        )
+
+def process_files(files_changed: Iterable[Dict]) -> Tuple[List[FileChange], str, str]:
+    """Turn GitHub file entries into FileChange records plus the rendered summary and truncated diff"""
+    summary = FileSummary()
+    summary.add_page(files_changed)
+    return summary.result()
+
+def to_commit_data(commit_data: Dict, files_changed: Union[None, List[Dict], FileSummary]) -> CommitData:
+    """
+    Keep only the processed fields the prompt needs from a GitHub commit payload.
+    Pass files_changed=None for listings that carry no file data (message-only records),
+    or a FileSummary already fed with the commit's file pages.
+    """
+    summary = files_changed if isinstance(files_changed, FileSummary) else FileSummary()
+    if not isinstance(files_changed, FileSummary):
+        summary.add_page(files_changed or [])
+    files, changes_summary, truncated_diff = summary.result()
+    if files_changed is None:
+        changes_summary, truncated_diff = "", ""
+    author = commit_data.get('author') or {}
+    commit_info = commit_data.get('commit') or {}
+    return CommitData(
+        sha=commit_data.get('sha', ''),
+        url=commit_data.get('url', ''),
+        github_url=commit_data.get('html_url', ''),
+        message=commit_info.get('message', ''),
+        author=author.get('login') or (commit_info.get('author') or {}).get('name', ''),
+        date=(commit_info.get('author') or {}).get('date', ''),
+        changes_summary=changes_summary,
+        truncated_diff=truncated_diff,
+        files=files,
+        files_summary=summary.aggregate()
+    )
@@ -0,0 +1,234 @@
+import logging
+import queue
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.changelog import IndexedCommit, SyncWatermark
+from app.services.commit_source import CommitSource
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a background sync's results
+_SYNC_DONE = object()
+
+
+def to_utc(value: datetime) -> datetime:
+    """Naive UTC datetime for storage; naive inputs are taken to already be UTC"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class CommitIndex:
+    """
+    Local per-repository index of commit SHAs by committed date.
+
+    Each repository has a watermark recording the committed-date interval the index
+    is known to be complete for. A date-range query only asks the commit source for
+    the parts of the range outside that interval: older history the first time it is
+    requested, and new commits since the watermark. The newest overlap_seconds before
+    the watermark are re-listed so commits that land with older committer dates
+    (e.g. merged branches) are still picked up; that refresh happens at most every
+    min_sync_seconds per repository.
+    """
+
+    def __init__(self, overlap_seconds: int, min_sync_seconds: int, enabled: bool = True):
+        self.enabled = enabled
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.min_sync = timedelta(seconds=min_sync_seconds)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.syncs = 0
+        self.indexed_queries = 0
+
+    def shas_between(self, source: CommitSource, repository: str, since: datetime, until: datetime) -> List[str]:
+        """SHAs committed within [since, until], newest first, syncing only what the index lacks"""
+        if not self.enabled:
+            return source.list_shas(repository, since, until)
+
+        since, until = to_utc(since), to_utc(until)
+        with self._lock(repository):
+            for _ in self._iter_sync(source, repository, since, until):
+                pass
+        return self._query(repository, since, until)
+
+    def iter_shas_between(self, source: CommitSource, repository: str, since: datetime, until: datetime) -> Iterator[str]:
+        """
+        Streaming shas_between: commits listed from the source are yielded as they arrive,
+        then the rest of the range from the index. Only the indexed part is ordered.
+        """
+        if not self.enabled:
+            for sha, _ in source.iter_commits(repository, since, until):
+                yield sha
+            return
+
+        since, until = to_utc(since), to_utc(until)
+        # The sync runs in its own thread and holds the repository lock only while listing,
+        # so a slow consumer of this generator never blocks other requests for the repository
+        results: "queue.Queue" = queue.Queue()
+
+        def sync() -> None:
+            try:
+                with self._lock(repository):
+                    for item in self._iter_sync(source, repository, since, until):
+                        results.put(item)
+            except BaseException as e:
+                results.put(e)
+            finally:
+                results.put(_SYNC_DONE)
+
+        threading.Thread(target=sync, name="commit-index-sync", daemon=True).start()
+        yielded = set()
+        while True:
+            item = results.get()
+            if item is _SYNC_DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            sha, committed_at = item
+            if since <= committed_at <= until and sha not in yielded:
+                yielded.add(sha)
+                yield sha
+        for sha in self._query(repository, since, until):
+            if sha not in yielded:
+                yield sha
+
+    def _lock(self, repository: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(repository.lower(), threading.Lock())
+
+    def _query(self, repository: str, since: datetime, until: datetime) -> List[str]:
+        db = SessionLocal()
+        try:
+            rows = db.query(IndexedCommit.sha).filter(
+                IndexedCommit.repository == repository.lower(),
+                IndexedCommit.committed_at >= since,
+                IndexedCommit.committed_at <= until
+            ).order_by(IndexedCommit.committed_at.desc(), IndexedCommit.sha).all()
+            self.indexed_queries += 1
+            return [sha for (sha,) in rows]
+        finally:
+            db.close()
+
+    def _iter_sync(
+        self,
+        source: CommitSource,
+        repository: str,
+        since: datetime,
+        until: datetime
+    ) -> Iterator[Tuple[str, datetime]]:
+        """List the windows the index lacks, yielding each commit (UTC) as it is indexed"""
+        key = repository.lower()
+        now = datetime.utcnow()
+        until = min(until, now)
+
+        db = SessionLocal()
+        try:
+            watermark = db.get(SyncWatermark, key)
+            if watermark is not None and watermark.source != source.name:
+                # Indexed from another source; start over rather than mix histories
+                db.query(IndexedCommit).filter(IndexedCommit.repository == key).delete(synchronize_session=False)
+                db.delete(watermark)
+                db.commit()
+                watermark = None
+
+            missing = self.missing_windows(watermark, since, until, now)
+            if not missing:
+                return
+
+            for window_since, window_until in missing:
+                newest: Optional[Tuple[str, datetime]] = None
+                count = 0
+                for sha, committed_at in source.iter_commits(
+                    repository,
+                    window_since.replace(tzinfo=timezone.utc),
+                    window_until.replace(tzinfo=timezone.utc)
+                ):
+                    committed_at = to_utc(committed_at)
+                    db.merge(IndexedCommit(
+                        repository=key,
+                        sha=sha,
+                        committed_at=committed_at,
+                        indexed_at=now
+                    ))
+                    if newest is None or committed_at > newest[1]:
+                        newest = (sha, committed_at)
+                    count += 1
+                    yield sha, committed_at
+                self.syncs += 1
+                # The watermark only moves once the whole window has been listed
+                watermark = self._advance(db, watermark, key, source.name, window_since, window_until, newest, now)
+                logger.info(f"Indexed {count} commits for {key} between {window_since} and {window_until}")
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def missing_windows(
+        self,
+        watermark: Optional[SyncWatermark],
+        since: datetime,
+        until: datetime,
+        now: datetime
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Windows to list from the source to answer [since, until] (until already capped at now).
+
+        Windows end at `until`, not at now, so a query ending in the past never lists up to
+        today; they start at the edge of the covered interval so it stays contiguous.
+        """
+        if watermark is None:
+            return [(since, until)] if since <= until else []
+
+        missing: List[Tuple[datetime, datetime]] = []
+        if since < watermark.covered_since:
+            missing.append((since, watermark.covered_since))
+        refresh_from = watermark.covered_until - self.overlap
+        recently_synced = watermark.synced_at is not None and now - watermark.synced_at < self.min_sync
+        if until > refresh_from and not recently_synced:
+            missing.append((refresh_from, until))
+        return missing
+
+    def _advance(
+        self,
+        db,
+        watermark: Optional[SyncWatermark],
+        key: str,
+        source_name: str,
+        window_since: datetime,
+        window_until: datetime,
+        newest: Optional[Tuple[str, datetime]],
+        now: datetime
+    ) -> SyncWatermark:
+        if watermark is None:
+            watermark = SyncWatermark(repository=key, source=source_name, covered_since=window_since, covered_until=window_until)
+            db.add(watermark)
+        watermark.covered_since = min(watermark.covered_since, window_since)
+        watermark.covered_until = max(watermark.covered_until, window_until)
+        if window_until >= now:
+            watermark.synced_at = now
+        if newest is not None and (
+            watermark.last_committed_at is None or newest[1] >= watermark.last_committed_at
+        ):
+            watermark.last_sha, watermark.last_committed_at = newest
+        return watermark
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "syncs": self.syncs,
+            "indexed_queries": self.indexed_queries
+        }
+
+
+commit_index = CommitIndex(
+    overlap_seconds=settings.COMMIT_INDEX_OVERLAP_SECONDS,
+    min_sync_seconds=settings.COMMIT_INDEX_MIN_SYNC_SECONDS,
+    enabled=settings.COMMIT_INDEX_ENABLED
+)
@@ -0,0 +1,58 @@
+import re
+from datetime import datetime
+from typing import Iterator, List, Tuple
+
+from app.exceptions import ChangelogError
+from app.services.commit_data import CommitData, FileChange
+
+
+def validate_sha(sha: str) -> None:
+    """Raise invalid_format unless sha is a full 40-character hexadecimal string"""
+    if not re.match(r'^[0-9a-f]{40}$', sha):
+        raise ChangelogError(
+            error_type="invalid_format",
+            message=f"Invalid commit SHA format: {sha}. Please provide a full 40-character hexadecimal string.",
+            details={
+                "sha": sha,
+                "expected_format": "40-character hexadecimal string",
+                "example": "a1b2c3d4e5f6a7b8c9d0e1f2a3b4c5d6e7f8a9b0"
+            }
+        )
+
+
+class CommitSource:
+    """
+    Where ChangelogGenerator reads commits from.
+
+    Implementations raise ChangelogError for every failure so callers can report
+    errors uniformly regardless of the backend.
+    """
+
+    name = ""
+
+    def ensure_repository(self, repository: str) -> None:
+        """Raise repository_not_found unless the repository can be read"""
+        raise NotImplementedError
+
+    def fetch_commit(self, repository: str, sha: str) -> CommitData:
+        """Return a single commit with its file changes"""
+        raise NotImplementedError
+
+    def list_shas(self, repository: str, since: datetime, until: datetime) -> List[str]:
+        """Return SHAs of commits on the default branch committed within [since, until], newest first"""
+        return [sha for sha, _ in self.list_commits(repository, since, until)]
+
+    def list_commits(self, repository: str, since: datetime, until: datetime) -> List[Tuple[str, datetime]]:
+        """Like list_shas, with each commit's committer date (timezone-aware)"""
+        raise NotImplementedError
+
+    def iter_commits(self, repository: str, since: datetime, until: datetime) -> Iterator[Tuple[str, datetime]]:
+        """Streaming list_commits: yield commits as they are enumerated, in no guaranteed order"""
+        yield from self.list_commits(repository, since, until)
+
+    def compare(self, repository: str, base: str, head: str) -> Tuple[List[CommitData], List[FileChange]]:
+        """
+        Return the commits reachable from head but not base (oldest first), plus combined file
+        changes for the range when per-commit changes are not available
+        """
+        raise NotImplementedError
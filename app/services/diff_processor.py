@@ -0,0 +1,170 @@
+import hashlib
+import heapq
+import re
+from typing import Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.prompt_builder import file_priority
+
+# Changed lines kept per file; tests, docs and config keep half
+MAX_CHANGES_PER_FILE = settings.MAX_CHANGES_PER_FILE
+
+# Patch lines read per file before parsing stops; totals then come from the file stats
+MAX_SCAN_LINES = settings.DIFF_MAX_SCAN_LINES
+
+# Hunks held as candidates per file while scanning; the lowest-ranked are dropped
+MAX_CANDIDATE_HUNKS = 32
+
+BINARY_EXTENSIONS = {
+    "png", "jpg", "jpeg", "gif", "bmp", "ico", "webp", "svgz", "pdf", "psd",
+    "zip", "gz", "tgz", "bz2", "xz", "7z", "rar", "jar", "war", "whl", "egg",
+    "so", "dylib", "dll", "exe", "bin", "o", "a", "class", "pyc", "wasm",
+    "woff", "woff2", "ttf", "otf", "eot", "mp3", "mp4", "mov", "avi", "wav", "ogg",
+    "sqlite", "db", "parquet", "pkl", "npy"
+}
+
+SIGNATURE_PATTERN = re.compile(
+    r'^\s*(?:@\w[\w.]*\s*)?(?:export\s+)?(?:default\s+)?(?:pub(?:\([^)]*\))?\s+)?'
+    r'(?:(?:public|private|protected|internal|static|async|abstract|final|override)\s+)*'
+    r'(?:def|class|func|function|fn|interface|struct|enum|trait|type|impl|module)\b'
+)
+PUBLIC_API_PATTERN = re.compile(
+    r'^\s*(?:export\b|public\b|pub\b|def [A-Za-z]|async def [A-Za-z]|class [A-Za-z]|func (?:\([^)]*\)\s*)?[A-Z]'
+    r'|@(?:app|router|api|bp|blueprint)\.\w+\()'
+)
+IMPORT_PATTERN = re.compile(r'^\s*(?:import\b|from\s+\S+\s+import\b|#include\b|using\s+[\w.]+;|require\(|use\s+[\w:]+)')
+COMMENT_PATTERN = re.compile(r'^\s*(?:#|//|/\*|\*|--|<!--)')
+
+
+def is_binary_path(filename: str) -> bool:
+    name = filename.rsplit('/', 1)[-1]
+    return '.' in name and name.rsplit('.', 1)[-1].lower() in BINARY_EXTENSIONS
+
+
+def iter_lines(text: str) -> Iterator[str]:
+    """Lines of `text` one at a time, without building the whole list"""
+    start = 0
+    length = len(text)
+    while start < length:
+        end = text.find('\n', start)
+        if end == -1:
+            end = length
+        yield text[start:end]
+        start = end + 1
+
+
+def line_score(line: str) -> float:
+    """How much a changed line (without its +/- marker) says about the change"""
+    if not line.strip():
+        return 0.0
+    if IMPORT_PATTERN.match(line):
+        return 0.02
+    if COMMENT_PATTERN.match(line):
+        return 0.05
+    # Plain lines count for little, so one signature outweighs a long run of body edits
+    score = 0.25
+    if SIGNATURE_PATTERN.match(line):
+        score += 4.0
+    if PUBLIC_API_PATTERN.match(line):
+        score += 3.0
+    return score
+
+
+class Hunk:
+    __slots__ = ("position", "quota", "kept", "size", "score")
+
+    def __init__(self, position: int, context: str, quota: int):
+        self.position = position
+        self.quota = quota
+        # The quota best lines seen so far as (score, -offset, line); ties keep earlier lines
+        self.kept: List[Tuple[float, int, str]] = []
+        self.size = 0
+        # The enclosing function or class named in the @@ header
+        self.score = 1.0 if context.strip() else 0.0
+
+    def add(self, line: str) -> None:
+        """Score a changed line towards the whole hunk, keeping it if it is among the best quota lines"""
+        score = line_score(line[1:])
+        self.score += score
+        entry = (score, -self.size, line)
+        self.size += 1
+        if len(self.kept) < self.quota:
+            heapq.heappush(self.kept, entry)
+        elif self.kept[0] < entry:
+            heapq.heapreplace(self.kept, entry)
+
+    def lines(self, limit: int) -> List[str]:
+        """The best `limit` kept lines in file order"""
+        best = heapq.nlargest(limit, self.kept)
+        return [line for _, _, line in sorted(best, key=lambda entry: -entry[1])]
+
+    def __lt__(self, other: "Hunk") -> bool:
+        # Ties keep the earlier hunk
+        return (self.score, -self.position) < (other.score, -other.position)
+
+
+def select_changes(
+    filename: str, patch: Optional[str], additions: int = 0, deletions: int = 0
+) -> Tuple[List[str], int, Optional[str]]:
+    """
+    Pick the most informative added/removed lines of a file's patch.
+
+    Returns (changed lines, total changed lines, patch hash). The hash covers every
+    changed line of the patch, ignoring whitespace and line numbers, and is None
+    unless the whole patch was read. Binary files, lockfiles, vendored
+    and generated code get no lines. Otherwise the patch is read hunk by hunk, at
+    most MAX_SCAN_LINES lines, keeping a bounded set of candidate hunks ranked by
+    all of their lines: signatures and public API changes rank highest, import
+    shuffles, comments and blank lines lowest. The best hunks fill the per-file
+    quota with their best lines, returned in file order.
+    """
+    stat_total = (additions or 0) + (deletions or 0)
+    if not patch or is_binary_path(filename) or file_priority(filename) == 2:
+        return [], stat_total, None
+
+    quota = MAX_CHANGES_PER_FILE if file_priority(filename) == 0 else max(1, MAX_CHANGES_PER_FILE // 2)
+    candidates: List[Hunk] = []
+    current: Optional[Hunk] = None
+    counted = 0
+    complete = True
+    digest = hashlib.sha1()
+
+    def retire(hunk: Optional[Hunk]) -> None:
+        if hunk is None or not hunk.kept:
+            return
+        if len(candidates) < MAX_CANDIDATE_HUNKS:
+            heapq.heappush(candidates, hunk)
+        elif candidates[0] < hunk:
+            heapq.heapreplace(candidates, hunk)
+
+    for scanned, line in enumerate(iter_lines(patch)):
+        if scanned >= MAX_SCAN_LINES:
+            complete = False
+            break
+        if line.startswith('@@'):
+            retire(current)
+            end = line.find('@@', 2)
+            current = Hunk(scanned, line[end + 2:] if end != -1 else "", quota)
+        elif line.startswith('+') or line.startswith('-'):
+            if current is None:
+                if line.startswith('+++') or line.startswith('---'):
+                    # File headers of a full unified diff
+                    continue
+                current = Hunk(scanned, "", quota)
+            counted += 1
+            digest.update(f"{line[:1]}{''.join(line[1:].split())}\n".encode())
+            current.add(line)
+    retire(current)
+
+    kept: List[Tuple[int, List[str]]] = []
+    remaining = quota
+    for hunk in sorted(candidates, reverse=True):
+        if remaining <= 0:
+            break
+        lines = hunk.lines(remaining)
+        kept.append((hunk.position, lines))
+        remaining -= len(lines)
+    kept.sort()
+
+    total = counted if complete else max(counted, stat_total)
+    return [line for _, lines in kept for line in lines], total, digest.hexdigest() if complete else None
@@ -0,0 +1,287 @@
+import logging
+import os
+import re
+import subprocess
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.exceptions import ChangelogError
+from app.services.commit_data import CommitData, FileChange, FileSummary
+from app.services.commit_source import CommitSource, validate_sha
+
+logger = logging.getLogger(__name__)
+
+REPOSITORY_PATTERN = re.compile(r'^[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+$')
+
+# git diff-tree status letters mapped to the GitHub file statuses
+FILE_STATUSES = {
+    "A": "added",
+    "D": "removed",
+    "M": "modified",
+    "R": "renamed",
+    "C": "copied",
+    "T": "changed"
+}
+
+# Unit separator between fields of `git show --format`
+FIELD_SEPARATOR = "\x1f"
+
+
+class LocalGitCommitSource(CommitSource):
+    """
+    Commit source backed by bare mirror clones on local disk.
+
+    Each repository is cloned once with `git clone --mirror` and then refreshed with an
+    incremental `git fetch` at most every GIT_MIRROR_REFRESH_SECONDS, so listing, diffing
+    and comparing commits costs local git invocations instead of GitHub API requests.
+    """
+
+    name = "git"
+
+    def __init__(
+        self,
+        mirror_root: str,
+        url_template: str,
+        refresh_seconds: int = settings.GIT_MIRROR_REFRESH_SECONDS,
+        timeout: int = settings.GIT_COMMAND_TIMEOUT_SECONDS
+    ):
+        self.mirror_root = mirror_root
+        self.url_template = url_template
+        self.refresh_seconds = refresh_seconds
+        self.timeout = timeout
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._refreshed_at: Dict[str, float] = {}
+
+    def mirror_path(self, repository: str) -> str:
+        if not REPOSITORY_PATTERN.match(repository) or '..' in repository:
+            raise ChangelogError(
+                error_type="invalid_input",
+                message=f"Invalid repository name: {repository}",
+                repository=repository,
+                details={"expected_format": "owner/repo"}
+            )
+        return os.path.join(self.mirror_root, repository.lower().replace('/', '__') + ".git")
+
+    def sync(self, repository: str, force: bool = False) -> str:
+        """Clone the mirror on first use, otherwise fetch when the last refresh is older than refresh_seconds"""
+        path = self.mirror_path(repository)
+        key = repository.lower()
+        with self._locks_guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            refreshed_at = self._refreshed_at.get(key)
+            if refreshed_at is not None and not force and time.monotonic() - refreshed_at < self.refresh_seconds:
+                return path
+
+            if not os.path.isdir(path):
+                os.makedirs(self.mirror_root, exist_ok=True)
+                url = self.url_template.format(repository=repository)
+                logger.info(f"Cloning mirror of {repository} into {path}")
+                try:
+                    self._run(["git", "clone", "--mirror", "--quiet", url, path], repository, "clone")
+                except ChangelogError as e:
+                    raise ChangelogError(
+                        error_type="repository_not_found",
+                        message=f"Repository not found: {repository}",
+                        repository=repository,
+                        details=e.details
+                    )
+            else:
+                self._git(path, repository, "fetch", "--prune", "--quiet", "origin")
+
+            self._refreshed_at[key] = time.monotonic()
+            return path
+
+    def ensure_repository(self, repository: str) -> None:
+        self.sync(repository)
+
+    def fetch_commit(self, repository: str, sha: str) -> CommitData:
+        validate_sha(sha)
+        path = self.sync(repository)
+        if not self._has_commit(path, repository, sha):
+            # The commit may be newer than the last refresh
+            path = self.sync(repository, force=True)
+            if not self._has_commit(path, repository, sha):
+                raise ChangelogError(
+                    error_type="commit_not_found",
+                    message=f"Commit not found: {sha} in repository {repository}",
+                    missing_shas=[sha],
+                    repository=repository,
+                    details={"sha": sha, "error": "Not found"}
+                )
+        return self._commit_data(path, repository, sha)
+
+    def list_commits(self, repository: str, since: datetime, until: datetime) -> List[Tuple[str, datetime]]:
+        path = self.sync(repository)
+        output = self._git(
+            path, repository, "log", "--format=%H %cI",
+            f"--since={since.isoformat()}", f"--until={until.isoformat()}", "HEAD"
+        )
+        return [
+            (sha, datetime.fromisoformat(date.replace('Z', '+00:00')))
+            for sha, date in (line.split(' ', 1) for line in output.splitlines() if line)
+        ]
+
+    def compare(self, repository: str, base: str, head: str) -> Tuple[List[CommitData], List[FileChange]]:
+        """Full per-commit data for base..head, so no combined range file list is needed"""
+        path = self.sync(repository)
+        base_sha = self._resolve(path, repository, base)
+        head_sha = self._resolve(path, repository, head)
+        shas = self._git(path, repository, "rev-list", "--reverse", f"{base_sha}..{head_sha}").split()
+        return [self._commit_data(path, repository, sha) for sha in shas], []
+
+    def _resolve(self, path: str, repository: str, ref: str) -> str:
+        if ref.startswith('-'):
+            raise ChangelogError(
+                error_type="ref_not_found",
+                message="Base or head ref not found",
+                repository=repository,
+                details={"ref": ref}
+            )
+        try:
+            return self._git(path, repository, "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}").strip()
+        except ChangelogError:
+            raise ChangelogError(
+                error_type="ref_not_found",
+                message="Base or head ref not found",
+                repository=repository,
+                details={"ref": ref}
+            )
+
+    def _has_commit(self, path: str, repository: str, sha: str) -> bool:
+        try:
+            self._git(path, repository, "cat-file", "-e", f"{sha}^{{commit}}")
+            return True
+        except ChangelogError:
+            return False
+
+    def _commit_data(self, path: str, repository: str, sha: str) -> CommitData:
+        """Render a commit the way GitHub's commit endpoint would describe it"""
+        fields = self._git(
+            path, repository, "show", "-s",
+            f"--format=%an{FIELD_SEPARATOR}%aI{FIELD_SEPARATOR}%B", sha
+        ).split(FIELD_SEPARATOR, 2)
+        author, date, message = (fields + ["", "", ""])[:3]
+
+        parents = self._git(path, repository, "rev-list", "--parents", "-n", "1", sha).split()[1:]
+        # Diff against the first parent like GitHub; root commits diff against the empty tree
+        revisions = [parents[0], sha] if parents else ["--root", sha]
+        summary = FileSummary()
+        summary.add_page(self._file_changes(path, repository, revisions))
+        files, changes_summary, truncated_diff = summary.result()
+
+        return CommitData(
+            sha=sha,
+            url=f"{settings.GITHUB_API_URL}/repos/{repository}/commits/{sha}",
+            github_url=f"https://github.com/{repository}/commit/{sha}",
+            message=message.strip(),
+            author=author,
+            date=date,
+            changes_summary=changes_summary,
+            truncated_diff=truncated_diff,
+            files=files,
+            files_summary=summary.aggregate()
+        )
+
+    def _file_changes(self, path: str, repository: str, revisions: List[str]) -> List[Dict]:
+        """GitHub-style file entries (filename, status, additions, deletions, patch) for a diff"""
+        diff_args = ["diff-tree", "-r", "-M", "--no-commit-id", "-z"]
+
+        files: List[Dict] = []
+        by_name: Dict[str, Dict] = {}
+        tokens = self._git(path, repository, *diff_args, "--name-status", *revisions).split('\0')
+        index = 0
+        while index < len(tokens) and tokens[index]:
+            status = tokens[index]
+            # Renames and copies carry the old and the new path
+            filename = tokens[index + 2] if status[0] in "RC" else tokens[index + 1]
+            index += 3 if status[0] in "RC" else 2
+            file = {"filename": filename, "status": FILE_STATUSES.get(status[0], "modified"), "additions": 0, "deletions": 0}
+            files.append(file)
+            by_name[filename] = file
+
+        tokens = self._git(path, repository, *diff_args, "--numstat", *revisions).split('\0')
+        index = 0
+        while index < len(tokens) and tokens[index]:
+            additions, deletions, filename = tokens[index].split('\t', 2)
+            index += 1
+            if not filename:
+                # Renames: "additions\tdeletions\t\0old\0new"
+                filename = tokens[index + 1]
+                index += 2
+            file = by_name.get(filename)
+            if file is not None:
+                # Binary files report "-"
+                file["additions"] = int(additions) if additions.isdigit() else 0
+                file["deletions"] = int(deletions) if deletions.isdigit() else 0
+
+        patch = self._git(path, repository, "diff-tree", "-r", "-M", "--no-commit-id", "--no-color", "-p", *revisions)
+        for filename, hunks in _split_patch(patch):
+            file = by_name.get(filename)
+            if file is not None:
+                file["patch"] = hunks
+        return files
+
+    def _git(self, path: str, repository: str, *args: str) -> str:
+        return self._run(["git", "-c", "core.quotePath=false", "--git-dir", path, *args], repository, args[0])
+
+    def _run(self, command: List[str], repository: str, subcommand: Optional[str] = None) -> str:
+        try:
+            result = subprocess.run(
+                command,
+                capture_output=True,
+                timeout=self.timeout,
+                env=dict(os.environ, GIT_TERMINAL_PROMPT="0")
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise ChangelogError(
+                error_type="git_error",
+                message=f"Failed to run git: {str(e)}",
+                repository=repository,
+                details={"command": subcommand or command[1], "error": str(e)}
+            )
+        if result.returncode != 0:
+            raise ChangelogError(
+                error_type="git_error",
+                message=f"git {subcommand or command[1]} failed",
+                repository=repository,
+                details={
+                    "returncode": result.returncode,
+                    "error": result.stderr.decode('utf-8', errors='replace').strip()
+                }
+            )
+        return result.stdout.decode('utf-8', errors='replace')
+
+
+def _split_patch(patch: str) -> List[Tuple[str, str]]:
+    """Split `git diff-tree -p` output into (new filename, hunks) pairs"""
+    sections: List[Tuple[str, str]] = []
+    for section in re.split(r'^diff --git ', patch, flags=re.MULTILINE)[1:]:
+        lines = section.split('\n')
+        filename: Optional[str] = None
+        hunk_start = len(lines)
+        for position, line in enumerate(lines):
+            if line.startswith('@@'):
+                hunk_start = position
+                break
+            if line.startswith('+++ b/'):
+                filename = _header_path(line[len('+++ b/'):])
+            elif line.startswith('--- a/') and filename is None:
+                filename = _header_path(line[len('--- a/'):])
+            elif line.startswith('rename to '):
+                filename = line[len('rename to '):]
+        if filename is None:
+            # Binary or mode-only changes: "a/<path> b/<path>"
+            filename = lines[0].split(' b/', 1)[-1]
+        sections.append((filename, '\n'.join(lines[hunk_start:])))
+    return sections
+
+
+def _header_path(path: str) -> str:
+    """Path of a ---/+++ header line; git ends it with a TAB when the path contains a space"""
+    return path[:-1] if path.endswith('\t') else path
@@ -0,0 +1,258 @@
+import hashlib
+import json
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.core.metrics import GITHUB_RATE_LIMIT_REMAINING, GITHUB_REQUEST_SECONDS, GITHUB_REQUESTS
+from app.db.session import SessionLocal
+from app.models.changelog import CachedHTTPResponse
+from app.services.cache import EvictionSchedule, LRUCache
+from app.services.rate_limiter import is_rate_limited, rate_limit_error, rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# Response headers replayed when a cached body is served after a 304
+REPLAYED_HEADERS = ("ETag", "Last-Modified", "Link", "Content-Type")
+
+# Request headers that change the response representation
+VARYING_HEADERS = ("Accept", "Authorization")
+
+# Commit details addressed by full SHA never change and are kept processed by commit_cache;
+# file-list pages after the first come from Link headers in the /repositories/<id>/ form
+IMMUTABLE_URL_PATTERN = re.compile(r'/(?:repos/[^/]+/[^/]+|repositories/\d+)/commits/[0-9a-f]{40}(?:\?|$)')
+
+
+def create_session(pool_connections: int, pool_maxsize: int) -> requests.Session:
+    """Keep-alive session so GitHub calls reuse TCP/TLS connections across requests and threads"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def request_cache_key(url: str, params: Optional[Dict], headers: Dict[str, str]) -> str:
+    payload = json.dumps(
+        [url, sorted((params or {}).items()), [headers.get(name, "") for name in VARYING_HEADERS]],
+        default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class GitHubHTTPCache:
+    """
+    Conditional GET layer for GitHub API calls, scheduled through the shared rate limiter.
+
+    Successful responses carrying an ETag or Last-Modified header are stored with
+    their body; later requests for the same URL, parameters and credentials send
+    If-None-Match / If-Modified-Since. A 304 costs nothing against the GitHub rate
+    limit and is answered with the stored body as a regular 200 response. Commit
+    details addressed by full SHA are neither looked up nor stored: they never change
+    and commit_cache already keeps them processed. The table is bounded by GITHUB_HTTP_CACHE_MAX_ENTRIES
+    with least recently used eviction.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        memory_entries: int,
+        enabled: bool = True,
+        pool_connections: int = settings.GITHUB_HTTP_POOL_CONNECTIONS,
+        pool_maxsize: int = settings.GITHUB_HTTP_POOL_MAXSIZE,
+        timeout: float = settings.GITHUB_HTTP_TIMEOUT_SECONDS
+    ):
+        self.enabled = enabled
+        self.session = create_session(pool_connections, pool_maxsize)
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.eviction = EvictionSchedule(max_entries)
+        self.memory = LRUCache(memory_entries)
+        self.requests = 0
+        self.not_modified = 0
+        self.stored = 0
+        self.evictions = 0
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, params: Optional[Dict] = None) -> requests.Response:
+        """requests.get with rate-limit scheduling and revalidation of stored responses"""
+        headers = dict(headers or {})
+        self.requests += 1
+        if not self.enabled or IMMUTABLE_URL_PATTERN.search(url):
+            return self._send(url, headers, params)
+
+        key = request_cache_key(url, params, headers)
+        cached = self._lookup(key)
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = self._send(url, headers, params)
+
+        if response.status_code == 304 and cached is not None:
+            self.not_modified += 1
+            self._touch(key)
+            return self._replay(response, cached)
+
+        if response.status_code == 200 and (response.headers.get("ETag") or response.headers.get("Last-Modified")):
+            self._store(key, url, response)
+        return response
+
+    def _send(self, url: str, headers: Dict[str, str], params: Optional[Dict]) -> requests.Response:
+        """
+        Send once capacity is available; rate-limited responses wait and are retried.
+        One deadline covers the whole call, so repeated 403/429s fail after max_wait_seconds.
+        """
+        authorization = headers.get("Authorization")
+        deadline = rate_limiter.deadline()
+        while True:
+            rate_limiter.acquire(authorization, deadline)
+            with GITHUB_REQUEST_SECONDS.time():
+                response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
+            GITHUB_REQUESTS.inc(status=response.status_code)
+            remaining = response.headers.get("X-RateLimit-Remaining")
+            if remaining is not None and remaining.isdigit():
+                GITHUB_RATE_LIMIT_REMAINING.set(int(remaining))
+            rate_limiter.record(authorization, response)
+            if not (rate_limiter.enabled and is_rate_limited(response)):
+                return response
+            if time.monotonic() >= deadline:
+                raise rate_limit_error(rate_limiter.max_wait_seconds)
+
+    def close(self) -> None:
+        """Close pooled connections (on application shutdown)"""
+        self.session.close()
+
+    def _lookup(self, key: str) -> Optional[Dict]:
+        cached = self.memory.get(key)
+        if cached is not None:
+            return cached
+
+        db = SessionLocal()
+        try:
+            row = db.get(CachedHTTPResponse, key)
+            if row is None:
+                return None
+            cached = {
+                "etag": row.etag,
+                "last_modified": row.last_modified,
+                "headers": json.loads(row.headers) if row.headers else {},
+                "body": row.body
+            }
+            self.memory.set(key, cached)
+            return cached
+        except Exception as e:
+            logger.warning(f"GitHub HTTP cache lookup failed: {str(e)}")
+            return None
+        finally:
+            db.close()
+
+    def _touch(self, key: str) -> None:
+        db = SessionLocal()
+        try:
+            db.query(CachedHTTPResponse).filter(CachedHTTPResponse.key == key).update({
+                CachedHTTPResponse.last_accessed: datetime.utcnow(),
+                CachedHTTPResponse.revalidated_count: CachedHTTPResponse.revalidated_count + 1
+            }, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"GitHub HTTP cache update failed: {str(e)}")
+        finally:
+            db.close()
+
+    def _store(self, key: str, url: str, response: requests.Response) -> None:
+        cached = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "headers": {name: response.headers[name] for name in REPLAYED_HEADERS if name in response.headers},
+            "body": response.text
+        }
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            db.merge(CachedHTTPResponse(
+                key=key,
+                url=url,
+                etag=cached["etag"],
+                last_modified=cached["last_modified"],
+                headers=json.dumps(cached["headers"]),
+                body=cached["body"],
+                revalidated_count=0,
+                created_at=now,
+                last_accessed=now
+            ))
+            db.commit()
+            self.memory.set(key, cached)
+            self.stored += 1
+            self._evict(db)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"GitHub HTTP cache store failed: {str(e)}")
+        finally:
+            db.close()
+
+    def _replay(self, not_modified: requests.Response, cached: Dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = not_modified.url
+        response.request = not_modified.request
+        response.encoding = "utf-8"
+        response._content = cached["body"].encode("utf-8")
+        response.headers = CaseInsensitiveDict(cached["headers"])
+        # Rate-limit headers of the 304 itself are current; keep them
+        for name, value in not_modified.headers.items():
+            if name.lower().startswith("x-ratelimit-"):
+                response.headers[name] = value
+        return response
+
+    def _evict(self, db) -> None:
+        if not self.eviction.due():
+            return
+        rows = db.query(func.count(CachedHTTPResponse.key)).scalar()
+        overflow = self.eviction.overflow(rows)
+        self.eviction.counted(rows - overflow)
+        if overflow <= 0:
+            return
+
+        stale = [
+            key for (key,) in db.query(CachedHTTPResponse.key).order_by(
+                CachedHTTPResponse.last_accessed
+            ).limit(overflow).all()
+        ]
+        db.query(CachedHTTPResponse).filter(
+            CachedHTTPResponse.key.in_(stale)
+        ).delete(synchronize_session=False)
+        db.commit()
+        for key in stale:
+            self.memory.delete(key)
+        self.evictions += len(stale)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "not_modified_ratio": round(self.not_modified / self.requests, 4) if self.requests else 0.0,
+            "stored": self.stored,
+            "evictions": self.evictions,
+            "max_entries": self.max_entries,
+            "memory": self.memory.stats()
+        }
+
+
+github_http = GitHubHTTPCache(
+    max_entries=settings.GITHUB_HTTP_CACHE_MAX_ENTRIES,
+    memory_entries=settings.GITHUB_HTTP_CACHE_MEMORY_ENTRIES,
+    enabled=settings.GITHUB_HTTP_CACHE_ENABLED
+)
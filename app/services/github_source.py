@@ -0,0 +1,413 @@
+import logging
+import math
+import time
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlparse
+
+import requests
+
+from app.core.config import settings
+from app.exceptions import ChangelogError
+from app.services.cache import LRUCache
+from app.services.commit_data import CommitData, FileChange, FileSummary, process_files, to_commit_data
+from app.services.commit_source import CommitSource, validate_sha
+from app.services.github_http import github_http
+
+logger = logging.getLogger(__name__)
+
+GITHUB_FETCH_CONCURRENCY = settings.GITHUB_FETCH_CONCURRENCY
+
+# Commits per page from the compare and commits endpoints (GitHub maximum)
+COMPARE_PAGE_SIZE = 100
+COMMITS_PAGE_SIZE = 100
+
+# Pages of a single commit's file list fetched before the rest is left uncounted
+COMMIT_MAX_FILE_PAGES = settings.COMMIT_MAX_FILE_PAGES
+
+# Repository existence checks shared across requests, including not-found results
+repository_cache = LRUCache(maxsize=settings.REPOSITORY_CACHE_MAX_ENTRIES)
+
+# Commits GitHub reported as missing, so repeated requests for a bad SHA skip the API
+missing_commit_cache = LRUCache(maxsize=settings.REPOSITORY_CACHE_MAX_ENTRIES, ttl=settings.COMMIT_NEGATIVE_CACHE_TTL_SECONDS)
+
+
+class GitHubCommitSource(CommitSource):
+    """Commit source backed by the GitHub REST API"""
+
+    name = "github"
+
+    def __init__(self, github_token: Optional[str]):
+        self.github_token = github_token
+
+    def _github_headers(self) -> Dict[str, str]:
+        headers = {
+            "Accept": "application/vnd.github.v3+json"
+        }
+        
+        # Add authentication if token is available
+        if self.github_token:
+            headers["Authorization"] = f"Bearer {self.github_token}"
+        return headers
+
+    def ensure_repository(self, repository: str) -> None:
+        """
+        Validate that a repository exists.
+
+        Found and not-found results are remembered in a TTL cache shared across
+        requests, so each repository is checked at most once per TTL window.
+
+        Raises:
+            ChangelogError: If the repository does not exist or cannot be accessed
+        """
+        key = repository.lower()
+        result = repository_cache.get(key)
+        if result is None:
+            repo_url = f"{settings.GITHUB_API_URL}/repos/{repository}"
+            try:
+                repo_response = github_http.get(repo_url, headers=self._github_headers())
+            except requests.RequestException as e:
+                raise ChangelogError(
+                    error_type="network_error",
+                    message="Failed to connect to GitHub API",
+                    repository=repository,
+                    details={"error": str(e)}
+                )
+            error_msg = None
+            if repo_response.status_code != 200:
+                error_msg = repo_response.json().get('message', 'Unknown error')
+            result = {"status_code": repo_response.status_code, "error": error_msg}
+
+            # Transient failures (rate limits, server errors) are not remembered
+            if repo_response.status_code == 200:
+                repository_cache.set(key, result, ttl=settings.REPOSITORY_CACHE_TTL_SECONDS)
+            elif repo_response.status_code == 404:
+                repository_cache.set(key, result, ttl=settings.REPOSITORY_NEGATIVE_CACHE_TTL_SECONDS)
+
+        if result["status_code"] != 200:
+            raise ChangelogError(
+                error_type="repository_not_found",
+                message=f"Repository not found: {repository}",
+                repository=repository,
+                details={
+                    "error": result["error"],
+                    "status_code": result["status_code"]
+                }
+            )
+
+    def fetch_commit(self, repository: str, sha: str) -> CommitData:
+        """Fetch a specific commit from GitHub API with validation"""
+        try:
+            # Validate SHA format
+            validate_sha(sha)
+            
+            # First validate repository exists (cached across calls)
+            self.ensure_repository(repository)
+            missing = missing_commit_cache.get((repository.lower(), sha))
+            if missing is not None:
+                raise self._commit_not_found(repository, sha, missing)
+            headers = self._github_headers()
+
+            # Get commit details with retry logic
+            commit_url = f"{settings.GITHUB_API_URL}/repos/{repository}/commits/{sha}"
+            max_retries = 3
+            retry_delay = 1  # seconds
+            
+            for attempt in range(max_retries):
+                try:
+                    commit_response = github_http.get(commit_url, headers=headers)
+                    commit_response.raise_for_status()
+                    commit_data = commit_response.json()
+                    break
+                except ChangelogError:
+                    raise
+                except requests.exceptions.HTTPError as e:
+                    # GitHub answers 422 for SHAs that are well-formed but unknown
+                    if e.response.status_code in (404, 422):
+                        missing = {
+                            "error": e.response.json().get('message', 'Not found'),
+                            "status_code": e.response.status_code
+                        }
+                        missing_commit_cache.set((repository.lower(), sha), missing)
+                        raise self._commit_not_found(repository, sha, missing)
+                    elif e.response.status_code == 403:
+                        raise ChangelogError(
+                            error_type="github_rate_limit",
+                            message="GitHub API rate limit exceeded",
+                            details={
+                                "error": e.response.json().get('message', 'Rate limit exceeded'),
+                                "status_code": e.response.status_code
+                            }
+                        )
+                    else:
+                        raise ChangelogError(
+                            error_type="github_api_error",
+                            message=f"GitHub API error: {e.response.status_code}",
+                            details={
+                                "error": e.response.json().get('message', 'Unknown error'),
+                                "status_code": e.response.status_code
+                            }
+                        )
+                except requests.exceptions.RequestException as e:
+                    if attempt == max_retries - 1:  # Last attempt
+                        raise ChangelogError(
+                            error_type="network_error",
+                            message=f"Failed to fetch commit details after {max_retries} attempts",
+                            details={
+                                "error": str(e),
+                                "attempts": max_retries,
+                                "repository": repository,
+                                "sha": sha
+                            }
+                        )
+                    logger.warning(f"Attempt {attempt + 1} failed, retrying in {retry_delay} seconds...")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2  # Exponential backoff
+                    continue
+                except json.JSONDecodeError as e:
+                    if attempt == max_retries - 1:  # Last attempt
+                        raise ChangelogError(
+                            error_type="invalid_response",
+                            message="Invalid response from GitHub API",
+                            details={
+                                "error": str(e),
+                                "attempts": max_retries,
+                                "repository": repository,
+                                "sha": sha
+                            }
+                        )
+                    logger.warning(f"Invalid response format, retrying in {retry_delay} seconds...")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2  # Exponential backoff
+                    continue
+                except Exception as e:
+                    raise ChangelogError(
+                        error_type="unknown_error",
+                        message=f"Unexpected error fetching commit details: {str(e)}",
+                        details={
+                            "error": str(e),
+                            "repository": repository,
+                            "sha": sha
+                        }
+                    )
+            
+            # Summarize the first page of files, then any further pages one at a time
+            summary = FileSummary()
+            summary.add_page(commit_data.pop('files', None) or [])
+            self._add_file_pages(summary, commit_response, headers, repository, sha)
+            return to_commit_data(commit_data, summary)
+            
+        except ChangelogError:
+            raise
+        except Exception as e:
+            raise ChangelogError(
+                error_type="api_error",
+                message=f"Failed to fetch commit details: {str(e)}",
+                details={"sha": sha, "error": str(e)}
+            )
+
+    def _commit_not_found(self, repository: str, sha: str, missing: Dict) -> ChangelogError:
+        return ChangelogError(
+            error_type="commit_not_found",
+            message=f"Commit not found: {sha} in repository {repository}",
+            missing_shas=[sha],
+            repository=repository,
+            details=dict(missing, sha=sha)
+        )
+
+    def _add_file_pages(
+        self,
+        summary: FileSummary,
+        response: requests.Response,
+        headers: Dict[str, str],
+        repository: str,
+        sha: str
+    ) -> None:
+        """
+        Feed the remaining pages of a large commit's file list into the summary.
+        The single-commit endpoint lists up to 300 files per page and links the rest;
+        each page is dropped once summarized. Paging stops at COMMIT_MAX_FILE_PAGES or
+        at the first page that fails, leaving the summary marked incomplete.
+        """
+        next_url = response.links.get('next', {}).get('url')
+        pages = 1
+        while next_url:
+            if pages >= COMMIT_MAX_FILE_PAGES:
+                summary.incomplete = True
+                break
+            try:
+                page = github_http.get(next_url, headers=headers)
+                page.raise_for_status()
+                files = page.json().get('files') or []
+            except (ChangelogError, requests.exceptions.RequestException, ValueError) as e:
+                logger.warning(f"Stopped listing files of {repository}@{sha} after {pages} pages: {e}")
+                summary.incomplete = True
+                break
+            summary.add_page(files)
+            pages += 1
+            next_url = page.links.get('next', {}).get('url')
+
+    def list_commits(self, repository: str, since: datetime, until: datetime) -> List[Tuple[str, datetime]]:
+        """Commits listed for the window, newest first, with pages after the first fetched concurrently"""
+        pages: Dict[int, List[Tuple[str, datetime]]] = {}
+        for number, commits in self._iter_commit_pages(repository, since, until):
+            pages[number] = commits
+        return _dedupe(commit for number in sorted(pages) for commit in pages[number])
+
+    def iter_commits(self, repository: str, since: datetime, until: datetime) -> Iterator[Tuple[str, datetime]]:
+        """Yield commits for the window as their pages arrive (pages may complete out of order)"""
+        seen = set()
+        for _, commits in self._iter_commit_pages(repository, since, until):
+            for sha, committed_at in commits:
+                if sha not in seen:
+                    seen.add(sha)
+                    yield sha, committed_at
+
+    def _iter_commit_pages(
+        self,
+        repository: str,
+        since: datetime,
+        until: datetime
+    ) -> Iterator[Tuple[int, List[Tuple[str, datetime]]]]:
+        """
+        Yield (page number, commits) for the commits listing.
+
+        The first response's Link rel="last" header gives the page count, so the
+        remaining pages are fetched concurrently instead of one after another.
+        """
+        commits_url = f"{settings.GITHUB_API_URL}/repos/{repository}/commits"
+        params = {
+            "per_page": COMMITS_PAGE_SIZE,
+            "since": since.isoformat(),
+            "until": until.isoformat()
+        }
+
+        first_page, last_page = self._fetch_commits_page(commits_url, params, 1)
+        yield 1, first_page
+        if last_page <= 1 or len(first_page) < COMMITS_PAGE_SIZE:
+            return
+
+        workers = max(1, min(GITHUB_FETCH_CONCURRENCY, last_page - 1))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="commits-page") as executor:
+            futures = {
+                executor.submit(self._fetch_commits_page, commits_url, params, number): number
+                for number in range(2, last_page + 1)
+            }
+            try:
+                for future in as_completed(futures):
+                    yield futures[future], future.result()[0]
+            finally:
+                # Stop queued pages if the caller stops early or a page fails
+                for future in futures:
+                    future.cancel()
+
+    def _fetch_commits_page(self, commits_url: str, params: Dict, page: int) -> Tuple[List[Tuple[str, datetime]], int]:
+        """Fetch one page of the commits listing; returns its commits and the last page number"""
+        try:
+            response = github_http.get(commits_url, headers=self._github_headers(), params=dict(params, page=page))
+        except requests.RequestException as e:
+            raise ChangelogError(
+                error_type="network_error",
+                message="Failed to connect to GitHub API",
+                details={"error": str(e)}
+            )
+        if response.status_code != 200:
+            error_data = response.json()
+            error_msg = error_data.get('message', 'Unknown error')
+            raise ChangelogError(
+                error_type="api_error",
+                message=f"Failed to fetch commits: {error_msg}",
+                details={"status_code": response.status_code, "error": error_msg}
+            )
+
+        last_url = response.links.get('last', {}).get('url')
+        last_page = int(parse_qs(urlparse(last_url).query).get('page', [page])[0]) if last_url else page
+
+        # Extract SHAs and committer dates
+        return [
+            (commit['sha'], datetime.fromisoformat(commit['commit']['committer']['date'].replace('Z', '+00:00')))
+            for commit in response.json()
+        ], last_page
+
+    def compare(self, repository: str, base: str, head: str) -> Tuple[List[CommitData], List[FileChange]]:
+        """
+        Fetch the commits between two refs (tag, branch or SHA) with the compare API.
+
+        The whole range costs one request per 100 commits (pages after the first are
+        fetched concurrently) instead of one request per commit. The compare API only
+        reports file changes for the range as a whole, so commits come back message-only
+        and the combined file changes are returned alongside them.
+
+        Returns:
+            Tuple[List[CommitData], List[FileChange]]: Commits oldest first, and the range's file changes
+
+        Raises:
+            ChangelogError: If the repository or either ref cannot be found
+        """
+        compare_url = f"{settings.GITHUB_API_URL}/repos/{repository}/compare/{quote(base, safe='/')}...{quote(head, safe='/')}"
+
+        first_page = self._fetch_compare_page(compare_url, 1, repository)
+        raw_commits = list(first_page.get('commits', []))
+        pages = math.ceil(first_page.get('total_commits', 0) / COMPARE_PAGE_SIZE)
+        if pages > 1:
+            workers = max(1, min(GITHUB_FETCH_CONCURRENCY, pages - 1))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="compare-fetch") as executor:
+                for page in executor.map(
+                    lambda number: self._fetch_compare_page(compare_url, number, repository),
+                    range(2, pages + 1)
+                ):
+                    raw_commits.extend(page.get('commits', []))
+
+        commits = [to_commit_data(commit, None) for commit in raw_commits]
+        range_files, _, _ = process_files(first_page.get('files', []))
+        return commits, range_files
+
+    def _fetch_compare_page(self, compare_url: str, page: int, repository: str) -> Dict:
+        try:
+            response = github_http.get(
+                compare_url,
+                headers=self._github_headers(),
+                params={"page": page, "per_page": COMPARE_PAGE_SIZE}
+            )
+        except requests.RequestException as e:
+            raise ChangelogError(
+                error_type="network_error",
+                message="Failed to connect to GitHub API",
+                repository=repository,
+                details={"error": str(e)}
+            )
+
+        if response.status_code == 404:
+            raise ChangelogError(
+                error_type="ref_not_found",
+                message="Base or head ref not found",
+                repository=repository,
+                details={
+                    "error": response.json().get('message', 'Not found'),
+                    "status_code": response.status_code
+                }
+            )
+        if response.status_code != 200:
+            raise ChangelogError(
+                error_type="github_api_error",
+                message=f"GitHub API error: {response.status_code}",
+                repository=repository,
+                details={
+                    "error": response.json().get('message', 'Unknown error'),
+                    "status_code": response.status_code
+                }
+            )
+        return response.json()
+
+
+def _dedupe(commits: Iterable[Tuple[str, datetime]]) -> List[Tuple[str, datetime]]:
+    """Drop repeated SHAs (pages shift when commits land mid-pagination), keeping first occurrences"""
+    seen = set()
+    unique = []
+    for sha, committed_at in commits:
+        if sha not in seen:
+            seen.add(sha)
+            unique.append((sha, committed_at))
+    return unique
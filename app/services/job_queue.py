@@ -0,0 +1,426 @@
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import PHASE_SECONDS
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.exceptions import ChangelogError
+from app.models.changelog import ChangelogEntry, ChangelogJob, commit_rows, headline_values
+from app.services.changelog_generator import ChangelogGenerator
+from app.services.changelog_search import changelog_search
+
+logger = logging.getLogger(__name__)
+
+# Errors caused by the request itself; retrying them cannot succeed
+PERMANENT_ERROR_TYPES = {
+    "invalid_format",
+    "invalid_input",
+    "not_found",
+    "commit_not_found",
+    "repository_not_found"
+}
+
+
+def process_owner() -> str:
+    """Identifies this worker process in leased jobs: host and pid"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    """Whether the process named by `owner` may still be running (unknown for other hosts)"""
+    host, _, pid = (owner or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    if int(pid) == os.getpid():
+        # Nothing is running yet when this is checked at startup; the pid was reused
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def _queued_entry(repository: str) -> ChangelogEntry:
+    return ChangelogEntry(
+        repository=repository,
+        version="",
+        changes=None,
+        author="",
+        status="queued",
+        date=datetime.utcnow()
+    )
+
+
+def _queued_job(entry_id: int, repository: str, shas: List[str], use_cache: bool) -> ChangelogJob:
+    return ChangelogJob(
+        entry_id=entry_id,
+        repository=repository,
+        commit_shas=json.dumps(shas),
+        use_cache=use_cache,
+        attempts=0,
+        available_at=datetime.utcnow()
+    )
+
+
+class JobQueue:
+    """
+    Database-backed queue for background changelog generation.
+
+    Each job is a ChangelogEntry whose status moves through queued -> running ->
+    generated/failed, plus a ChangelogJob row holding the request and lease. Workers
+    claim jobs with a conditional UPDATE, so several threads or processes can share
+    the queue. A heartbeat extends the leases of running jobs, so only jobs whose
+    worker died lose their lease; those are requeued once it expires, or at startup
+    when their owner process on this host is gone. A finished job is only recorded
+    by the worker still holding its lease.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        poll_interval: float,
+        lease_seconds: int,
+        max_attempts: int,
+        retry_delay_seconds: int
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        # Enqueue signals not yet consumed by a worker; each wakes one idle worker
+        self._wakeup = threading.Condition()
+        self._signals = 0
+        # Leases held by this process's workers, renewed by the heartbeat: entry_id -> lease token
+        self._leases: Dict[int, str] = {}
+        self._leases_lock = threading.Lock()
+        self._last_reclaim = datetime.min
+        self.owner = process_owner()
+        self.generator: Optional[ChangelogGenerator] = None
+
+    def submit(self, repository: str, shas: List[str], use_cache: bool = True) -> ChangelogEntry:
+        """Persist a queued changelog entry and its job; returns the entry"""
+        db = SessionLocal()
+        try:
+            changelog_entry = _queued_entry(repository)
+            db.add(changelog_entry)
+            db.flush()
+            db.add(_queued_job(changelog_entry.id, repository, shas, use_cache))
+            db.commit()
+            db.refresh(changelog_entry)
+            db.expunge(changelog_entry)
+        finally:
+            db.close()
+
+        self._notify()
+        return changelog_entry
+
+    async def submit_async(self, repository: str, shas: List[str], use_cache: bool = True) -> ChangelogEntry:
+        """submit() on the async engine, for handlers running on the event loop"""
+        async with AsyncSessionLocal() as db:
+            changelog_entry = _queued_entry(repository)
+            db.add(changelog_entry)
+            await db.flush()
+            db.add(_queued_job(changelog_entry.id, repository, shas, use_cache))
+            await db.commit()
+            await db.refresh(changelog_entry)
+            db.expunge(changelog_entry)
+
+        self._notify()
+        return changelog_entry
+
+    def start(self, generator: Optional[ChangelogGenerator] = None) -> None:
+        """Start the workers; they share `generator` (the application's) or one created here"""
+        if self._threads or self.concurrency <= 0:
+            return
+        self.generator = generator or self.generator or ChangelogGenerator()
+        self._stop.clear()
+        self.owner = process_owner()
+        self.requeue_orphaned()
+        self.requeue_expired()
+        for index in range(self.concurrency):
+            thread = threading.Thread(target=self._work, name=f"changelog-job-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._heartbeat, name="changelog-job-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+        logger.info(f"Started {self.concurrency} changelog job workers")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def requeue_expired(self) -> int:
+        """Return running jobs whose lease has expired to the queue (or fail them when out of attempts)"""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            expired = self._running_jobs(db).filter(ChangelogJob.leased_until < now).all()
+            requeued = self._requeue(db, expired, "Job lease expired", "lease_expired")
+            self._last_reclaim = now
+            if requeued:
+                logger.info(f"Requeued {requeued} changelog jobs with expired leases")
+            return requeued
+        finally:
+            db.close()
+
+    def requeue_orphaned(self) -> int:
+        """Return running jobs whose owner process on this host is gone, without waiting for their lease"""
+        db = SessionLocal()
+        try:
+            orphaned = [job for job in self._running_jobs(db).all() if not _owner_alive(job.owner)]
+            requeued = self._requeue(db, orphaned, "Job worker exited", "worker_exited")
+            if requeued:
+                logger.info(f"Requeued {requeued} changelog jobs left running by exited workers")
+            return requeued
+        finally:
+            db.close()
+
+    def _running_jobs(self, db):
+        return db.query(ChangelogJob).join(
+            ChangelogEntry, ChangelogEntry.id == ChangelogJob.entry_id
+        ).filter(ChangelogEntry.status == "running")
+
+    def _requeue(self, db, jobs: List[ChangelogJob], reason: str, error_type: str) -> int:
+        now = datetime.utcnow()
+        requeued = 0
+        for job in jobs:
+            status = "queued" if job.attempts < self.max_attempts else "failed"
+            # Only jobs still holding the lease that was seen, so a renewed or finished job is left alone
+            owned = db.query(ChangelogJob).filter(
+                ChangelogJob.entry_id == job.entry_id,
+                ChangelogJob.lease_token == job.lease_token
+            ).update({
+                ChangelogJob.lease_token: None,
+                ChangelogJob.leased_until: None,
+                ChangelogJob.owner: None
+            }, synchronize_session=False)
+            if not owned:
+                continue
+            db.query(ChangelogEntry).filter(
+                ChangelogEntry.id == job.entry_id,
+                ChangelogEntry.status == "running"
+            ).update({ChangelogEntry.status: status}, synchronize_session=False)
+            if status == "failed":
+                db.query(ChangelogJob).filter(ChangelogJob.entry_id == job.entry_id).update({
+                    ChangelogJob.finished_at: now,
+                    ChangelogJob.error: json.dumps({"error": reason, "type": error_type})
+                }, synchronize_session=False)
+            requeued += 1
+        db.commit()
+        if requeued:
+            self._notify(requeued)
+        return requeued
+
+    def renew_leases(self) -> int:
+        """Extend the leases of jobs this process is running; returns how many were renewed"""
+        with self._leases_lock:
+            leases = dict(self._leases)
+        if not leases:
+            return 0
+        db = SessionLocal()
+        try:
+            leased_until = datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+            renewed = 0
+            for entry_id, lease_token in leases.items():
+                updated = db.query(ChangelogJob).filter(
+                    ChangelogJob.entry_id == entry_id,
+                    ChangelogJob.lease_token == lease_token
+                ).update({ChangelogJob.leased_until: leased_until}, synchronize_session=False)
+                if not updated:
+                    logger.warning(f"Changelog job {entry_id} lease was lost while running")
+                renewed += updated
+            db.commit()
+            return renewed
+        finally:
+            db.close()
+
+    def _heartbeat(self) -> None:
+        interval = max(self.lease_seconds / 3, 1.0)
+        while not self._stop.wait(interval):
+            try:
+                self.renew_leases()
+            except Exception as e:
+                logger.error(f"Failed to renew changelog job leases: {str(e)}")
+
+    def _notify(self, count: int = 1) -> None:
+        with self._wakeup:
+            self._signals += count
+            self._wakeup.notify(count)
+
+    def _wait_for_work(self) -> None:
+        """Sleep until a job is enqueued or poll_interval passes, consuming one enqueue signal"""
+        with self._wakeup:
+            if not self._signals:
+                self._wakeup.wait(self.poll_interval)
+            if self._signals:
+                self._signals -= 1
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            try:
+                claimed = self._claim()
+            except Exception as e:
+                logger.error(f"Failed to claim changelog job: {str(e)}")
+                claimed = None
+
+            if claimed is None:
+                if datetime.utcnow() - self._last_reclaim > timedelta(seconds=60):
+                    try:
+                        self.requeue_expired()
+                    except Exception as e:
+                        logger.error(f"Failed to requeue changelog jobs: {str(e)}")
+                self._wait_for_work()
+                continue
+
+            entry_id, lease_token = claimed
+            with self._leases_lock:
+                self._leases[entry_id] = lease_token
+            try:
+                self._run(entry_id, lease_token)
+            finally:
+                with self._leases_lock:
+                    self._leases.pop(entry_id, None)
+
+    def _claim(self) -> Optional[Tuple[int, str]]:
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            candidates = db.query(ChangelogJob.entry_id).join(
+                ChangelogEntry, ChangelogEntry.id == ChangelogJob.entry_id
+            ).filter(
+                ChangelogEntry.status == "queued",
+                ChangelogJob.available_at <= now
+            ).order_by(ChangelogJob.available_at, ChangelogJob.entry_id).limit(self.concurrency + 1).all()
+
+            for (entry_id,) in candidates:
+                # Only one worker can move the entry out of "queued"
+                claimed = db.query(ChangelogEntry).filter(
+                    ChangelogEntry.id == entry_id,
+                    ChangelogEntry.status == "queued"
+                ).update({ChangelogEntry.status: "running"}, synchronize_session=False)
+                if not claimed:
+                    continue
+
+                lease_token = uuid.uuid4().hex
+                db.query(ChangelogJob).filter(ChangelogJob.entry_id == entry_id).update({
+                    ChangelogJob.lease_token: lease_token,
+                    ChangelogJob.leased_until: now + timedelta(seconds=self.lease_seconds),
+                    ChangelogJob.owner: self.owner,
+                    ChangelogJob.attempts: ChangelogJob.attempts + 1,
+                    ChangelogJob.started_at: now
+                }, synchronize_session=False)
+                db.commit()
+                return entry_id, lease_token
+
+            db.commit()
+            return None
+        finally:
+            db.close()
+
+    def _run(self, entry_id: int, lease_token: str) -> None:
+        db = SessionLocal()
+        try:
+            job = db.get(ChangelogJob, entry_id)
+            try:
+                changelog_data = self.generator.generate_from_shas(
+                    job.repository,
+                    json.loads(job.commit_shas),
+                    use_cache=job.use_cache
+                )
+            except ChangelogError as e:
+                error = {"error": e.message, "type": e.error_type, "details": e.details}
+                self._finish(db, job, lease_token, error=error, retry=e.error_type not in PERMANENT_ERROR_TYPES)
+            except Exception as e:
+                logger.error(f"Changelog job {entry_id} failed: {str(e)}")
+                self._finish(db, job, lease_token, error={"error": str(e), "type": "GenerationError"}, retry=True)
+            else:
+                self._finish(db, job, lease_token, changelog_data=changelog_data)
+        except Exception as e:
+            logger.error(f"Failed to record changelog job {entry_id}: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def _finish(
+        self,
+        db,
+        job: ChangelogJob,
+        lease_token: str,
+        changelog_data: Optional[Dict] = None,
+        error: Optional[Dict] = None,
+        retry: bool = False
+    ) -> None:
+        now = datetime.utcnow()
+        if changelog_data is not None:
+            status = "generated"
+        elif retry and job.attempts < self.max_attempts:
+            status = "queued"
+        else:
+            status = "failed"
+
+        job_update = {
+            ChangelogJob.lease_token: None,
+            ChangelogJob.leased_until: None,
+            ChangelogJob.owner: None,
+            ChangelogJob.error: json.dumps(error) if error else None
+        }
+        if status == "queued":
+            delay = self.retry_delay_seconds * 2 ** (job.attempts - 1)
+            job_update[ChangelogJob.available_at] = now + timedelta(seconds=delay)
+        else:
+            job_update[ChangelogJob.finished_at] = now
+
+        # A worker that lost its lease must not overwrite the job's newer state
+        owned = db.query(ChangelogJob).filter(
+            ChangelogJob.entry_id == job.entry_id,
+            ChangelogJob.lease_token == lease_token
+        ).update(job_update, synchronize_session=False)
+        if not owned:
+            db.rollback()
+            logger.warning(f"Changelog job {job.entry_id} lease was lost; discarding result")
+            return
+
+        entry_update = {ChangelogEntry.status: status}
+        if changelog_data is not None:
+            entry_update[ChangelogEntry.changes] = json.dumps(changelog_data)
+            for name, value in headline_values(changelog_data).items():
+                entry_update[getattr(ChangelogEntry, name)] = value
+            entry_update[ChangelogEntry.date] = now
+        db.query(ChangelogEntry).filter(ChangelogEntry.id == job.entry_id).update(
+            entry_update, synchronize_session=False
+        )
+        if changelog_data is not None:
+            for commit in commit_rows(changelog_data):
+                commit.entry_id = job.entry_id
+                db.add(commit)
+            changelog_search.index(db, job.entry_id, job.repository, changelog_data)
+        with PHASE_SECONDS.time(phase="db_commit"):
+            db.commit()
+        if status == "queued":
+            self._notify()
+
+
+job_queue = JobQueue(
+    concurrency=settings.JOB_WORKER_CONCURRENCY,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_delay_seconds=settings.JOB_RETRY_DELAY_SECONDS
+)
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.changelog import CachedLLMResponse
+from app.services.cache import EvictionSchedule, LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(text: str) -> str:
+    """Collapse whitespace so formatting-only differences map to the same key"""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def prompt_cache_key(model: str, system_prompt: str, temperature: float, prompt: str) -> str:
+    payload = json.dumps(
+        [model, normalize_prompt(system_prompt), temperature, normalize_prompt(prompt)],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Persistent cache of parsed and validated Claude responses keyed by prompt hash.
+
+    Entries expire after LLM_CACHE_TTL_SECONDS and the table is bounded by
+    LLM_CACHE_MAX_ENTRIES with least recently used eviction.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int, memory_entries: int, enabled: bool = True):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.eviction = EvictionSchedule(max_entries)
+        self.memory = LRUCache(memory_entries, ttl=ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+
+        response = self.memory.get(key)
+        if response is None:
+            db = SessionLocal()
+            try:
+                row = db.query(CachedLLMResponse).filter(
+                    CachedLLMResponse.key == key,
+                    CachedLLMResponse.created_at >= datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+                ).first()
+                if row is not None:
+                    row.hit_count = (row.hit_count or 0) + 1
+                    row.last_accessed = datetime.utcnow()
+                    db.commit()
+                    response = row.response
+                    self.memory.set(key, response)
+            except Exception as e:
+                logger.warning(f"LLM cache lookup failed: {str(e)}")
+            finally:
+                db.close()
+
+        if response is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(response)
+
+    def set(self, key: str, model: str, value: Dict) -> None:
+        if not self.enabled:
+            return
+
+        response = json.dumps(value)
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            db.merge(CachedLLMResponse(
+                key=key,
+                model=model,
+                response=response,
+                hit_count=0,
+                created_at=now,
+                last_accessed=now
+            ))
+            db.commit()
+            self.memory.set(key, response)
+            self._evict(db)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"LLM cache store failed: {str(e)}")
+        finally:
+            db.close()
+
+    def record_bypass(self) -> None:
+        self.bypassed += 1
+
+    def _evict(self, db) -> None:
+        if not self.eviction.due():
+            return
+        expired = db.query(CachedLLMResponse).filter(
+            CachedLLMResponse.created_at < datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        ).delete(synchronize_session=False)
+
+        rows = db.query(func.count(CachedLLMResponse.key)).scalar()
+        overflow = self.eviction.overflow(rows)
+        self.eviction.counted(rows - overflow)
+        if overflow > 0:
+            stale = [
+                key for (key,) in db.query(CachedLLMResponse.key).order_by(
+                    CachedLLMResponse.last_accessed
+                ).limit(overflow).all()
+            ]
+            db.query(CachedLLMResponse).filter(
+                CachedLLMResponse.key.in_(stale)
+            ).delete(synchronize_session=False)
+            for key in stale:
+                self.memory.delete(key)
+            expired += len(stale)
+
+        db.commit()
+        self.evictions += expired
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "calls_saved": self.hits,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+            "memory": self.memory.stats()
+        }
+
+
+llm_cache = LLMResponseCache(
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    memory_entries=settings.LLM_CACHE_MEMORY_ENTRIES,
+    enabled=settings.LLM_CACHE_ENABLED
+)
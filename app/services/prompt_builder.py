@@ -0,0 +1,268 @@
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used for prompt size estimates
+CHARS_PER_TOKEN = 4
+
+# Longest commit message kept in a prompt
+MAX_MESSAGE_CHARS = 1000
+
+# Reserved for "... (N more ...)" lines appended after truncated sections
+TRAILER_TOKENS = 8
+
+RANGE_HEADER = "\nCombined changes across the range:\n"
+COMMITS_HEADER = "\nCommits:\n"
+ROUTINE_HEADER = "\nRoutine commits (not listed below):\n"
+
+LOCKFILE_NAMES = {
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock", "Pipfile.lock",
+    "Cargo.lock", "Gemfile.lock", "composer.lock", "go.sum", "mix.lock", "packages.lock.json"
+}
+GENERATED_PATTERN = re.compile(
+    r'(^|/)(dist|build|vendor|node_modules|third_party|__snapshots__)/'
+    r'|\.min\.(js|css)$|\.map$|_pb2(_grpc)?\.py$|\.pb\.go$|\.generated\.|\.snap$'
+)
+SECONDARY_PATTERN = re.compile(
+    r'(^|/)(tests?|spec|docs?)/|_test\.\w+$|\.test\.\w+$|\.spec\.\w+$|(^|/)test_[^/]*$'
+    r'|\.(md|rst|txt|ya?ml|toml|ini|cfg|json)$'
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate for prompt budgeting"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def file_priority(filename: str) -> int:
+    """0 for source files, 1 for tests, docs and config, 2 for lockfiles and generated code"""
+    if filename.rsplit('/', 1)[-1] in LOCKFILE_NAMES or GENERATED_PATTERN.search(filename):
+        return 2
+    if SECONDARY_PATTERN.search(filename):
+        return 1
+    return 0
+
+
+def fair_share(demands: List[int], budget: int) -> List[int]:
+    """Split a budget max-min fairly: small demands are met in full, the rest share what remains"""
+    allocations = [0] * len(demands)
+    remaining = max(budget, 0)
+    order = sorted(range(len(demands)), key=lambda i: demands[i])
+    for position, index in enumerate(order):
+        share = remaining // (len(demands) - position)
+        allocations[index] = min(demands[index], share)
+        remaining -= allocations[index]
+    return allocations
+
+
+def _summary_line(file: Dict) -> str:
+    changes = []
+    if file.get('status'):
+        changes.append(f"Status: {file['status']}")
+    if file.get('additions'):
+        changes.append(f"Additions: {file['additions']} lines")
+    if file.get('deletions'):
+        changes.append(f"Deletions: {file['deletions']} lines")
+    return f"File: {file.get('filename', '')} ({', '.join(changes)})"
+
+
+class PromptBuilder:
+    """
+    Assemble changelog prompts within a fixed input-token budget.
+
+    Every commit always gets its metadata and message. The remaining budget is split
+    fairly across commits and spent on file summaries first, then diff excerpts, with
+    source files ahead of tests/docs and lockfiles/generated code collapsed into one line.
+    As the budget runs out commits degrade from diff, to file summary, to message-only.
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+
+    def header(self, repository: str) -> str:
+        return (
+            "Generate a comprehensive changelog entry that summarizes multiple commits.\n"
+            "1. Only respond with the JSON object\n"
+            "2. Do not include any additional text or explanations\n"
+            "3. If you cannot determine the type, use \"chore\"\n"
+            "4. If you cannot determine the impact, use \"Internal improvements\"\n"
+            "\n"
+            f"Repository: {repository}\n"
+        )
+
+    def commit_base(self, commit: Dict, subject_only: bool = False) -> str:
+        message = commit.get('message', '') or ''
+        if subject_only:
+            message = message.split('\n', 1)[0]
+        if len(message) > MAX_MESSAGE_CHARS:
+            message = message[:MAX_MESSAGE_CHARS] + "..."
+        return (
+            f"\nCommit SHA: {commit['sha']}\n"
+            f"URL: {commit.get('github_url') or commit.get('url', '')}\n"
+            f"Author: {commit.get('author', '')}\n"
+            f"Date: {(commit.get('date') or '')[:10]}\n"
+            f"Message: {message}\n"
+        )
+
+    def summary_lines(self, commit: Dict) -> List[str]:
+        """File summary lines in priority order, with lockfiles and generated code collapsed"""
+        files = commit.get('files') or []
+        if not files:
+            # Cached entries from before per-file data was kept only have the rendered summary
+            summary = (commit.get('changes_summary') or '').strip()
+            if not summary or summary == "No changes found":
+                return []
+            return [line for line in summary.split('\n') if line]
+
+        ranked = sorted(files, key=lambda f: (
+            file_priority(f.get('filename', '')),
+            -((f.get('additions') or 0) + (f.get('deletions') or 0))
+        ))
+        lines = [_summary_line(f) for f in ranked if file_priority(f.get('filename', '')) < 2]
+        collapsed = [f for f in ranked if file_priority(f.get('filename', '')) == 2]
+        if collapsed:
+            additions = sum(f.get('additions') or 0 for f in collapsed)
+            deletions = sum(f.get('deletions') or 0 for f in collapsed)
+            lines.append(f"Lockfiles/generated: {len(collapsed)} files (+{additions}/-{deletions} lines)")
+        if commit.get('files_summary'):
+            lines.append(commit['files_summary'])
+        return lines
+
+    def diff_files(self, commit: Dict) -> List[Tuple[str, List[str], int]]:
+        """(filename, changed lines, total changed lines) for files worth showing a diff for"""
+        files = [
+            f for f in (commit.get('files') or [])
+            if f.get('changes') and file_priority(f.get('filename', '')) < 2
+        ]
+        files.sort(key=lambda f: file_priority(f.get('filename', '')))
+        return [
+            (f.get('filename', ''), f['changes'], f.get('total_changes') or len(f['changes']))
+            for f in files
+        ]
+
+    def compact_tokens(self, commit: Dict) -> int:
+        """Estimated tokens for a commit rendered with message and file summary only"""
+        lines = self.summary_lines(commit)
+        return estimate_tokens(self.commit_base(commit)) + sum(estimate_tokens(line + "\n") for line in lines)
+
+    def range_section(self, range_files: List[Dict], budget: int) -> str:
+        """Render the combined file changes of a commit range within a token budget"""
+        rendered = self._render_extras(*self._commit_extras({'files': range_files}), budget - estimate_tokens(RANGE_HEADER))
+        return RANGE_HEADER + rendered if rendered else ""
+
+    def routine_section(self, routine_lines: List[str]) -> str:
+        """Aggregate lines for commits collapsed before prompting, e.g. "14 dependency updates" """
+        if not routine_lines:
+            return ""
+        return ROUTINE_HEADER + "".join(f"- {line}\n" for line in routine_lines)
+
+    def build(
+        self,
+        repository: str,
+        commits: List[Dict],
+        range_files: Optional[List[Dict]] = None,
+        routine_lines: Optional[List[str]] = None
+    ) -> str:
+        """
+        Build the prompt for a set of commits.
+
+        range_files, when given, are the combined file changes of the whole range (e.g. from the
+        compare API); they are rendered once and share the budget with the commits.
+        routine_lines summarize commits left out of the listing (see commit_classifier).
+        """
+        header = self.header(repository)
+        routine = self.routine_section(routine_lines or [])
+        available = self.budget - estimate_tokens(header) - estimate_tokens(COMMITS_HEADER)
+        if routine:
+            available -= estimate_tokens(routine)
+
+        bases = [self.commit_base(commit) for commit in commits]
+        if sum(estimate_tokens(base) for base in bases) > available:
+            # Not even full messages fit: keep only commit subjects
+            bases = [self.commit_base(commit, subject_only=True) for commit in commits]
+        available -= sum(estimate_tokens(base) for base in bases)
+        if available < 0:
+            logger.warning(f"Prompt for {len(commits)} commits exceeds budget of {self.budget} tokens")
+
+        extras = [self._commit_extras(commit) for commit in commits]
+        if range_files:
+            available -= estimate_tokens(RANGE_HEADER)
+            extras.append(self._commit_extras({'files': range_files}))
+        demands = [self._extras_demand(summary, diffs) for summary, diffs in extras]
+        allocations = fair_share(demands, available)
+
+        parts = [header, routine]
+        if range_files:
+            rendered = self._render_extras(*extras.pop(), allocations.pop())
+            if rendered:
+                parts.append(RANGE_HEADER + rendered)
+        parts.append(COMMITS_HEADER)
+        for base, (summary, diffs), allocation in zip(bases, extras, allocations):
+            parts.append(base)
+            parts.append(self._render_extras(summary, diffs, allocation))
+        return "".join(parts)
+
+    def _commit_extras(self, commit: Dict) -> Tuple[List[Tuple[str, int]], List[Tuple[str, List[str], int]]]:
+        summary = [(line, estimate_tokens(line + "\n")) for line in self.summary_lines(commit)]
+        return summary, self.diff_files(commit)
+
+    def _diff_demand(self, name: str, lines: List[str]) -> int:
+        return estimate_tokens(f"File: {name}\n") + TRAILER_TOKENS + sum(estimate_tokens(line + "\n") for line in lines)
+
+    def _extras_demand(self, summary: List[Tuple[str, int]], diffs: List[Tuple[str, List[str], int]]) -> int:
+        if not summary:
+            return 0
+        demand = estimate_tokens("Changes Summary:\n") + sum(cost for _, cost in summary)
+        if diffs:
+            demand += estimate_tokens("Diff excerpts:\n") + sum(self._diff_demand(name, lines) for name, lines, _ in diffs)
+        return demand
+
+    def _render_extras(self, summary: List[Tuple[str, int]], diffs: List[Tuple[str, List[str], int]], allocation: int) -> str:
+        if not summary or allocation <= 0:
+            return ""
+
+        out = ["Changes Summary:\n"]
+        remaining = allocation - estimate_tokens(out[0])
+        if sum(cost for _, cost in summary) > remaining:
+            # Leave room for the "... and N more files" trailer
+            remaining -= TRAILER_TOKENS
+        shown = 0
+        for line, cost in summary:
+            if cost > remaining:
+                break
+            out.append(line + "\n")
+            remaining -= cost
+            shown += 1
+        if shown == 0:
+            # Message-only
+            return ""
+        if shown < len(summary):
+            out.append(f"... and {len(summary) - shown} more files\n")
+            return "".join(out)
+
+        if diffs and remaining > 0:
+            excerpts = []
+            remaining -= estimate_tokens("Diff excerpts:\n")
+            demands = [self._diff_demand(name, lines) for name, lines, _ in diffs]
+            for (name, lines, total), file_budget in zip(diffs, fair_share(demands, remaining)):
+                file_header = f"File: {name}\n"
+                file_budget -= estimate_tokens(file_header) + TRAILER_TOKENS
+                kept = []
+                for line in lines:
+                    cost = estimate_tokens(line + "\n")
+                    if cost > file_budget:
+                        break
+                    kept.append(line)
+                    file_budget -= cost
+                if not kept:
+                    continue
+                excerpts.append(file_header)
+                excerpts.extend(line + "\n" for line in kept)
+                if total > len(kept):
+                    excerpts.append(f"... ({total - len(kept)} more changed lines)\n")
+            if excerpts:
+                out.append("Diff excerpts:\n")
+                out.extend(excerpts)
+        return "".join(out)
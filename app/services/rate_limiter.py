@@ -0,0 +1,347 @@
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import requests
+from sqlalchemy import case, or_
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.exceptions import ChangelogError
+from app.models.changelog import GitHubRateLimit
+
+logger = logging.getLogger(__name__)
+
+# Longest single sleep while waiting, so waiters notice capacity freed by other processes
+MAX_SLEEP_SECONDS = 5.0
+
+
+def credentials_key(authorization: Optional[str]) -> str:
+    return hashlib.sha256((authorization or "anonymous").encode('utf-8')).hexdigest()
+
+
+def is_rate_limited(response: requests.Response) -> bool:
+    """Whether GitHub rejected the request for rate limiting (primary or secondary limit)"""
+    if response.status_code == 429:
+        return True
+    return response.status_code == 403 and (
+        response.headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in response.headers
+    )
+
+
+class _Budget:
+    """This process's view of one credential's rate-limit window"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None  # None until GitHub reports it
+        self.reset_at: Optional[datetime] = None
+        self.blocked_until: Optional[datetime] = None
+        self.next_request_at: Optional[datetime] = None
+        self.claims = 0  # Requests claimed since the last sync with the shared row
+        self.synced_at: Optional[float] = None
+
+    def snapshot(self) -> Dict:
+        """Values to write to the shared row; call under the lock, it starts a new sync period"""
+        self.claims = 0
+        self.synced_at = time.monotonic()
+        return {
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reset_at": self.reset_at,
+            "blocked_until": self.blocked_until
+        }
+
+    def merge(self, row: GitHubRateLimit) -> None:
+        """Adopt what other processes have recorded in the shared row"""
+        if row.limit is not None and self.limit is None:
+            self.limit = row.limit
+        if row.reset_at is not None and row.remaining is not None:
+            if self.reset_at is None or row.reset_at > self.reset_at:
+                self.remaining, self.reset_at = row.remaining, row.reset_at
+            elif row.reset_at == self.reset_at:
+                self.remaining = row.remaining if self.remaining is None else min(self.remaining, row.remaining)
+        if row.blocked_until is not None and (self.blocked_until is None or row.blocked_until > self.blocked_until):
+            self.blocked_until = row.blocked_until
+
+
+class GitHubRateLimiter:
+    """
+    Schedules GitHub requests against the rate limit of each set of credentials.
+
+    Each process claims requests from an in-memory budget per credential, keeping
+    `reserve` requests back. Below `pace_below` remaining requests, the rest of the
+    window is spread evenly until the reset instead of being spent in a burst. The
+    budget is corrected from X-RateLimit-* headers on every response, and Retry-After
+    or an exhausted limit blocks the credential until GitHub allows requests again.
+
+    Processes share their view through the github_rate_limits table: the budget is
+    written back every `sync_every` claims, on every claim once it runs low, and as
+    soon as GitHub rate-limits a request. Writes only ever lower `remaining` within a
+    window (a conditional UPDATE, as the job queue claims jobs), so concurrent
+    workers cannot overwrite each other's lower counts. Callers wait for capacity
+    and fail once their deadline (max_wait_seconds by default) passes.
+    """
+
+    def __init__(
+        self,
+        reserve: int,
+        pace_below: int,
+        max_wait_seconds: int,
+        enabled: bool = True,
+        sync_every: int = 20,
+        sync_interval_seconds: float = 5.0
+    ):
+        self.enabled = enabled
+        self.reserve = reserve
+        self.pace_below = pace_below
+        self.max_wait_seconds = max_wait_seconds
+        self.sync_every = sync_every
+        self.sync_interval_seconds = sync_interval_seconds
+        self._budgets: Dict[str, _Budget] = {}
+        self._budgets_lock = threading.Lock()
+        self.acquired = 0
+        self.waits = 0
+        self.waited_seconds = 0.0
+        self.rate_limited = 0
+        self.syncs = 0
+
+    def deadline(self) -> float:
+        """time.monotonic() value after which waiting for capacity gives up"""
+        return time.monotonic() + self.max_wait_seconds
+
+    def acquire(self, authorization: Optional[str], deadline: Optional[float] = None) -> None:
+        """Block until a request may be sent with these credentials, or raise once `deadline` passes"""
+        if not self.enabled:
+            return
+
+        key = credentials_key(authorization)
+        budget = self._budget(key)
+        deadline = deadline if deadline is not None else self.deadline()
+        waited = False
+        while True:
+            wait = self._try_acquire(key, budget)
+            if wait is None:
+                self.acquired += 1
+                return
+
+            remaining_wait = deadline - time.monotonic()
+            if remaining_wait <= 0:
+                raise rate_limit_error(self.max_wait_seconds, wait)
+            if not waited:
+                waited = True
+                self.waits += 1
+                logger.info(f"Waiting up to {round(wait, 1)}s for GitHub rate limit capacity")
+            sleep = max(0.05, min(wait, remaining_wait, MAX_SLEEP_SECONDS))
+            time.sleep(sleep)
+            self.waited_seconds += sleep
+
+    def record(self, authorization: Optional[str], response: requests.Response) -> None:
+        """Update the budget from a response's rate-limit headers"""
+        if not self.enabled:
+            return
+
+        headers = response.headers
+        limit = _int_header(headers, "X-RateLimit-Limit")
+        remaining = _int_header(headers, "X-RateLimit-Remaining")
+        reset = _int_header(headers, "X-RateLimit-Reset")
+        retry_after = _int_header(headers, "Retry-After")
+        limited = is_rate_limited(response)
+        if limited:
+            self.rate_limited += 1
+        if remaining is None and retry_after is None and not limited:
+            return
+
+        key = credentials_key(authorization)
+        budget = self._budget(key)
+        now = datetime.utcnow()
+        with budget.lock:
+            reset_at = datetime.utcfromtimestamp(reset) if reset is not None else None
+            if limit is not None:
+                budget.limit = limit
+            if remaining is not None:
+                if reset_at is not None and (budget.reset_at is None or reset_at > budget.reset_at):
+                    # New window: the header is authoritative
+                    budget.remaining = remaining
+                    budget.reset_at = reset_at
+                elif response.status_code == 304 and budget.remaining is not None:
+                    # Revalidations are free; refund the unit claimed for this request
+                    budget.remaining = min(budget.remaining + 1, remaining)
+                elif reset_at is None or reset_at == budget.reset_at:
+                    # Same window: responses can arrive out of order, keep the lower count
+                    budget.remaining = remaining if budget.remaining is None else min(budget.remaining, remaining)
+
+            blocked_until = None
+            if retry_after is not None:
+                blocked_until = now + timedelta(seconds=retry_after)
+            elif limited:
+                blocked_until = reset_at or now + timedelta(seconds=60)
+            if blocked_until is not None and (budget.blocked_until is None or blocked_until > budget.blocked_until):
+                budget.blocked_until = blocked_until
+                logger.warning(f"GitHub rate limit reached; pausing requests until {blocked_until.isoformat()}")
+            # Other processes should stop too
+            snapshot = budget.snapshot() if limited else None
+        if snapshot is not None:
+            self._sync(key, budget, snapshot)
+
+    def _budget(self, key: str) -> _Budget:
+        budget = self._budgets.get(key)
+        if budget is None:
+            with self._budgets_lock:
+                budget = self._budgets.setdefault(key, _Budget())
+        return budget
+
+    def _try_acquire(self, key: str, budget: _Budget) -> Optional[float]:
+        """
+        Claim one request; returns None on success, otherwise seconds until capacity may free up.
+        The budget lock only covers in-memory bookkeeping; syncs with the shared row run after it is released.
+        """
+        with budget.lock:
+            stale = budget.synced_at is None or time.monotonic() - budget.synced_at >= self.sync_interval_seconds
+            snapshot = budget.snapshot() if stale else None
+        if snapshot is not None:
+            self._sync(key, budget, snapshot)
+
+        with budget.lock:
+            now = datetime.utcnow()
+            if budget.reset_at is not None and budget.reset_at <= now:
+                # The window has reset; GitHub will report the new budget on the next response
+                budget.remaining = budget.limit
+                budget.reset_at = None
+                budget.next_request_at = None
+
+            waits = []
+            if budget.blocked_until is not None and budget.blocked_until > now:
+                waits.append((budget.blocked_until - now).total_seconds())
+            if budget.next_request_at is not None and budget.next_request_at > now:
+                waits.append((budget.next_request_at - now).total_seconds())
+            if budget.remaining is not None and budget.remaining <= self.reserve:
+                waits.append((budget.reset_at - now).total_seconds() if budget.reset_at else 60.0)
+            if waits:
+                return max(waits)
+
+            budget.claims += 1
+            low = False
+            if budget.remaining is not None:
+                budget.remaining -= 1
+                low = budget.remaining - self.reserve < self.pace_below
+                if low and budget.reset_at is not None:
+                    interval = (budget.reset_at - now).total_seconds() / max(budget.remaining - self.reserve, 1)
+                    budget.next_request_at = now + timedelta(seconds=interval)
+            snapshot = budget.snapshot() if low or budget.claims >= self.sync_every else None
+        if snapshot is not None:
+            self._sync(key, budget, snapshot)
+        return None
+
+    def _sync(self, key: str, budget: _Budget, snapshot: Dict) -> None:
+        """Write a budget snapshot to the shared row and merge back what other processes recorded"""
+        remaining, reset_at, blocked_until = snapshot["remaining"], snapshot["reset_at"], snapshot["blocked_until"]
+        db = SessionLocal()
+        try:
+            self._ensure_row(db, key)
+            query = db.query(GitHubRateLimit).filter(GitHubRateLimit.key == key)
+            if reset_at is not None and remaining is not None:
+                # A newer window replaces the stored one outright
+                query.filter(
+                    or_(GitHubRateLimit.reset_at.is_(None), GitHubRateLimit.reset_at < reset_at)
+                ).update({
+                    GitHubRateLimit.remaining: remaining,
+                    GitHubRateLimit.reset_at: reset_at
+                }, synchronize_session=False)
+                # Within the same window only ever lower the count
+                query.filter(GitHubRateLimit.reset_at == reset_at).update({
+                    GitHubRateLimit.remaining: case(
+                        (GitHubRateLimit.remaining.is_(None), remaining),
+                        (GitHubRateLimit.remaining > remaining, remaining),
+                        else_=GitHubRateLimit.remaining
+                    )
+                }, synchronize_session=False)
+
+            values = {GitHubRateLimit.updated_at: datetime.utcnow()}
+            if snapshot["limit"] is not None:
+                values[GitHubRateLimit.limit] = snapshot["limit"]
+            if blocked_until is not None:
+                values[GitHubRateLimit.blocked_until] = case(
+                    (GitHubRateLimit.blocked_until.is_(None), blocked_until),
+                    (GitHubRateLimit.blocked_until < blocked_until, blocked_until),
+                    else_=GitHubRateLimit.blocked_until
+                )
+            query.update(values, synchronize_session=False)
+            db.commit()
+            row = query.one()
+            with budget.lock:
+                budget.merge(row)
+            self.syncs += 1
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Failed to sync GitHub rate limit: {str(e)}")
+        finally:
+            db.close()
+
+    def _ensure_row(self, db, key: str) -> None:
+        if db.get(GitHubRateLimit, key) is not None:
+            return
+        try:
+            db.add(GitHubRateLimit(key=key, updated_at=datetime.utcnow()))
+            db.commit()
+        except IntegrityError:
+            # Created concurrently by another worker
+            db.rollback()
+
+    def stats(self) -> Dict:
+        db = SessionLocal()
+        try:
+            budgets = [
+                {
+                    "limit": row.limit,
+                    "remaining": row.remaining,
+                    "reset_at": row.reset_at.isoformat() if row.reset_at else None,
+                    "blocked_until": row.blocked_until.isoformat() if row.blocked_until else None
+                }
+                for row in db.query(GitHubRateLimit).all()
+            ]
+        finally:
+            db.close()
+        return {
+            "enabled": self.enabled,
+            "acquired": self.acquired,
+            "waits": self.waits,
+            "waited_seconds": round(self.waited_seconds, 2),
+            "rate_limited": self.rate_limited,
+            "syncs": self.syncs,
+            "budgets": budgets
+        }
+
+
+def rate_limit_error(max_wait_seconds: float, retry_after: Optional[float] = None) -> ChangelogError:
+    details = {"error": f"No request capacity within {max_wait_seconds} seconds"}
+    if retry_after is not None:
+        details["retry_after_seconds"] = round(retry_after, 1)
+    return ChangelogError(
+        error_type="github_rate_limit",
+        message="GitHub API rate limit exceeded",
+        details=details
+    )
+
+
+def _int_header(headers, name: str) -> Optional[int]:
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+rate_limiter = GitHubRateLimiter(
+    reserve=settings.GITHUB_RATE_LIMIT_RESERVE,
+    pace_below=settings.GITHUB_RATE_LIMIT_PACE_BELOW,
+    max_wait_seconds=settings.GITHUB_RATE_LIMIT_MAX_WAIT_SECONDS,
+    enabled=settings.GITHUB_RATE_LIMIT_ENABLED,
+    sync_every=settings.GITHUB_RATE_LIMIT_SYNC_EVERY,
+    sync_interval_seconds=settings.GITHUB_RATE_LIMIT_SYNC_INTERVAL_SECONDS
+)
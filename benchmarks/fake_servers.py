@@ -0,0 +1,370 @@
+"""
+Local stand-ins for the GitHub and Anthropic APIs used by the benchmark harness.
+
+Both servers answer enough of the real API for the changelog service to run end to
+end, with configurable latency, error injection and (for GitHub) a rate limit.
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+SAMPLE_COMMITS = Path(__file__).resolve().parent.parent / "sample_commits.json"
+
+# Characters of reply text per content_block_delta event when streaming
+STREAM_CHUNK_CHARS = 16
+
+# Commits served by the listing endpoint are spread over this UTC day
+HISTORY_DAY = datetime(2025, 6, 2, tzinfo=timezone.utc)
+
+SHA_PATTERN = re.compile(r"\b[0-9a-f]{40}\b")
+
+
+@dataclass
+class Faults:
+    """Latency and failures injected into every response of a stand-in server"""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+
+    def delay(self) -> None:
+        latency = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+    def should_fail(self) -> bool:
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+
+def _load_samples() -> List[Dict]:
+    try:
+        return json.loads(SAMPLE_COMMITS.read_text())
+    except (OSError, ValueError):
+        return [{"commit": {"message": "chore: update dependencies"}, "author": {"name": "Bench"}}]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeAPI/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeGitHubServer(ThreadingHTTPServer):
+    """
+    Serves /repos/{owner}/{repo}, /repos/{owner}/{repo}/commits/{sha} and the
+    paginated /repos/{owner}/{repo}/commits listing.
+
+    Any repository exists and any well-formed SHA resolves to a synthetic commit
+    shaped like sample_commits.json, with `files_per_commit` patched files. A
+    repository named like `owner/history-<n>-...` lists n commits on HISTORY_DAY.
+    Responses carry ETag and X-RateLimit-* headers; once `rate_limit` requests have
+    been served in the current `rate_window` seconds, requests get a 403 until the
+    window resets.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        faults: Optional[Faults] = None,
+        files_per_commit: int = 4,
+        rate_limit: int = 1_000_000,
+        rate_window: float = 3600.0
+    ):
+        super().__init__(address, FakeGitHubHandler)
+        self.faults = faults or Faults()
+        self.files_per_commit = files_per_commit
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.samples = _load_samples()
+        self.requests = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+        self._window_start = time.time()
+        self._window_used = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def take_budget(self) -> Tuple[bool, Dict[str, str]]:
+        """Count one request against the rate limit; returns (allowed, rate-limit headers)"""
+        with self._lock:
+            self.requests += 1
+            now = time.time()
+            if now - self._window_start >= self.rate_window:
+                self._window_start = now
+                self._window_used = 0
+            allowed = self._window_used < self.rate_limit
+            if allowed:
+                self._window_used += 1
+            else:
+                self.rate_limited += 1
+            headers = {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(self.rate_limit - self._window_used),
+                "X-RateLimit-Reset": str(int(self._window_start + self.rate_window) + 1)
+            }
+        return allowed, headers
+
+    def commit_payload(self, repository: str, sha: str, with_files: bool = True, date: Optional[datetime] = None) -> Dict:
+        seed = int(sha[:8], 16)
+        sample = self.samples[seed % len(self.samples)]
+        message = (sample.get("commit") or {}).get("message", "chore: update")
+        author = (sample.get("author") or {}).get("name", "Bench")
+        date = date or HISTORY_DAY + timedelta(seconds=seed % 86400)
+        payload = {
+            "sha": sha,
+            "url": f"{self.url}/repos/{repository}/commits/{sha}",
+            "html_url": f"https://github.com/{repository}/commit/{sha}",
+            "commit": {
+                "message": f"{message} ({sha[:7]})\n\nDetails for change {seed % 1000}.",
+                "author": {"name": author, "date": date.isoformat()},
+                "committer": {"name": author, "date": date.isoformat()}
+            },
+            "author": {"login": author.lower().replace(" ", "")}
+        }
+        if with_files:
+            files = []
+            for index in range(self.files_per_commit):
+                lines = [f"+    value_{index}_{line} = compute({line})" for line in range(20 + seed % 30)]
+                files.append({
+                    "filename": f"src/module_{(seed + index) % 50}/file_{index}.py",
+                    "status": "modified",
+                    "additions": len(lines),
+                    "deletions": 2,
+                    "changes": len(lines) + 2,
+                    "patch": "@@ -1,4 +1,30 @@\n-    old = 1\n-    older = 2\n" + "\n".join(lines)
+                })
+            payload["files"] = files
+            payload["stats"] = {
+                "additions": sum(f["additions"] for f in files),
+                "deletions": sum(f["deletions"] for f in files),
+                "total": sum(f["changes"] for f in files)
+            }
+        return payload
+
+    def history(self, repository: str) -> List[Dict]:
+        """Listing entries for `owner/history-<n>-...`, newest first"""
+        match = re.search(r"/history-(\d+)", repository)
+        count = int(match.group(1)) if match else 0
+        step = 86400 / max(count, 1)
+        entries = []
+        for index in range(count):
+            sha = hashlib.sha1(f"{repository}:{index}".encode()).hexdigest()
+            date = HISTORY_DAY + timedelta(seconds=int(index * step))
+            entries.append(self.commit_payload(repository, sha, with_files=False, date=date))
+        entries.reverse()
+        return entries
+
+
+class FakeGitHubHandler(_Handler):
+    server: FakeGitHubServer
+
+    def do_GET(self):
+        self.server.faults.delay()
+        allowed, headers = self.server.take_budget()
+        if not allowed:
+            return self._send_json(403, {"message": "API rate limit exceeded"}, dict(headers, **{"X-RateLimit-Remaining": "0"}))
+        if self.server.faults.should_fail():
+            return self._send_json(502, {"message": "Server Error"}, headers)
+
+        parsed = urlparse(self.path)
+        parts = [part for part in parsed.path.split("/") if part]
+        if len(parts) < 3 or parts[0] != "repos":
+            return self._send_json(404, {"message": "Not Found"}, headers)
+        repository = f"{parts[1]}/{parts[2]}"
+
+        if len(parts) == 3:
+            payload = {"full_name": repository, "default_branch": "main", "private": False}
+        elif len(parts) == 5 and parts[3] == "commits":
+            sha = parts[4].lower()
+            if not re.fullmatch(r"[0-9a-f]{7,40}", sha):
+                return self._send_json(422, {"message": "No commit found for SHA"}, headers)
+            payload = self.server.commit_payload(repository, sha.ljust(40, "0"))
+        elif len(parts) == 4 and parts[3] == "commits":
+            return self._list_commits(repository, parse_qs(parsed.query), headers)
+        else:
+            return self._send_json(404, {"message": "Not Found"}, headers)
+
+        self._send_cacheable(payload, headers)
+
+    def _list_commits(self, repository: str, query: Dict[str, List[str]], headers: Dict[str, str]) -> None:
+        since = datetime.fromisoformat(query["since"][0]) if "since" in query else None
+        until = datetime.fromisoformat(query["until"][0]) if "until" in query else None
+        per_page = int(query.get("per_page", ["30"])[0])
+        page = int(query.get("page", ["1"])[0])
+
+        entries = [
+            entry for entry in self.server.history(repository)
+            if (since is None or datetime.fromisoformat(entry["commit"]["committer"]["date"]) >= since)
+            and (until is None or datetime.fromisoformat(entry["commit"]["committer"]["date"]) <= until)
+        ]
+        last_page = max(1, -(-len(entries) // per_page))
+        if last_page > 1:
+            base = f"{self.server.url}/repos/{repository}/commits"
+            links = []
+            if page < last_page:
+                links.append(f'<{base}?per_page={per_page}&page={page + 1}>; rel="next"')
+            links.append(f'<{base}?per_page={per_page}&page={last_page}>; rel="last"')
+            headers = dict(headers, Link=", ".join(links))
+        self._send_cacheable(entries[(page - 1) * per_page:page * per_page], headers)
+
+    def _send_cacheable(self, payload, headers: Dict[str, str]) -> None:
+        etag = '"' + hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        self._send_json(200, payload, dict(headers, ETag=etag))
+
+
+class FakeAnthropicServer(ThreadingHTTPServer):
+    """
+    Serves POST /v1/messages with a changelog JSON object for the commits named in
+    the prompt. Latency is `faults` plus `ms_per_output_token` for each token of the
+    reply, to model generation time; usage is estimated at four characters per token.
+    With "stream": true the reply is sent as server-sent events (message_start, one
+    text block of content_block_delta events, message_delta, message_stop) and the
+    generation time is spread across the deltas.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        faults: Optional[Faults] = None,
+        ms_per_output_token: float = 0.0
+    ):
+        super().__init__(address, FakeAnthropicHandler)
+        self.faults = faults or Faults()
+        self.ms_per_output_token = ms_per_output_token
+        self.requests = 0
+        self.input_tokens = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+
+class FakeAnthropicHandler(_Handler):
+    server: FakeAnthropicServer
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        self.server.faults.delay()
+        if self.server.faults.should_fail():
+            return self._send_json(529, {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}})
+        if urlparse(self.path).path != "/v1/messages":
+            return self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": "Not supported"}})
+
+        prompt = "".join(
+            message["content"] if isinstance(message["content"], str)
+            else "".join(block.get("text", "") for block in message["content"])
+            for message in body.get("messages", [])
+        )
+        shas = list(dict.fromkeys(SHA_PATTERN.findall(prompt)))
+        changelog = {
+            "type": "Feature",
+            "description": f"Benchmark changelog covering {len(shas)} commits.",
+            "impact": "Synthetic output from the local Anthropic stand-in.",
+            "commit_count": len(shas),
+            "commits": [
+                {"sha": sha, "url": f"https://github.com/bench/repo/commit/{sha}", "message": f"change {sha[:7]}"}
+                for sha in shas
+            ]
+        }
+        text = json.dumps(changelog)
+        input_tokens = (len(prompt) + len(body.get("system") or "")) // 4
+        output_tokens = len(text) // 4
+        with self.server._lock:
+            self.server.requests += 1
+            self.server.input_tokens += input_tokens
+            message_id = f"msg_bench_{self.server.requests}"
+
+        message = {
+            "id": message_id,
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "claude-bench"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens}
+        }
+        if body.get("stream"):
+            return self._stream_message(message)
+        if self.server.ms_per_output_token:
+            time.sleep(output_tokens * self.server.ms_per_output_token / 1000)
+        self._send_json(200, message)
+
+    def _stream_message(self, message: Dict) -> None:
+        """Send `message` as the event stream of a streaming Messages API response"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        text = message["content"][0]["text"]
+        usage = message["usage"]
+        self._send_event("message_start", {
+            "type": "message_start",
+            "message": dict(message, content=[], stop_reason=None, usage=dict(usage, output_tokens=1))
+        })
+        self._send_event("content_block_start", {
+            "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}
+        })
+        for start in range(0, len(text), STREAM_CHUNK_CHARS):
+            chunk = text[start:start + STREAM_CHUNK_CHARS]
+            if self.server.ms_per_output_token:
+                time.sleep(len(chunk) / 4 * self.server.ms_per_output_token / 1000)
+            self._send_event("content_block_delta", {
+                "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk}
+            })
+        self._send_event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        self._send_event("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+            "usage": {"output_tokens": usage["output_tokens"]}
+        })
+        self._send_event("message_stop", {"type": "message_stop"})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send_event(self, event: str, data: Dict) -> None:
+        payload = f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+        self.wfile.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+        self.wfile.flush()
+
+
+def serve_in_background(server: ThreadingHTTPServer) -> threading.Thread:
+    thread = threading.Thread(target=server.serve_forever, name=type(server).__name__, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,305 @@
+"""
+Offline end-to-end benchmark for the changelog service.
+
+Starts the GitHub and Anthropic stand-ins from fake_servers.py, runs the API with
+uvicorn against a fresh SQLite database pointed at them, and drives
+/api/v1/generate and /api/v1/commits at several commit counts and concurrency
+levels. Reports p50/p95/p99 latency, throughput and the server's peak RSS, and
+optionally writes them as JSON so runs can be compared over time.
+
+    python -m benchmarks.run --counts 1,50,500 --concurrency 1,8,32 --output bench.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from benchmarks.fake_servers import FakeAnthropicServer, FakeGitHubServer, Faults, HISTORY_DAY, serve_in_background
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def peak_rss_kb(pid: int) -> Optional[int]:
+    """Peak resident set size of a running process (Linux /proc), in KiB"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Server:
+    """The API under test, run by uvicorn in a subprocess"""
+
+    def __init__(self, github_url: str, anthropic_url: str, workdir: str, port: int, workers: int):
+        self.url = f"http://127.0.0.1:{port}"
+        env = dict(
+            os.environ,
+            ANTHROPIC_API_KEY="bench",
+            ANTHROPIC_BASE_URL=anthropic_url,
+            GITHUB_CLIENT_ID="bench",
+            GITHUB_CLIENT_SECRET="bench",
+            GITHUB_TOKEN="bench",
+            GITHUB_API_URL=github_url,
+            SQLALCHEMY_DATABASE_URI=f"sqlite:///{workdir}/bench.db",
+            JOB_WORKER_CONCURRENCY="0",
+            LOG_LEVEL="WARNING"
+        )
+        self.process = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "main:app",
+                "--host", "127.0.0.1", "--port", str(port),
+                "--workers", str(workers), "--log-level", "warning", "--no-access-log"
+            ],
+            cwd=ROOT,
+            env=env
+        )
+
+    def wait_ready(self, timeout: float = 60.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"API server exited with status {self.process.returncode}")
+            try:
+                requests.get(self.url + "/", timeout=1)
+                return
+            except requests.RequestException:
+                time.sleep(0.2)
+        raise RuntimeError("API server did not start in time")
+
+    def peak_rss_kb(self) -> Optional[int]:
+        # With --workers > 1 the workers are children of this process; report the largest
+        pids = [self.process.pid]
+        try:
+            with open(f"/proc/{self.process.pid}/task/{self.process.pid}/children") as children:
+                pids.extend(int(pid) for pid in children.read().split())
+        except OSError:
+            pass
+        peaks = [peak for peak in (peak_rss_kb(pid) for pid in pids) if peak is not None]
+        return max(peaks) if peaks else None
+
+    def stop(self) -> Optional[int]:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        # Fallback when /proc is unavailable (ru_maxrss is KiB on Linux, bytes on macOS)
+        maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        return maxrss // 1024 if sys.platform == "darwin" else maxrss
+
+
+def _payload(endpoint: str, commits: int, index: int, warm: bool) -> Tuple[str, Dict]:
+    tag = "warm" if warm else f"{index}-{secrets.token_hex(4)}"
+    if endpoint == "generate":
+        # Fresh SHAs per request miss the commit cache unless --warm
+        shas = [f"{n:040x}" if warm else secrets.token_hex(20) for n in range(commits)]
+        return "/api/v1/generate", {
+            "repository": f"bench/generate-{tag}",
+            "commit_shas": shas,
+            "bypass_cache": not warm
+        }
+    day = HISTORY_DAY.strftime("%Y-%m-%dT00:00:00Z")
+    return "/api/v1/commits", {
+        "repository": f"bench/history-{commits}-{tag}",
+        "start_date": day,
+        "end_date": day
+    }
+
+
+def run_scenario(
+    server: Server,
+    endpoint: str,
+    commits: int,
+    concurrency: int,
+    total: int,
+    warm: bool,
+    timeout: float
+) -> Dict:
+    local = threading.local()
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def one(index: int) -> None:
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        path, payload = _payload(endpoint, commits, index, warm)
+        start = time.perf_counter()
+        try:
+            response = session.post(server.url + path, json=payload, timeout=timeout)
+            status = str(response.status_code)
+        except requests.RequestException as e:
+            status = type(e).__name__
+        elapsed = time.perf_counter() - start
+        with lock:
+            if status == "200":
+                latencies.append(elapsed)
+            else:
+                errors[status] = errors.get(status, 0) + 1
+
+    if warm:
+        # Populate the caches before measuring
+        one(-1)
+        latencies.clear()
+        errors.clear()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(total)))
+    wall = time.perf_counter() - started
+
+    return {
+        "endpoint": endpoint,
+        "commits": commits,
+        "concurrency": concurrency,
+        "requests": total,
+        "ok": len(latencies),
+        "errors": errors,
+        "p50_ms": _ms(percentile(latencies, 0.50)),
+        "p95_ms": _ms(percentile(latencies, 0.95)),
+        "p99_ms": _ms(percentile(latencies, 0.99)),
+        "throughput_rps": round(len(latencies) / wall, 3) if wall else None,
+        "wall_seconds": round(wall, 3),
+        "peak_rss_kb": server.peak_rss_kb()
+    }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", default="generate,commits", help="Comma-separated: generate, commits")
+    parser.add_argument("--counts", type=_int_list, default=[1, 50, 500], help="Commits per request")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32], help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per scenario (at least the concurrency)")
+    parser.add_argument("--warm", action="store_true", help="Repeat identical requests so caches are exercised")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=0, help="API server port (default: a free port)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Per-request client timeout in seconds")
+    parser.add_argument("--github-latency-ms", type=float, default=30.0)
+    parser.add_argument("--github-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--github-error-rate", type=float, default=0.0, help="Fraction of GitHub responses that are 502")
+    # High by default so the service's own pacing (below GITHUB_RATE_LIMIT_PACE_BELOW) stays out of the way
+    parser.add_argument("--github-rate-limit", type=int, default=1_000_000, help="Requests per rate-limit window")
+    parser.add_argument("--github-rate-window", type=float, default=3600.0, help="Rate-limit window in seconds")
+    parser.add_argument("--github-files-per-commit", type=int, default=4)
+    parser.add_argument("--anthropic-latency-ms", type=float, default=400.0)
+    parser.add_argument("--anthropic-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--anthropic-ms-per-token", type=float, default=0.0, help="Extra latency per output token")
+    parser.add_argument("--anthropic-error-rate", type=float, default=0.0, help="Fraction of Claude calls that are 529")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    github = FakeGitHubServer(
+        faults=Faults(args.github_latency_ms, args.github_jitter_ms, args.github_error_rate),
+        files_per_commit=args.github_files_per_commit,
+        rate_limit=args.github_rate_limit,
+        rate_window=args.github_rate_window
+    )
+    anthropic = FakeAnthropicServer(
+        faults=Faults(args.anthropic_latency_ms, args.anthropic_jitter_ms, args.anthropic_error_rate),
+        ms_per_output_token=args.anthropic_ms_per_token
+    )
+    serve_in_background(github)
+    serve_in_background(anthropic)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="changelog-bench-") as workdir:
+        server = Server(github.url, anthropic.url, workdir, args.port or free_port(), args.workers)
+        try:
+            server.wait_ready()
+            print(f"{'endpoint':<10}{'commits':>8}{'conc':>6}{'ok':>6}{'err':>5}"
+                  f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}{'rss MiB':>9}")
+            for endpoint in [name.strip() for name in args.endpoints.split(",") if name.strip()]:
+                for commits in args.counts:
+                    for concurrency in args.concurrency:
+                        result = run_scenario(
+                            server, endpoint, commits, concurrency,
+                            max(args.requests, concurrency), args.warm, args.timeout
+                        )
+                        results.append(result)
+                        rss = result["peak_rss_kb"]
+                        print(f"{endpoint:<10}{commits:>8}{concurrency:>6}{result['ok']:>6}"
+                              f"{sum(result['errors'].values()):>5}"
+                              f"{result['p50_ms'] or '-':>10}{result['p95_ms'] or '-':>10}{result['p99_ms'] or '-':>10}"
+                              f"{result['throughput_rps']:>9}{round(rss / 1024, 1) if rss else '-':>9}", flush=True)
+        finally:
+            fallback_rss = server.stop()
+            github.shutdown()
+            anthropic.shutdown()
+
+    report = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "args": {key: value for key, value in vars(args).items() if key != "output"},
+        "peak_rss_kb": max([r["peak_rss_kb"] for r in results if r["peak_rss_kb"]] or [fallback_rss]),
+        "github": {"requests": github.requests, "rate_limited": github.rate_limited},
+        "anthropic": {"requests": anthropic.requests, "input_tokens": anthropic.input_tokens},
+        "results": results
+    }
+    print(f"Peak RSS {round(report['peak_rss_kb'] / 1024, 1)} MiB; "
+          f"{github.requests} GitHub requests ({github.rate_limited} rate limited), "
+          f"{anthropic.requests} Claude calls")
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
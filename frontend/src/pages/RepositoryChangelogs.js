@@ -40,32 +40,27 @@ const RepositoryChangelogs = ({ repository }) => {
     const fetchChangelogs = async () => {
       try {
         console.log('Fetching changelogs for repository:', decodedRepo);
-        const response = await axios.get('/changelogs');
-        console.log('API Response:', response.data);
-        
-        if (!response.data || !response.data.changelogs) {
-          console.error('Invalid API response format:', response.data);
-          setError('Invalid API response format');
-          return;
-        }
+        // Follow the cursor through every page for this repository
+        const repositoryChangelogs = [];
+        let cursor = null;
+        do {
+          const response = await axios.get('/changelogs', {
+            params: { repository: decodedRepo, limit: 200, ...(cursor ? { cursor } : {}) }
+          });
+          console.log('API Response:', response.data);
 
-        const allChangelogs = response.data.changelogs;
-        console.log('All changelogs:', allChangelogs);
-        
-        // Check repository names in the data
-        const uniqueRepos = new Set(allChangelogs.map(c => c.repository));
-        console.log('Unique repositories in data:', Array.from(uniqueRepos));
-        
-        const filteredChangelogs = allChangelogs.filter(
-          changelog => {
-            console.log(`Checking changelog: ${changelog.repository} === ${decodedRepo}`);
-            console.log('Changelog repository:', changelog.repository);
-            return changelog.repository === decodedRepo;
+          if (!response.data || !response.data.changelogs) {
+            console.error('Invalid API response format:', response.data);
+            setError('Invalid API response format');
+            return;
           }
-        );
-        
-        console.log('Filtered changelogs:', filteredChangelogs);
-        setChangelogs(filteredChangelogs);
+
+          repositoryChangelogs.push(...response.data.changelogs);
+          cursor = response.data.next_cursor;
+        } while (cursor);
+
+        console.log('Filtered changelogs:', repositoryChangelogs);
+        setChangelogs(repositoryChangelogs);
       } catch (err) {
         console.error('Error fetching changelogs:', err);
         setError('Failed to fetch changelogs: ' + (err.message || 'Unknown error'));
@@ -19,12 +19,8 @@ const ViewChangelogs = () => {
   useEffect(() => {
     const fetchRepositories = async () => {
       try {
-        const response = await axios.get('/changelogs');
-        const allChangelogs = response.data.changelogs || [];
-        
-        // Get unique repositories
-        const uniqueRepos = [...new Set(allChangelogs.map(c => c.repository))];
-        setRepositories(uniqueRepos);
+        const response = await axios.get('/changelogs/repositories');
+        setRepositories(response.data.repositories || []);
       } catch (err) {
         console.error('Error fetching repositories:', err.response?.data || err.message);
       } finally {
@@ -1,19 +1,39 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router
 from app.core.config import settings
-from app.db.session import engine
+from app.db.migrations import run_migrations
+from app.db.session import async_engine, engine
 from app.models.changelog import Base
+from app.services.changelog_generator import ChangelogGenerator
+from app.services.github_http import github_http
+from app.services.job_queue import job_queue
+
+# Create database tables
+Base.metadata.create_all(bind=engine)
+run_migrations(engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One generator (and its pooled HTTP clients) serves every request and job
+    generator = ChangelogGenerator()
+    app.state.generator = generator
+    # Background workers resume any jobs left queued or running by a previous process
+    job_queue.start(generator)
+    yield
+    job_queue.stop()
+    generator.close()
+    github_http.close()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="Changelog Generator API",
     description="AI-powered changelog generation service",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
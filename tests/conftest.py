@@ -0,0 +1,84 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read at import time: use dummy credentials and a throwaway database
+_db_dir = tempfile.mkdtemp(prefix="changelog-tests-")
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{_db_dir}/test.db"
+os.environ.pop("SQLALCHEMY_ASYNC_DATABASE_URI", None)
+for name in ("ANTHROPIC_API_KEY", "GITHUB_CLIENT_ID", "GITHUB_CLIENT_SECRET", "GITHUB_TOKEN"):
+    os.environ.setdefault(name, "test")
+os.environ["JOB_WORKER_CONCURRENCY"] = "0"
+
+from app.db.session import engine  # noqa: E402
+from app.models.changelog import Base  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """Empty tables for one test"""
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def github(monkeypatch):
+    """GitHub API calls answered by a StubGitHub instead of the network"""
+    from app.services.github_http import github_http
+    from app.services.github_source import missing_commit_cache, repository_cache
+    from tests.stubs import StubGitHub
+
+    stub = StubGitHub()
+    monkeypatch.setattr(github_http, "get", stub.get)
+    repository_cache.clear()
+    missing_commit_cache.clear()
+    yield stub
+    repository_cache.clear()
+    missing_commit_cache.clear()
+
+
+@pytest.fixture
+def claude():
+    """Stand-in for the Claude client's messages API"""
+    from tests.stubs import StubClaude
+
+    return StubClaude()
+
+
+@pytest.fixture
+def caches():
+    """Empty in-process commit and LLM caches (the tables are emptied by `db`)"""
+    from app.services.commit_cache import commit_cache
+    from app.services.llm_cache import llm_cache
+
+    commit_cache.memory.clear()
+    llm_cache.memory.clear()
+    yield
+    commit_cache.memory.clear()
+    llm_cache.memory.clear()
+
+
+@pytest.fixture
+def generator(db, caches, claude):
+    """ChangelogGenerator answering from a StubClaude"""
+    from app.services.changelog_generator import ChangelogGenerator
+
+    generator = ChangelogGenerator()
+    generator.close()
+    generator.anthropic_client = claude
+    yield generator
+
+
+@pytest.fixture
+def client(db, caches, github, claude):
+    """TestClient for the application, with its lifespan (generator, job queue) running"""
+    from fastapi.testclient import TestClient
+
+    from main import app
+
+    with TestClient(app) as client:
+        app.state.generator.close()
+        app.state.generator.anthropic_client = claude
+        yield client
@@ -0,0 +1,147 @@
+"""Stand-ins for the GitHub API and Claude shared by the commit source, generator and API tests"""
+import json
+import re
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import requests
+
+from app.core.config import settings
+
+API = settings.GITHUB_API_URL
+
+
+def json_response(payload, status: int = 200, next_url: Optional[str] = None, last_url: Optional[str] = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(payload).encode("utf-8")
+    response.encoding = "utf-8"
+    response.headers["Content-Type"] = "application/json"
+    links = []
+    if next_url:
+        links.append(f'<{next_url}>; rel="next"')
+    if last_url:
+        links.append(f'<{last_url}>; rel="last"')
+    if links:
+        response.headers["Link"] = ", ".join(links)
+    return response
+
+
+def commit_payload(repository: str, sha: str, message: str = "", files: Optional[List[Dict]] = None, date: str = "2025-01-01T00:00:00Z") -> Dict:
+    return {
+        "sha": sha,
+        "url": f"{API}/repos/{repository}/commits/{sha}",
+        "html_url": f"https://github.com/{repository}/commit/{sha}",
+        "author": {"login": "octocat"},
+        "commit": {
+            "message": message or f"Change {sha[:7]}",
+            "author": {"name": "Octo Cat", "date": date},
+            "committer": {"date": date}
+        },
+        "files": files if files is not None else [file_entry(f"src/{sha[:7]}.py")]
+    }
+
+
+def file_entry(filename: str, additions: int = 1) -> Dict:
+    return {
+        "filename": filename,
+        "status": "modified",
+        "additions": additions,
+        "deletions": 0,
+        "patch": "@@ -1 +1 @@\n" + "".join(f"+line {n}\n" for n in range(additions))
+    }
+
+
+class StubGitHub:
+    """
+    Replaces github_http.get: routes map a URL (without query) to a handler taking the
+    query parameters and returning a response. Every request is recorded.
+    """
+
+    def __init__(self):
+        self.routes: Dict[str, Callable[[Dict], requests.Response]] = {}
+        self.requests: List[Tuple[str, Dict]] = []
+        self._lock = threading.Lock()
+
+    def route(self, url: str, handler: Callable[[Dict], requests.Response]) -> None:
+        self.routes[url] = handler
+
+    def repository(self, repository: str) -> None:
+        self.route(f"{API}/repos/{repository}", lambda params: json_response({"full_name": repository}))
+
+    def commit(self, repository: str, sha: str, **fields) -> None:
+        payload = commit_payload(repository, sha, **fields)
+        self.route(f"{API}/repos/{repository}/commits/{sha}", lambda params: json_response(payload))
+
+    def missing(self, repository: str, sha: str, status: int = 404) -> None:
+        self.route(f"{API}/repos/{repository}/commits/{sha}", lambda params: json_response({"message": "No commit found"}, status))
+
+    def calls(self, url: str) -> int:
+        return sum(1 for requested, _ in self.requests if requested == url)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, params: Optional[Dict] = None) -> requests.Response:
+        base, _, query = url.partition("?")
+        params = dict(params or {})
+        for pair in filter(None, query.split("&")):
+            name, _, value = pair.partition("=")
+            params.setdefault(name, value)
+        with self._lock:
+            self.requests.append((base, params))
+        handler = self.routes.get(base)
+        if handler is None:
+            return json_response({"message": "Not Found"}, 404)
+        return handler(params)
+
+
+def page_url(url: str, page: int, **params) -> str:
+    return f"{url}?{urlencode(dict(params, page=page))}"
+
+
+class StubClaude:
+    """
+    Replaces the Anthropic client's messages resource: replies with a changelog listing
+    every SHA in the prompt, streamed in a few chunks when requested. Every request is
+    recorded; set `error` to make calls fail with it.
+    """
+
+    def __init__(self, chunk_chars: int = 40):
+        self.chunk_chars = chunk_chars
+        self.requests: List[Dict] = []
+        self.error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self.messages = self
+
+    def reply(self, request: Dict) -> str:
+        with self._lock:
+            self.requests.append(request)
+        if self.error is not None:
+            raise self.error
+        prompt = request["messages"][0]["content"]
+        shas = list(dict.fromkeys(re.findall(r"\b[0-9a-f]{40}\b", prompt)))
+        return json.dumps({
+            "type": "Feature",
+            "description": f"Changelog covering {len(shas)} commits.",
+            "impact": "Stub output.",
+            "commit_count": len(shas),
+            "commits": [{"sha": sha, "url": f"https://github.com/owner/repo/commit/{sha}", "message": f"change {sha[:7]}"} for sha in shas]
+        })
+
+    def create(self, **request):
+        text = self.reply(request)
+        return SimpleNamespace(content=[SimpleNamespace(text=text)], usage=self._usage(request, text))
+
+    @contextmanager
+    def stream(self, **request):
+        text = self.reply(request)
+        chunks = [text[start:start + self.chunk_chars] for start in range(0, len(text), self.chunk_chars)]
+        message = SimpleNamespace(usage=self._usage(request, text))
+        yield SimpleNamespace(text_stream=iter(chunks), get_final_message=lambda: message)
+
+    def close(self) -> None:
+        pass
+
+    def _usage(self, request: Dict, text: str):
+        return SimpleNamespace(input_tokens=len(request["messages"][0]["content"]) // 4, output_tokens=len(text) // 4)
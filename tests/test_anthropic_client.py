@@ -0,0 +1,30 @@
+import anthropic
+
+from app.core.config import settings
+from app.services.changelog_generator import ChangelogGenerator, create_anthropic_client
+from benchmarks.fake_servers import FakeAnthropicServer, serve_in_background
+
+
+def test_client_uses_the_sdk_transport_with_configured_limits():
+    client = create_anthropic_client()
+    try:
+        assert isinstance(client._client, anthropic.DefaultHttpxClient)
+        assert client.timeout.read == settings.ANTHROPIC_TIMEOUT_SECONDS
+    finally:
+        client.close()
+
+
+def test_generator_builds_its_client_and_reaches_the_api(monkeypatch):
+    server = FakeAnthropicServer()
+    serve_in_background(server)
+    monkeypatch.setattr(settings, "ANTHROPIC_BASE_URL", server.url)
+    generator = ChangelogGenerator()
+    try:
+        response = generator.anthropic_client.messages.create(
+            model="claude-bench", max_tokens=64, messages=[{"role": "user", "content": "Commit SHA: " + "a" * 40}]
+        )
+        assert '"commit_count": 1' in response.content[0].text
+    finally:
+        generator.close()
+        server.shutdown()
+        server.server_close()
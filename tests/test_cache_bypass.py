@@ -0,0 +1,71 @@
+import pytest
+
+from app.db.session import SessionLocal
+from app.models.changelog import CachedCommit, CachedLLMResponse
+from app.services.commit_cache import commit_cache
+from app.services.llm_cache import llm_cache
+from tests.stubs import API
+
+REPO = "owner/repo"
+SHAS = ["a" * 40, "b" * 40]
+
+
+@pytest.fixture
+def commits(github):
+    github.repository(REPO)
+    for n, sha in enumerate(SHAS):
+        github.commit(REPO, sha, message=f"Add retry support to client {n}", date=f"2025-01-0{n + 1}T00:00:00Z")
+    return github
+
+
+def commit_requests(github):
+    return sum(github.calls(f"{API}/repos/{REPO}/commits/{sha}") for sha in SHAS)
+
+
+def stored_rows():
+    db = SessionLocal()
+    try:
+        return db.query(CachedCommit).count(), db.query(CachedLLMResponse).count()
+    finally:
+        db.close()
+
+
+def test_cached_run_is_served_without_github_or_claude(generator, commits, claude):
+    first = generator.generate_from_shas(REPO, SHAS)
+    second = generator.generate_from_shas(REPO, SHAS)
+
+    assert second["description"] == first["description"]
+    assert commit_requests(commits) == len(SHAS)
+    assert len(claude.requests) == 1
+    assert stored_rows() == (len(SHAS), 1)
+
+
+def test_bypass_skips_reading_both_caches(generator, commits, claude):
+    generator.generate_from_shas(REPO, SHAS)
+    bypassed = llm_cache.bypassed
+
+    generator.generate_from_shas(REPO, SHAS, use_cache=False)
+
+    assert commit_requests(commits) == 2 * len(SHAS)
+    assert len(claude.requests) == 2
+    assert llm_cache.bypassed == bypassed + 1
+
+
+def test_bypass_skips_writing_both_caches(generator, commits, claude):
+    generator.generate_from_shas(REPO, SHAS, use_cache=False)
+
+    assert stored_rows() == (0, 0)
+    assert len(commit_cache.memory) == 0
+    assert len(llm_cache.memory) == 0
+
+    # The next cached run still has to go to GitHub and Claude
+    generator.generate_from_shas(REPO, SHAS)
+    assert commit_requests(commits) == 2 * len(SHAS)
+    assert len(claude.requests) == 2
+
+
+def test_streaming_bypass_skips_both_caches(generator, commits, claude):
+    events = list(generator.stream_from_shas(REPO, SHAS, use_cache=False))
+
+    assert events[-1]["event"] == "changelog"
+    assert stored_rows() == (0, 0)
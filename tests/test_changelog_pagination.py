@@ -0,0 +1,24 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.api import _decode_cursor, _encode_cursor
+
+
+def test_cursor_round_trip():
+    date = datetime(2025, 3, 4, 5, 6, 7, 890123)
+    assert _decode_cursor(_encode_cursor(date, 42)) == (date, 42)
+
+
+def test_cursor_is_url_safe():
+    cursor = _encode_cursor(datetime(2025, 12, 31, 23, 59, 59), 10 ** 9)
+    assert all(c.isalnum() or c in "-_=" for c in cursor)
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "", "MjAyNS0wMS0wMQ==", "bm90LWEtZGF0ZXw0Mg=="])
+def test_invalid_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as error:
+        _decode_cursor(cursor)
+    assert error.value.status_code == 400
+    assert error.value.detail["type"] == "InvalidCursor"
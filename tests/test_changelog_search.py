@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.changelog import ChangelogEntry
+from app.services.changelog_search import SEARCH_TABLE, changelog_search, match_expression
+
+
+def test_match_expression_quotes_words_and_prefixes_the_last():
+    assert match_expression("rate limit") == '"rate" "limit"*'
+    assert match_expression("  Retry  ") == '"Retry"*'
+
+
+@pytest.mark.parametrize("query", ['NEAR(a b) OR "x', "title:foo -bar", "a AND NOT b*", "café^"])
+def test_match_expression_never_passes_fts_syntax(query):
+    expression = match_expression(query)
+    assert all(part.startswith('"') and part.rstrip("*").endswith('"') for part in expression.split(" "))
+    assert expression.count('"') % 2 == 0
+
+
+def test_match_expression_without_words():
+    assert match_expression("") is None
+    assert match_expression('"*-()') is None
+
+
+@pytest.fixture
+def search(db):
+    with db.begin() as connection:
+        changelog_search.create(connection)
+    yield db
+    with db.begin() as connection:
+        connection.execute(text(f"DROP TABLE {SEARCH_TABLE}"))
+
+
+def store(session: Session, entry_id: int, repository: str, description: str, impact: str = "", messages=()):
+    changelog_data = {
+        "type": "feature",
+        "description": description,
+        "impact": impact,
+        "commits": [{"message": message} for message in messages]
+    }
+    session.add(ChangelogEntry(id=entry_id, repository=repository, description=description, impact=impact))
+    changelog_search.index(session, entry_id, repository, changelog_data)
+
+
+def test_search_ranks_descriptions_above_commit_messages(search):
+    with Session(search) as session:
+        store(session, 1, "owner/api", "Tidy logging", messages=["Handle rate limits from GitHub"])
+        store(session, 2, "owner/api", "Respect GitHub rate limits", "Fewer failed syncs")
+        store(session, 3, "owner/web", "Rate limited login attempts")
+        store(session, 4, "owner/api", "Dark mode")
+        session.commit()
+
+        rows = session.execute(changelog_search.query(match_expression("rate limit"))).all()
+        ids = [row.id for row in rows]
+        assert sorted(ids) == [1, 2, 3]
+        assert ids[-1] == 1
+        assert "<mark>" in rows[0].snippet
+
+        scoped = session.execute(changelog_search.query(match_expression("rate limit"), repository="owner/web")).all()
+        assert [row.id for row in scoped] == [3]
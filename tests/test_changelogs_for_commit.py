@@ -0,0 +1,59 @@
+import json
+from datetime import datetime, timedelta
+
+from app.db.session import SessionLocal
+from app.models.changelog import ChangelogEntry, commit_rows, headline_values
+
+SHA = "abcdef1" + "0" * 33
+
+
+def store_entries(count: int) -> None:
+    db = SessionLocal()
+    try:
+        for n in range(count):
+            changelog_data = {
+                "type": "fix",
+                "description": f"Release {n}",
+                "impact": "Fewer errors",
+                "commit_count": 1,
+                "commits": [{"sha": SHA[:-2] + f"{n:02x}", "url": "", "message": f"Fix {n}"}]
+            }
+            db.add(ChangelogEntry(
+                repository="owner/repo",
+                version="",
+                changes=json.dumps(changelog_data),
+                author="",
+                status="generated",
+                date=datetime(2025, 1, 1) + timedelta(hours=n // 2),  # pairs share a date
+                commits=commit_rows(changelog_data),
+                **headline_values(changelog_data)
+            ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_prefix_matches_are_paged(client):
+    store_entries(7)
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        body = client.get(f"/api/v1/commits/{SHA[:7]}/changelogs", params=params).json()
+        assert len(body["changelogs"]) <= 3
+        seen.extend(changelog["changes"]["description"] for changelog in body["changelogs"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"Release {n}" for n in (6, 5, 4, 3, 2, 1, 0)]
+
+
+def test_full_sha_and_bounds(client):
+    store_entries(3)
+    body = client.get(f"/api/v1/commits/{SHA[:-2]}01/changelogs").json()
+    assert [changelog["changes"]["description"] for changelog in body["changelogs"]] == ["Release 1"]
+    assert body["next_cursor"] is None
+
+    assert client.get(f"/api/v1/commits/{SHA[:7]}/changelogs", params={"limit": 201}).status_code == 422
+    bad_cursor = client.get(f"/api/v1/commits/{SHA[:7]}/changelogs", params={"cursor": "nope"})
+    assert bad_cursor.status_code == 400
+    assert client.get("/api/v1/commits/abc/changelogs").status_code == 400
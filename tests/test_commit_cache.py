@@ -0,0 +1,33 @@
+from app.db.session import SessionLocal
+from app.models.changelog import CachedCommit
+from app.services.commit_cache import CommitCache
+from app.services.commit_data import COMMIT_FORMAT_VERSION
+
+SHA = "c" * 40
+
+
+def commit(message: str = "Add retries"):
+    return {"sha": SHA, "message": message, "files": [{"filename": "app/http.py", "changes": ["+retry()"]}]}
+
+
+def test_round_trip(db):
+    CommitCache(max_entries=100, memory_entries=0).put_many("owner/repo", [commit()])
+    found = CommitCache(max_entries=100, memory_entries=0).get_many("owner/repo", [SHA])
+    assert found[SHA]["message"] == "Add retries"
+    assert found[SHA]["files"][0]["changes"] == ["+retry()"]
+
+
+def test_rows_from_another_format_version_are_misses(db):
+    cache = CommitCache(max_entries=100, memory_entries=0)
+    cache.put_many("owner/repo", [commit()])
+    session = SessionLocal()
+    session.query(CachedCommit).update({CachedCommit.format_version: COMMIT_FORMAT_VERSION - 1})
+    session.commit()
+    session.close()
+
+    assert cache.get_many("owner/repo", [SHA]) == {}
+    assert cache.misses == 1
+
+    # Storing the reprocessed commit replaces the stale row
+    cache.put_many("owner/repo", [commit("Add retries (reprocessed)")])
+    assert cache.get_many("owner/repo", [SHA])[SHA]["message"] == "Add retries (reprocessed)"
@@ -0,0 +1,52 @@
+import pytest
+
+from app.services.commit_classifier import DEPENDENCY, ROUTINE, CommitClassifier
+
+classifier = CommitClassifier()
+
+
+def commit(message: str, author: str = "octocat", sha: str = "a" * 40):
+    return {"sha": sha, "message": message, "author": author}
+
+
+@pytest.mark.parametrize("message", [
+    "Bump lodash from 4.17.20 to 4.17.21",
+    "bump @types/node from v18.0.1 to v20.1.0",
+    "Update requests requirement from 2.31.0 to 2.32.0",
+    "Upgrade django from 4.2 to 5.0",
+])
+def test_version_pair_is_a_dependency_update(message):
+    assert classifier.classify(commit(message)) == DEPENDENCY
+
+
+@pytest.mark.parametrize("message", [
+    "Update copyright to 2025",
+    "Update copyright from 2024 to 2025",
+    "Upgrade python to 3.12",
+    "Update README to 2 columns",
+    "Pin API to v2 endpoint",
+    "Update dependency requests to v2.32.0",
+])
+def test_human_subjects_without_a_version_pair_are_kept(message):
+    assert classifier.classify(commit(message)) is None
+
+
+def test_bot_authors_and_deps_scopes_are_dependency_updates():
+    assert classifier.classify(commit("Update dependency requests to v2.32.0", author="renovate[bot]")) == DEPENDENCY
+    assert classifier.classify(commit("Bump actions/checkout from 3 to 4", author="dependabot[bot]")) == DEPENDENCY
+    assert classifier.classify(commit("chore(deps): bump the npm group with 3 updates")) == DEPENDENCY
+    assert classifier.classify(commit("build(deps-dev): update pytest to 8.0")) == DEPENDENCY
+    assert classifier.classify(commit("chore: update copyright to 2025")) == ROUTINE
+
+
+def test_breaking_bumps_are_never_collapsed():
+    assert classifier.classify(commit("chore(deps)!: upgrade react from 17.0.2 to 18.0.0")) is None
+
+
+def test_aggregate_line_lists_packages():
+    _, collapsed = classifier.partition([
+        commit("Bump lodash from 4.17.20 to 4.17.21", sha="1" * 40),
+        commit("Update dependency requests to v2.32.0", author="renovate[bot]", sha="2" * 40),
+        commit("chore(deps): bump the npm group with 3 updates", sha="3" * 40),
+    ])
+    assert classifier.aggregate_lines(collapsed) == ["3 dependency updates (lodash, requests)"]
@@ -0,0 +1,77 @@
+from app.services.commit_classifier import REVERTED, CommitClassifier
+from app.services.commit_clusterer import CommitClusterer, patch_id
+from app.services.commit_data import process_files
+
+clusterer = CommitClusterer()
+
+
+def commit(sha: str, message: str, patches=None, **extra):
+    files = []
+    if patches:
+        files, _, _ = process_files(
+            {"filename": filename, "status": "modified", "additions": 1, "deletions": 1, "patch": patch}
+            for filename, patch in patches.items()
+        )
+    return dict({"sha": sha * 40, "message": message, "files": files, "files_summary": ""}, **extra)
+
+
+def long_patch(tail: str) -> str:
+    # Identical well past the lines kept per file, differing only at the end
+    return "@@ -1,200 +1,200 @@ def handler():\n" + "".join(f"+    step_{n}()\n" for n in range(200)) + f"+{tail}\n"
+
+
+def test_patch_id_ignores_sha_message_and_whitespace():
+    original = commit("a", "Add retries", {"app/http.py": "@@ -1 +1 @@\n-x = 1\n+x  =  2\n"})
+    cherry_pick = commit("b", "Add retries (cherry picked)", {"app/http.py": "@@ -10 +10 @@\n-x = 1\n+x = 2\n"})
+    assert patch_id(original) is not None
+    assert patch_id(original) == patch_id(cherry_pick)
+
+
+def test_patch_id_covers_lines_beyond_the_selection():
+    first = commit("a", "Add steps", {"app/steps.py": long_patch("done()")})
+    second = commit("b", "Add steps", {"app/steps.py": long_patch("abort()")})
+    assert first["files"][0]["changes"] == second["files"][0]["changes"]
+    assert patch_id(first) != patch_id(second)
+
+
+def test_patch_id_needs_every_file_read_in_full():
+    assert patch_id(commit("a", "Binary only", {"logo.png": None})) is None
+    assert patch_id(commit("b", "Partial", {"app/a.py": "@@ -1 +1 @@\n+a\n"}, files_summary="At least 300 files")) is None
+
+
+def test_revert_with_trailer_cancels_its_target():
+    original = commit("a", "Add retries")
+    revert = commit("b", 'Revert "Add retries"\n\nThis reverts commit ' + "a" * 12 + ".")
+    left, cancelled = clusterer.cancel_reverts([original, commit("c", "Unrelated"), revert])
+    assert [c["sha"][0] for c in left] == ["c"]
+    assert [c["sha"][0] for c in cancelled] == ["a", "b"]
+
+
+def test_revert_without_trailer_or_with_unknown_target_is_kept():
+    original = commit("a", "Add retries")
+    by_subject = commit("b", 'Revert "Add retries"')
+    elsewhere = commit("c", 'Revert "Add retries"\n\nThis reverts commit ' + "f" * 40 + ".")
+    left, cancelled = clusterer.cancel_reverts([original, by_subject, elsewhere])
+    assert len(left) == 3 and cancelled == []
+
+
+def test_revert_of_revert_reapplies_the_change():
+    original = commit("a", "Add retries")
+    revert = commit("b", 'Revert "Add retries"\n\nThis reverts commit ' + "a" * 40 + ".")
+    reapply = commit("c", 'Revert "Revert "Add retries""\n\nThis reverts commit ' + "b" * 40 + ".")
+    left, _ = clusterer.cancel_reverts([original, revert, reapply])
+    assert [c["sha"][0] for c in left] == ["c"]
+
+
+def test_duplicate_changes_share_a_cluster():
+    patch = {"app/http.py": "@@ -1 +1 @@\n-x = 1\n+x = 2\n"}
+    clusters = clusterer.cluster([commit("a", "Set x", patch), commit("b", "Other", {"docs/x.md": "@@ -1 +1 @@\n+y\n"}), commit("c", "Set x again", patch)])
+    assert [[c["sha"][0] for c in cluster] for cluster in clusters] == [["a", "c"], ["b"]]
+
+
+def test_reverted_line_is_pluralized():
+    classifier = CommitClassifier()
+    assert classifier.aggregate_lines({REVERTED: [commit("a", "x")]}) == ["1 commit cancelled out by reverts within the range"]
+    assert classifier.aggregate_lines({REVERTED: [commit("a", "x"), commit("b", "y")]}) == [
+        "2 commits cancelled out by reverts within the range"
+    ]
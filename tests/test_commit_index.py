@@ -0,0 +1,105 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple
+
+from app.models.changelog import SyncWatermark
+from app.services.commit_index import CommitIndex
+from app.services.commit_source import CommitSource
+
+NOW = datetime(2025, 6, 30, 12, 0, 0)
+
+
+class FakeSource(CommitSource):
+    name = "fake"
+
+    def __init__(self, commits: List[Tuple[str, datetime]]):
+        self.commits = commits
+        self.windows: List[Tuple[datetime, datetime]] = []
+
+    def list_commits(self, repository, since, until):
+        since, until = since.replace(tzinfo=None), until.replace(tzinfo=None)
+        self.windows.append((since, until))
+        return [
+            (sha, committed_at.replace(tzinfo=timezone.utc))
+            for sha, committed_at in self.commits
+            if since <= committed_at <= until
+        ]
+
+
+def watermark(since: datetime, until: datetime, synced_at=None) -> SyncWatermark:
+    return SyncWatermark(repository="owner/repo", source="fake", covered_since=since, covered_until=until, synced_at=synced_at)
+
+
+def make_index() -> CommitIndex:
+    return CommitIndex(overlap_seconds=3600, min_sync_seconds=60)
+
+
+def test_first_query_lists_exactly_the_range():
+    since, until = NOW - timedelta(days=2), NOW - timedelta(days=1)
+    assert make_index().missing_windows(None, since, until, NOW) == [(since, until)]
+
+
+def test_query_inside_coverage_lists_nothing():
+    mark = watermark(NOW - timedelta(days=30), NOW - timedelta(days=1))
+    windows = make_index().missing_windows(mark, NOW - timedelta(days=10), NOW - timedelta(days=9), NOW)
+    assert windows == []
+
+
+def test_past_query_beyond_coverage_stops_at_its_end():
+    covered_until = NOW - timedelta(days=60)
+    mark = watermark(NOW - timedelta(days=90), covered_until)
+    until = NOW - timedelta(days=50)
+
+    windows = make_index().missing_windows(mark, NOW - timedelta(days=52), until, NOW)
+
+    # Starts inside the overlap so coverage stays contiguous, and never reaches today
+    assert windows == [(covered_until - timedelta(hours=1), until)]
+
+
+def test_older_history_and_refresh_windows():
+    mark = watermark(NOW - timedelta(days=10), NOW - timedelta(hours=2))
+    since = NOW - timedelta(days=12)
+
+    windows = make_index().missing_windows(mark, since, NOW, NOW)
+
+    assert windows == [(since, NOW - timedelta(days=10)), (NOW - timedelta(hours=3), NOW)]
+
+
+def test_recent_sync_skips_refresh():
+    mark = watermark(NOW - timedelta(days=10), NOW - timedelta(seconds=30), synced_at=NOW - timedelta(seconds=30))
+    assert make_index().missing_windows(mark, NOW - timedelta(days=1), NOW, NOW) == []
+
+
+def test_watermark_advances_only_to_what_was_listed(db):
+    commits = [(f"{n:040x}", datetime(2025, 1, 1) + timedelta(days=n)) for n in range(100)]
+    source = FakeSource(commits)
+    index = make_index()
+
+    first = index.shas_between(source, "owner/repo", datetime(2025, 1, 10), datetime(2025, 1, 20, 23, 59))
+    second = index.shas_between(source, "owner/repo", datetime(2025, 1, 25), datetime(2025, 1, 30, 23, 59))
+
+    assert len(first) == 11 and len(second) == 6
+    assert all(until <= datetime(2025, 1, 30, 23, 59) for _, until in source.windows)
+    # A query inside what has been listed is answered from the index alone
+    source.windows.clear()
+    assert len(index.shas_between(source, "owner/repo", datetime(2025, 1, 12), datetime(2025, 1, 28, 23, 59))) == 17
+    assert source.windows == []
+
+
+def test_slow_stream_consumer_does_not_hold_repository_lock(db):
+    commits = [(f"{n:040x}", datetime(2025, 1, 1) + timedelta(hours=n)) for n in range(10)]
+    index = make_index()
+
+    stream = index.iter_shas_between(FakeSource(commits), "owner/repo", datetime(2025, 1, 1), datetime(2025, 1, 1, 23, 59))
+    first = next(stream)
+
+    # While the first consumer is paused mid-stream, another request for the repository completes
+    done = threading.Event()
+
+    def other():
+        index.shas_between(FakeSource(commits), "owner/repo", datetime(2025, 1, 1), datetime(2025, 1, 1, 23, 59))
+        done.set()
+
+    threading.Thread(target=other, daemon=True).start()
+    assert done.wait(5)
+    assert sorted([first] + list(stream)) == sorted(sha for sha, _ in commits)
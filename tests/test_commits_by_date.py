@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+from app.services.commit_index import commit_index
+from tests.stubs import API, commit_payload, json_response
+
+REPOSITORY = "owner/repo"
+LISTING = f"{API}/repos/{REPOSITORY}/commits"
+
+
+def history(days: int = 60, per_day: int = 3):
+    """Commits spread over January and February 2025, newest first like GitHub lists them"""
+    commits = []
+    for day in range(days):
+        for n in range(per_day):
+            date = datetime(2025, 1, 1, 8, n) + timedelta(days=day)
+            commits.append((f"{day:020x}{n:020x}", date))
+    return sorted(commits, key=lambda commit: commit[1], reverse=True)
+
+
+def serve_listing(github, commits, page_size=100):
+    def handler(params):
+        since = datetime.fromisoformat(params["since"]).replace(tzinfo=None)
+        until = datetime.fromisoformat(params["until"]).replace(tzinfo=None)
+        listed = [commit for commit in commits if since <= commit[1] <= until]
+        page = int(params.get("page", 1))
+        pages = max(1, -(-len(listed) // page_size))
+        chunk = listed[(page - 1) * page_size:page * page_size]
+        return json_response(
+            [commit_payload(REPOSITORY, sha, date=date.isoformat() + "Z") for sha, date in chunk],
+            last_url=f"{LISTING}?page={pages}" if pages > 1 else None
+        )
+
+    github.repository(REPOSITORY)
+    github.route(LISTING, handler)
+
+
+def request_range(client, start, end):
+    response = client.post("/api/v1/commits", json={"repository": REPOSITORY, "start_date": start, "end_date": end})
+    assert response.status_code == 200
+    return response.json()
+
+
+def expected(commits, start, end):
+    return {sha for sha, date in commits if start <= date <= end}
+
+
+def test_range_is_listed_once_then_served_from_the_index(client, github):
+    commits = history(per_day=10)
+    serve_listing(github, commits)
+
+    body = request_range(client, "2025-01-10", "2025-01-31")
+    january = expected(commits, datetime(2025, 1, 10), datetime(2025, 2, 1))
+    assert body["success"] is True
+    assert set(body["shas"]) == january and len(body["shas"]) == len(january)
+    listed = github.calls(LISTING)
+    assert listed == 3  # 220 commits at 100 per page, pages 2 and 3 fetched concurrently
+
+    # Inside the covered range: no upstream listing at all
+    assert set(request_range(client, "2025-01-15", "2025-01-20")["shas"]) == expected(
+        commits, datetime(2025, 1, 15), datetime(2025, 1, 21)
+    )
+    assert github.calls(LISTING) == listed
+
+    # Extending the range only lists what the watermark lacks
+    extended = request_range(client, "2025-01-10", "2025-02-05")
+    assert set(extended["shas"]) == expected(commits, datetime(2025, 1, 10), datetime(2025, 2, 6))
+    windows = [params for url, params in github.requests[listed:] if url == LISTING]
+    # One window from just before the old end (the re-listed overlap), never the covered start
+    assert len(windows) == 1 and "2025-01-30" <= windows[0]["since"] < "2025-02-01"
+
+
+def test_listing_failure_after_the_first_sha_ends_the_body_with_an_error(client, github, monkeypatch):
+    serve_listing(github, history(days=5))
+
+    def failing(source, repository, since, until):
+        yield "f" * 40
+        raise RuntimeError("listing interrupted")
+
+    monkeypatch.setattr(commit_index, "iter_shas_between", failing)
+    body = request_range(client, "2025-01-01", "2025-01-05")
+    assert body["shas"] == ["f" * 40]
+    assert body["success"] is False
+    assert body["error"]["type"] == "generation_error"
+
+
+def test_invalid_dates_are_a_bad_request(client, github):
+    response = client.post("/api/v1/commits", json={"repository": REPOSITORY, "start_date": "soon", "end_date": "later"})
+    assert response.status_code == 400
+    assert response.json()["detail"]["type"] == "invalid_input"
+
+
+def test_empty_range(client, github):
+    serve_listing(github, history(days=5))
+    assert request_range(client, "2024-06-01", "2024-06-02") == {"shas": [], "success": True}
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+from app.exceptions import ChangelogError
+from app.services.github_source import GitHubCommitSource
+from tests.stubs import API, commit_payload, file_entry, json_response
+
+REPOSITORY = "owner/repo"
+COMPARE_URL = f"{API}/repos/{REPOSITORY}/compare/v1.0...release/2.0"
+
+
+def history(count):
+    """Compare-style commit records (no file lists), oldest first"""
+    commits = []
+    for n in range(count):
+        commit = commit_payload(REPOSITORY, f"{n + 1:040x}", message=f"Change number {n}")
+        del commit["files"]
+        commits.append(commit)
+    return commits
+
+
+def serve_compare(github, commits, files=(), slow_pages=(), failing_pages=()):
+    """Serve `commits` 100 per page like the compare API, with the range's files on every page"""
+    def handler(params):
+        page, per_page = int(params["page"]), int(params["per_page"])
+        if page in slow_pages:
+            time.sleep(0.05)
+        if page in failing_pages:
+            return json_response({"message": "Server Error"}, 502)
+        return json_response({
+            "total_commits": len(commits),
+            "commits": commits[(page - 1) * per_page:page * per_page],
+            "files": list(files)
+        })
+
+    github.repository(REPOSITORY)
+    github.route(COMPARE_URL, handler)
+
+
+def pages_requested(github):
+    return sorted(int(params["page"]) for url, params in github.requests if url == COMPARE_URL)
+
+
+def test_pages_are_joined_in_order(github):
+    commits = history(250)
+    serve_compare(github, commits, files=[file_entry("app/http.py", 3)], slow_pages=[2])
+
+    fetched, range_files = GitHubCommitSource(None).compare(REPOSITORY, "v1.0", "release/2.0")
+
+    # Page 3 answers before page 2 but the commits stay oldest first
+    assert [commit["sha"] for commit in fetched] == [commit["sha"] for commit in commits]
+    assert pages_requested(github) == [1, 2, 3]
+    assert all(params["per_page"] == 100 for url, params in github.requests if url == COMPARE_URL)
+
+    # Commits are message-only; file changes come once for the whole range
+    assert fetched[0]["message"] == "Change number 0"
+    assert fetched[0]["files"] == [] and fetched[0]["truncated_diff"] == ""
+    assert [f["filename"] for f in range_files] == ["app/http.py"]
+
+
+def test_single_page_range_costs_one_request(github):
+    serve_compare(github, history(100))
+
+    fetched, _ = GitHubCommitSource(None).compare(REPOSITORY, "v1.0", "release/2.0")
+
+    assert len(fetched) == 100
+    assert pages_requested(github) == [1]
+
+
+def test_unknown_ref(github):
+    github.repository(REPOSITORY)
+
+    with pytest.raises(ChangelogError) as error:
+        GitHubCommitSource(None).compare(REPOSITORY, "v1.0", "release/2.0")
+    assert error.value.error_type == "ref_not_found"
+
+
+def test_failed_page_fails_the_range(github):
+    serve_compare(github, history(250), failing_pages=[3])
+
+    with pytest.raises(ChangelogError) as error:
+        GitHubCommitSource(None).compare(REPOSITORY, "v1.0", "release/2.0")
+    assert error.value.error_type == "github_api_error"
+    assert error.value.details["status_code"] == 502
+
+
+def test_generation_uses_cached_commits_and_range_files(generator, github, claude):
+    commits = history(150)
+    serve_compare(github, commits, files=[file_entry("app/http.py", 3)])
+    # The first commit was fetched individually before, so its full data is in the commit cache
+    github.commit(REPOSITORY, commits[0]["sha"], message="Change number 0", files=[file_entry("app/cached.py")])
+    generator.fetch_commits(REPOSITORY, [commits[0]["sha"]])
+
+    changelog = generator.generate_from_compare(REPOSITORY, "v1.0", "release/2.0")
+
+    assert changelog["commit_count"] == 150
+    assert pages_requested(github) == [1, 2]
+    prompt = "".join(message["content"] for request in claude.requests for message in request["messages"])
+    assert "app/cached.py" in prompt
+    assert "Combined changes across the range" in prompt and "app/http.py" in prompt
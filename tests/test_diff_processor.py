@@ -0,0 +1,42 @@
+from app.services import diff_processor
+from app.services.diff_processor import MAX_CHANGES_PER_FILE, select_changes
+
+
+def plain_lines(count: int, prefix: str = "value") -> str:
+    return "".join(f"+    {prefix}_{n} = {n}\n" for n in range(count))
+
+
+def test_hunks_are_ranked_by_all_of_their_lines():
+    quota = MAX_CHANGES_PER_FILE
+    # The second hunk starts like the first but declares a public function past the quota
+    patch = (
+        "@@ -1,1 +1,40 @@\n" + plain_lines(quota + 5, "a")
+        + "@@ -80,1 +80,40 @@\n" + plain_lines(quota + 5, "b") + "+def handler(request):\n"
+    )
+    changes, total, _ = select_changes("app/handlers.py", patch)
+    assert total == 2 * (quota + 5) + 1
+    assert "+def handler(request):" in changes
+    assert not any(line.startswith("+    a_") for line in changes)
+
+
+def test_best_lines_of_a_hunk_are_kept_in_file_order():
+    quota = MAX_CHANGES_PER_FILE
+    patch = "@@ -1 +1 @@\n" + plain_lines(quota * 2) + "+class Router:\n" + "-import os\n"
+    changes, _, _ = select_changes("app/router.py", patch)
+    assert len(changes) == quota
+    assert changes[-1] == "+class Router:"
+    assert changes[:-1] == [f"+    value_{n} = {n}" for n in range(quota - 1)]
+
+
+def test_patch_hash_requires_the_whole_patch(monkeypatch):
+    patch = "@@ -1 +1 @@\n-x = 1\n+x = 2\n"
+    _, _, digest = select_changes("app/x.py", patch)
+    assert digest is not None
+    assert select_changes("app/x.py", patch.replace("x = 2", "x  =  2"))[2] == digest
+    monkeypatch.setattr(diff_processor, "MAX_SCAN_LINES", 2)
+    assert select_changes("app/x.py", patch)[2] is None
+
+
+def test_lockfiles_and_binaries_get_no_lines():
+    assert select_changes("package-lock.json", "@@ -1 +1 @@\n+x\n", 1, 0) == ([], 1, None)
+    assert select_changes("logo.png", None, 0, 0) == ([], 0, None)
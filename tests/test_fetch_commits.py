@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.exceptions import ChangelogError
+from app.services.commit_source import CommitSource, validate_sha
+
+REPO = "owner/repo"
+SHAS = [f"{n:x}" * 40 for n in range(1, 9)]
+
+
+class StubSource(CommitSource):
+    """Commit source whose later SHAs answer first, recording how many fetches overlap"""
+
+    name = "stub"
+
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.fetched = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def ensure_repository(self, repository):
+        pass
+
+    def fetch_commit(self, repository, sha):
+        with self._lock:
+            self.fetched.append(sha)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            validate_sha(sha)
+            time.sleep(0.01 * (len(SHAS) - SHAS.index(sha)) if sha in SHAS else 0)
+            if sha in self.missing:
+                raise ChangelogError(
+                    error_type="commit_not_found",
+                    message=f"Commit not found: {sha} in repository {repository}",
+                    missing_shas=[sha],
+                    repository=repository,
+                    details={"sha": sha, "status_code": 404}
+                )
+            return {"sha": sha, "message": f"Change {sha[:7]}", "files": []}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def source(generator, monkeypatch):
+    def use(**kwargs):
+        stub = StubSource(**kwargs)
+        generator.sources["stub"] = stub
+        monkeypatch.setattr(settings, "COMMIT_SOURCE", "stub")
+        return stub
+    return use
+
+
+def test_concurrent_fetch_keeps_input_order(generator, source):
+    stub = source()
+
+    commits = generator.fetch_commits(REPO, SHAS, max_workers=4)
+
+    assert [commit["sha"] for commit in commits] == SHAS
+    assert stub.peak > 1
+
+    # A second fetch is answered from the commit cache, still in the requested order
+    assert [commit["sha"] for commit in generator.fetch_commits(REPO, SHAS[::-1])] == SHAS[::-1]
+    assert len(stub.fetched) == len(SHAS)
+
+
+def test_progress_counts_every_commit(generator, source):
+    source()
+    generator.fetch_commits(REPO, SHAS[:2])
+
+    progress = list(generator.iter_fetch_commits(REPO, SHAS, max_workers=4))
+
+    # Cached commits are reported together before the rest arrive one by one
+    assert progress == [(2, 8), (3, 8), (4, 8), (5, 8), (6, 8), (7, 8), (8, 8)]
+
+
+def test_missing_shas_are_reported_together(generator, source):
+    source(missing=SHAS[2:4])
+
+    with pytest.raises(ChangelogError) as raised:
+        generator.fetch_commits(REPO, SHAS)
+
+    error = raised.value
+    assert error.error_type == "not_found"
+    assert sorted(error.missing_shas) == SHAS[2:4]
+    assert sorted(entry["sha"] for entry in error.details["errors"]) == SHAS[2:4]
+    assert all(entry["type"] == "commit_not_found" for entry in error.details["errors"])
+    assert all(entry["details"]["status_code"] == 404 for entry in error.details["errors"])
+
+
+def test_mixed_failures_list_each_sha(generator, source):
+    source(missing=[SHAS[0]])
+
+    with pytest.raises(ChangelogError) as raised:
+        generator.fetch_commits(REPO, [SHAS[0], "not-a-sha", SHAS[1]])
+
+    error = raised.value
+    assert error.error_type == "commit_fetch_error"
+    assert error.message == "Failed to fetch 2 of 3 commits"
+    assert error.invalid_shas == ["not-a-sha"]
+    assert error.missing_shas == [SHAS[0]]
+    assert {entry["sha"]: entry["type"] for entry in error.details["errors"]} == {
+        SHAS[0]: "commit_not_found",
+        "not-a-sha": "invalid_format"
+    }
+
+
+def test_successful_commits_are_cached_when_others_fail(generator, source):
+    stub = source(missing=[SHAS[0]])
+    with pytest.raises(ChangelogError):
+        generator.fetch_commits(REPO, SHAS[:3])
+
+    stub.missing.clear()
+    assert [commit["sha"] for commit in generator.fetch_commits(REPO, SHAS[:3])] == SHAS[:3]
+    assert stub.fetched.count(SHAS[1]) == 1
+    assert stub.fetched.count(SHAS[0]) == 2
@@ -0,0 +1,104 @@
+import json
+
+import anthropic
+
+from tests.stubs import API
+
+REPO = "owner/repo"
+SHAS = ["a" * 40, "b" * 40]
+
+
+def events(response):
+    """Parse a text/event-stream body into (event, data) pairs"""
+    parsed = []
+    for block in response.text.split("\n\n"):
+        if not block:
+            continue
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        parsed.append((fields["event"], json.loads(fields["data"])))
+    return parsed
+
+
+def stream(client, shas=SHAS):
+    response = client.post("/api/v1/generate/stream", json={"repository": REPO, "commit_shas": shas})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return events(response)
+
+
+def serve_commits(github):
+    github.repository(REPO)
+    for n, sha in enumerate(SHAS):
+        github.commit(REPO, sha, message=f"Add retry support to client {n}", date=f"2025-01-0{n + 1}T00:00:00Z")
+
+
+def test_progress_then_tokens_then_done(client, github):
+    serve_commits(github)
+
+    sent = stream(client)
+
+    names = [name for name, _ in sent]
+    assert sent[:3] == [("progress", {"stage": "fetch", "completed": n, "total": 2}) for n in range(3)]
+    assert names[-1] == "done"
+    assert set(names[3:-1]) == {"token"}
+
+    # The streamed tokens are Claude's whole reply
+    reply = json.loads("".join(data["text"] for name, data in sent if name == "token"))
+    done = sent[-1][1]
+    assert done["success"] is True
+    assert done["changelog"]["description"] == reply["description"]
+    assert done["changelog"]["commit_count"] == 2
+
+    stored = client.get(f"/api/v1/changelog/{done['changelog']['id']}")
+    assert stored.status_code == 200
+
+
+def test_missing_commit_ends_with_an_error_event(client, github):
+    serve_commits(github)
+    missing = "c" * 40
+    github.missing(REPO, missing)
+
+    sent = stream(client, SHAS + [missing])
+
+    name, error = sent[-1]
+    assert name == "error"
+    assert error["type"] == "not_found"
+    assert [entry["sha"] for entry in error["details"]["errors"]] == [missing]
+    assert "done" not in [name for name, _ in sent]
+    assert sent[0][0] == "progress"
+
+
+def test_invalid_sha_ends_with_an_error_event(client, github):
+    github.repository(REPO)
+
+    sent = stream(client, ["not-a-sha"])
+
+    name, error = sent[-1]
+    assert name == "error"
+    assert error["type"] == "invalid_format"
+    assert error["details"]["errors"][0]["sha"] == "not-a-sha"
+
+
+def test_missing_repository_ends_with_an_error_event(client, github):
+    sent = stream(client)
+
+    assert sent[-1] == ("error", {
+        "error": f"Repository not found: {REPO}",
+        "type": "repository_not_found",
+        "details": {"error": "Not Found", "status_code": 404}
+    })
+    assert github.calls(f"{API}/repos/{REPO}/commits/{SHAS[0]}") == 0
+
+
+def test_claude_failure_ends_with_an_error_event(client, github, claude):
+    serve_commits(github)
+    claude.error = anthropic.APIConnectionError(request=None)
+
+    sent = stream(client)
+
+    assert [name for name, _ in sent[:3]] == ["progress"] * 3
+    name, error = sent[-1]
+    assert name == "error"
+    assert error["type"] == "GenerationError"
+    assert error["error"].startswith("Failed to generate changelog")
+    assert "token" not in [name for name, _ in sent]
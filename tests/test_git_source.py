@@ -0,0 +1,137 @@
+import os
+import subprocess
+from datetime import datetime, timezone
+
+import pytest
+
+from app.exceptions import ChangelogError
+from app.services.git_source import LocalGitCommitSource
+
+REPOSITORY = "owner/repo"
+
+
+class Upstream:
+    """A throwaway working repository the mirror is cloned from"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.day = 0
+        os.makedirs(path)
+        self.git("init", "--quiet", "--initial-branch=main")
+
+    def git(self, *args: str) -> str:
+        date = f"2025-01-{self.day + 1:02d}T12:00:00+00:00"
+        env = dict(
+            os.environ,
+            GIT_AUTHOR_NAME="Ada", GIT_AUTHOR_EMAIL="ada@example.com", GIT_AUTHOR_DATE=date,
+            GIT_COMMITTER_NAME="Ada", GIT_COMMITTER_EMAIL="ada@example.com", GIT_COMMITTER_DATE=date,
+            GIT_CONFIG_GLOBAL=os.devnull, GIT_CONFIG_NOSYSTEM="1"
+        )
+        return subprocess.run(["git", *args], cwd=self.path, env=env, check=True, capture_output=True, text=True).stdout
+
+    def write(self, filename: str, text: str) -> None:
+        path = os.path.join(self.path, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def commit(self, message: str) -> str:
+        self.day += 1
+        self.git("add", "-A")
+        self.git("commit", "--quiet", "-m", message)
+        return self.git("rev-parse", "HEAD").strip()
+
+
+@pytest.fixture
+def history(tmp_path):
+    upstream = Upstream(str(tmp_path / "upstream" / REPOSITORY))
+    upstream.write("README.md", "# Demo\n")
+    upstream.write("app/main.py", "def main():\n" + "".join(f"    step_{n}()\n" for n in range(10)))
+    root = upstream.commit("Initial commit")
+
+    upstream.write("sp ace/notes file.txt", "first\n")
+    spaced = upstream.commit("Add notes")
+
+    os.rename(os.path.join(upstream.path, "app/main.py"), os.path.join(upstream.path, "app/server.py"))
+    with open(os.path.join(upstream.path, "app/server.py"), "a") as f:
+        f.write("\n\ndef serve():\n    return main()\n")
+    renamed = upstream.commit("Rename main to server")
+
+    upstream.write("sp ace/notes file.txt", "first\nsecond\n")
+    edited = upstream.commit("Extend notes\n\nWith a body.")
+
+    source = LocalGitCommitSource(
+        mirror_root=str(tmp_path / "mirrors"),
+        url_template=str(tmp_path / "upstream") + "/{repository}",
+        refresh_seconds=3600
+    )
+    return source, upstream, {"root": root, "spaced": spaced, "renamed": renamed, "edited": edited}
+
+
+def files_by_name(commit):
+    return {f["filename"]: f for f in commit["files"]}
+
+
+def test_root_commit_diffs_against_the_empty_tree(history):
+    source, _, shas = history
+    commit = source.fetch_commit(REPOSITORY, shas["root"])
+
+    assert commit["message"] == "Initial commit"
+    assert commit["author"] == "Ada"
+    assert commit["github_url"] == f"https://github.com/{REPOSITORY}/commit/{shas['root']}"
+    files = files_by_name(commit)
+    assert set(files) == {"README.md", "app/main.py"}
+    assert files["app/main.py"]["status"] == "added"
+    assert files["app/main.py"]["additions"] == 11
+    assert "+def main():" in files["app/main.py"]["changes"]
+
+
+def test_paths_with_spaces_keep_their_patch(history):
+    source, _, shas = history
+    for key, expected in (("spaced", "+first"), ("edited", "+second")):
+        file = files_by_name(source.fetch_commit(REPOSITORY, shas[key]))["sp ace/notes file.txt"]
+        assert expected in file["changes"]
+        assert file["patch_hash"] is not None
+
+
+def test_renames_report_the_new_path_and_its_patch(history):
+    source, _, shas = history
+    files = files_by_name(source.fetch_commit(REPOSITORY, shas["renamed"]))
+
+    assert set(files) == {"app/server.py"}
+    assert files["app/server.py"]["status"] == "renamed"
+    assert files["app/server.py"]["additions"] == 4
+    assert "+def serve():" in files["app/server.py"]["changes"]
+
+
+def test_list_commits_filters_by_commit_date(history):
+    source, _, shas = history
+    listed = source.list_commits(
+        REPOSITORY, datetime(2025, 1, 3, tzinfo=timezone.utc), datetime(2025, 1, 4, 23, 59, tzinfo=timezone.utc)
+    )
+    assert [sha for sha, _ in listed] == [shas["renamed"], shas["spaced"]]
+    assert listed[0][1] == datetime(2025, 1, 4, 12, 0, tzinfo=timezone.utc)
+
+
+def test_compare_returns_the_range_oldest_first(history):
+    source, _, shas = history
+    commits, range_files = source.compare(REPOSITORY, shas["root"], "main")
+    assert [c["sha"] for c in commits] == [shas["spaced"], shas["renamed"], shas["edited"]]
+    assert range_files == []
+
+    with pytest.raises(ChangelogError) as error:
+        source.compare(REPOSITORY, "no-such-ref", "main")
+    assert error.value.error_type == "ref_not_found"
+
+
+def test_new_commits_are_fetched_after_the_mirror_was_cloned(history):
+    source, upstream, _ = history
+    source.ensure_repository(REPOSITORY)
+    upstream.write("CHANGELOG.md", "## 1.0\n")
+    sha = upstream.commit("Add changelog")
+
+    assert source.fetch_commit(REPOSITORY, sha)["message"] == "Add changelog"
+
+    with pytest.raises(ChangelogError) as error:
+        source.fetch_commit(REPOSITORY, "f" * 40)
+    assert error.value.error_type == "commit_not_found"
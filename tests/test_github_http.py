@@ -0,0 +1,110 @@
+from typing import Dict, List, Optional
+
+import pytest
+import requests
+
+from app.services.github_http import IMMUTABLE_URL_PATTERN, GitHubHTTPCache, request_cache_key
+
+API = "https://api.github.com"
+SHA = "0123456789abcdef0123456789abcdef01234567"
+
+
+def response(status: int, body: str = "", headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    result = requests.Response()
+    result.status_code = status
+    result._content = body.encode("utf-8")
+    result.encoding = "utf-8"
+    result.headers.update(headers or {})
+    result.url = API
+    return result
+
+
+class StubSession:
+    """Answers GETs from a queue of responses and records the headers sent"""
+
+    def __init__(self, *responses: requests.Response):
+        self.responses = list(responses)
+        self.sent: List[Dict[str, str]] = []
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.sent.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def cache(db):
+    return GitHubHTTPCache(max_entries=100, memory_entries=0)
+
+
+def test_cache_key_varies_with_url_params_and_credentials():
+    url = f"{API}/repos/o/r/commits"
+    key = request_cache_key(url, {"since": "a", "until": "b"}, {"Authorization": "token x"})
+    assert key == request_cache_key(url, {"until": "b", "since": "a"}, {"Authorization": "token x", "User-Agent": "y"})
+    assert key != request_cache_key(url, {"since": "a", "until": "b"}, {"Authorization": "token z"})
+    assert key != request_cache_key(url, {"since": "a"}, {"Authorization": "token x"})
+    assert key != request_cache_key(url, {"since": "a", "until": "b"}, {"Authorization": "token x", "Accept": "diff"})
+
+
+@pytest.mark.parametrize("url, immutable", [
+    (f"{API}/repos/o/r/commits/{SHA}", True),
+    (f"{API}/repos/o/r/commits/{SHA}?page=2", True),
+    (f"{API}/repositories/123456/commits/{SHA}?page=3", True),
+    (f"{API}/repos/o/r/commits", False),
+    (f"{API}/repos/o/r/commits/main", False),
+    (f"{API}/repos/o/r/commits/{SHA[:12]}", False),
+    (f"{API}/repos/o/r/compare/{SHA}...main", False),
+])
+def test_immutable_urls(url, immutable):
+    assert bool(IMMUTABLE_URL_PATTERN.search(url)) is immutable
+
+
+def test_not_modified_is_replayed_from_the_stored_body(cache):
+    url = f"{API}/repos/o/r/commits"
+    link = f'<{API}/repositories/1/commits?page=2>; rel="next"'
+    cache.session = StubSession(
+        response(200, '[{"sha": "a"}]', {"ETag": '"v1"', "Link": link, "X-RateLimit-Remaining": "4999"}),
+        response(304, headers={"ETag": '"v1"', "X-RateLimit-Remaining": "4998"})
+    )
+
+    first = cache.get(url, headers={"Authorization": "token x"}, params={"per_page": 100})
+    second = cache.get(url, headers={"Authorization": "token x"}, params={"per_page": 100})
+
+    assert "If-None-Match" not in cache.session.sent[0]
+    assert cache.session.sent[1]["If-None-Match"] == '"v1"'
+    assert second.status_code == 200
+    assert second.json() == first.json() == [{"sha": "a"}]
+    assert second.headers["Link"] == link
+    assert second.headers["X-RateLimit-Remaining"] == "4998"
+    assert cache.stats()["not_modified"] == 1 and cache.stats()["stored"] == 1
+
+
+def test_changed_response_replaces_the_stored_one(cache):
+    url = f"{API}/repos/o/r/commits"
+    cache.session = StubSession(
+        response(200, "[1]", {"ETag": '"v1"'}),
+        response(200, "[2]", {"ETag": '"v2"'}),
+        response(304, headers={"ETag": '"v2"'})
+    )
+    cache.get(url)
+    cache.get(url)
+    assert cache.get(url).json() == [2]
+    assert cache.session.sent[2]["If-None-Match"] == '"v2"'
+
+
+def test_immutable_commit_pages_skip_the_cache(cache, monkeypatch):
+    def lookup(key):
+        raise AssertionError("immutable URLs must not be looked up")
+
+    monkeypatch.setattr(cache, "_lookup", lookup)
+    cache.session = StubSession(
+        response(200, "{}", {"ETag": '"c1"'}),
+        response(200, "{}", {"ETag": '"c2"'})
+    )
+    cache.get(f"{API}/repos/o/r/commits/{SHA}")
+    cache.get(f"{API}/repositories/42/commits/{SHA}?page=2")
+
+    assert cache.stats()["stored"] == 0
+    assert all("If-None-Match" not in sent for sent in cache.session.sent)
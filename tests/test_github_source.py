@@ -0,0 +1,166 @@
+import pytest
+
+from app.exceptions import ChangelogError
+from app.services import github_source
+from app.services.commit_data import FileSummary
+from app.services.github_source import GitHubCommitSource
+from tests.stubs import API, commit_payload, file_entry, json_response
+
+REPOSITORY = "owner/repo"
+SHA = "a" * 40
+
+
+def paged_commit(github, pages):
+    """Serve SHA's file list over several pages linked as GitHub does (/repositories/<id>/...)"""
+    page_base = f"{API}/repositories/1/commits/{SHA}"
+
+    def link(number):
+        return f"{page_base}?page={number}" if number <= len(pages) else None
+
+    payload = commit_payload(REPOSITORY, SHA, files=pages[0])
+    github.repository(REPOSITORY)
+    github.route(f"{API}/repos/{REPOSITORY}/commits/{SHA}", lambda params: json_response(payload, next_url=link(2)))
+    github.route(page_base, lambda params: json_response(
+        {"sha": SHA, "files": pages[int(params["page"]) - 1]}, next_url=link(int(params["page"]) + 1)
+    ))
+    return page_base
+
+
+def files(prefix, count, additions=1):
+    return [file_entry(f"{prefix}/file_{n}.py", additions) for n in range(count)]
+
+
+def test_file_pages_are_followed_until_the_last(github):
+    paged_commit(github, [files("a", 3), files("b", 2), files("c", 1)])
+
+    commit = GitHubCommitSource(None).fetch_commit(REPOSITORY, SHA)
+
+    assert [f["filename"] for f in commit["files"]][-1] == "c/file_0.py"
+    assert len(commit["files"]) == 6
+    assert commit["files_summary"] == ""
+
+
+def test_paging_stops_at_the_page_cap(github, monkeypatch):
+    monkeypatch.setattr(github_source, "COMMIT_MAX_FILE_PAGES", 2)
+    page_base = paged_commit(github, [files("a", 3), files("b", 2), files("c", 4)])
+
+    commit = GitHubCommitSource(None).fetch_commit(REPOSITORY, SHA)
+
+    assert len(commit["files"]) == 5
+    assert github.calls(page_base) == 1
+    assert commit["files_summary"] == "At least 5 files across 2 directories (+5/-0 lines); details for the first 5"
+
+
+def test_failed_page_leaves_the_summary_incomplete(github):
+    page_base = paged_commit(github, [files("a", 2), files("b", 2)])
+    github.route(page_base, lambda params: json_response({"message": "Server Error"}, 502))
+
+    commit = GitHubCommitSource(None).fetch_commit(REPOSITORY, SHA)
+
+    assert len(commit["files"]) == 2
+    assert commit["files_summary"].startswith("At least 2 files")
+
+
+def test_files_past_the_cap_are_only_counted(github):
+    cap = FileSummary().max_files
+    paged_commit(github, [files("src", cap), files("docs", 40, additions=2)])
+
+    commit = GitHubCommitSource(None).fetch_commit(REPOSITORY, SHA)
+
+    assert len(commit["files"]) == cap
+    assert commit["files_summary"] == (
+        f"{cap + 40} files across 2 directories (+{cap + 80}/-0 lines); details for the first {cap}"
+    )
+    assert f"details for the first {cap}" in commit["changes_summary"]
+
+
+def test_aggregate_is_empty_when_every_file_is_summarized():
+    summary = FileSummary(max_files=3)
+    summary.add_page(files("a", 3))
+    assert summary.aggregate() == ""
+
+    summary.add_page([file_entry("b/c/d.py", 7)])
+    assert summary.aggregate() == "4 files across 2 directories (+10/-0 lines); details for the first 3"
+    assert len(summary.result()[0]) == 3
+
+
+def test_missing_commit(github):
+    github.repository(REPOSITORY)
+    github.missing(REPOSITORY, SHA)
+    with pytest.raises(ChangelogError) as error:
+        GitHubCommitSource(None).fetch_commit(REPOSITORY, SHA)
+    assert error.value.error_type == "commit_not_found"
+    assert error.value.missing_shas == [SHA]
+
+
+class Clock:
+    """Stands in for the time module used by the TTL caches"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    from app.services import cache
+
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", clock)
+    return clock
+
+
+@pytest.mark.parametrize("status", [404, 422])
+def test_missing_commit_is_remembered_until_its_ttl_expires(github, clock, status):
+    commit_url = f"{API}/repos/{REPOSITORY}/commits/{SHA}"
+    github.repository(REPOSITORY)
+    github.missing(REPOSITORY, SHA, status=status)
+    source = GitHubCommitSource(None)
+
+    for _ in range(2):
+        with pytest.raises(ChangelogError) as error:
+            source.fetch_commit(REPOSITORY, SHA)
+        assert error.value.error_type == "commit_not_found"
+        assert error.value.details["status_code"] == status
+    assert github.calls(commit_url) == 1
+
+    # The SHA is pushed after the first lookup: it is found once the entry expires
+    github.commit(REPOSITORY, SHA)
+    clock.now += github_source.settings.COMMIT_NEGATIVE_CACHE_TTL_SECONDS - 1
+    with pytest.raises(ChangelogError):
+        source.fetch_commit(REPOSITORY, SHA)
+    clock.now += 2
+    assert source.fetch_commit(REPOSITORY, SHA)["sha"] == SHA
+    assert github.calls(commit_url) == 2
+
+
+def test_server_errors_are_not_remembered(github, clock):
+    commit_url = f"{API}/repos/{REPOSITORY}/commits/{SHA}"
+    github.repository(REPOSITORY)
+    github.missing(REPOSITORY, SHA, status=502)
+    source = GitHubCommitSource(None)
+
+    for _ in range(2):
+        with pytest.raises(ChangelogError) as error:
+            source.fetch_commit(REPOSITORY, SHA)
+        assert error.value.error_type == "github_api_error"
+    assert github.calls(commit_url) == 2
+
+
+def test_missing_repository_is_remembered_for_the_negative_ttl(github, clock):
+    repo_url = f"{API}/repos/{REPOSITORY}"
+    source = GitHubCommitSource(None)
+
+    for _ in range(2):
+        with pytest.raises(ChangelogError) as error:
+            source.ensure_repository(REPOSITORY)
+        assert error.value.error_type == "repository_not_found"
+    assert github.calls(repo_url) == 1
+
+    github.repository(REPOSITORY)
+    clock.now += github_source.settings.REPOSITORY_NEGATIVE_CACHE_TTL_SECONDS + 1
+    source.ensure_repository(REPOSITORY)
+    source.ensure_repository(REPOSITORY)
+    assert github.calls(repo_url) == 2
@@ -0,0 +1,159 @@
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app.db.session import SessionLocal
+from app.models.changelog import ChangelogEntry, ChangelogJob
+from app.services.job_queue import JobQueue, _owner_alive, process_owner
+
+
+def make_queue(**overrides) -> JobQueue:
+    options = dict(concurrency=1, poll_interval=5.0, lease_seconds=60, max_attempts=3, retry_delay_seconds=30)
+    options.update(overrides)
+    return JobQueue(**options)
+
+
+def job_state(entry_id: int):
+    db = SessionLocal()
+    try:
+        entry = db.get(ChangelogEntry, entry_id)
+        job = db.get(ChangelogJob, entry_id)
+        return entry.status, job
+    finally:
+        db.close()
+
+
+def set_job(entry_id: int, **values) -> None:
+    db = SessionLocal()
+    try:
+        db.query(ChangelogJob).filter(ChangelogJob.entry_id == entry_id).update(
+            {getattr(ChangelogJob, name): value for name, value in values.items()}
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_claim_leases_job_to_this_process(db):
+    queue = make_queue()
+    entry = queue.submit("owner/repo", ["a" * 40])
+
+    entry_id, lease_token = queue._claim()
+
+    status, job = job_state(entry_id)
+    assert entry_id == entry.id
+    assert status == "running"
+    assert job.lease_token == lease_token
+    assert job.owner == process_owner()
+    assert job.attempts == 1
+    assert queue._claim() is None
+
+
+def test_heartbeat_keeps_running_job_from_being_requeued(db):
+    queue = make_queue(lease_seconds=60)
+    queue.submit("owner/repo", ["a" * 40])
+    entry_id, lease_token = queue._claim()
+    set_job(entry_id, leased_until=datetime.utcnow() - timedelta(seconds=1))
+
+    queue._leases[entry_id] = lease_token
+    assert queue.renew_leases() == 1
+    assert queue.requeue_expired() == 0
+
+    status, job = job_state(entry_id)
+    assert status == "running"
+    assert job.leased_until > datetime.utcnow() + timedelta(seconds=30)
+
+
+def test_expired_lease_is_requeued_and_stale_worker_result_discarded(db):
+    queue = make_queue()
+    queue.submit("owner/repo", ["a" * 40])
+    entry_id, lease_token = queue._claim()
+    set_job(entry_id, leased_until=datetime.utcnow() - timedelta(seconds=1))
+
+    assert queue.requeue_expired() == 1
+    status, job = job_state(entry_id)
+    assert status == "queued"
+    assert job.lease_token is None
+
+    # The original worker finishing late must not overwrite the requeued job
+    session = SessionLocal()
+    try:
+        queue._finish(session, session.get(ChangelogJob, entry_id), lease_token, changelog_data={"commits": []})
+    finally:
+        session.close()
+    assert job_state(entry_id)[0] == "queued"
+
+
+def test_expired_lease_fails_job_out_of_attempts(db):
+    queue = make_queue(max_attempts=1)
+    queue.submit("owner/repo", ["a" * 40])
+    entry_id, _ = queue._claim()
+    set_job(entry_id, leased_until=datetime.utcnow() - timedelta(seconds=1))
+
+    queue.requeue_expired()
+
+    status, job = job_state(entry_id)
+    assert status == "failed"
+    assert "lease_expired" in job.error
+
+
+def test_orphaned_jobs_requeued_at_startup(db):
+    queue = make_queue()
+    queue.submit("owner/repo", ["a" * 40])
+    queue.submit("owner/repo", ["b" * 40])
+    orphaned, _ = queue._claim()
+    alive, _ = queue._claim()
+    host = process_owner().rpartition(":")[0]
+    set_job(orphaned, owner=f"{host}:{dead_pid()}")
+    set_job(alive, owner=f"{host}:{1}")
+
+    assert queue.requeue_orphaned() == 1
+    assert job_state(orphaned)[0] == "queued"
+    assert job_state(alive)[0] == "running"
+
+
+def test_owner_alive():
+    host = process_owner().rpartition(":")[0]
+    assert _owner_alive("other-host:1")
+    assert not _owner_alive(f"{host}:{dead_pid()}")
+    # Checked before this process runs anything, so its own pid means a previous process
+    assert not _owner_alive(process_owner())
+
+
+def test_each_enqueue_wakes_a_separate_worker():
+    queue = make_queue(poll_interval=5.0)
+    woken = []
+
+    def worker():
+        queue._wait_for_work()
+        woken.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    started = time.monotonic()
+    queue._notify()
+    queue._notify()
+    for thread in threads:
+        thread.join(timeout=2)
+
+    assert len(woken) == 2
+    assert max(woken) - started < 1.0
+    assert queue._signals == 0
+
+
+def test_signal_sent_before_waiting_is_not_lost():
+    queue = make_queue(poll_interval=5.0)
+    queue._notify()
+    started = time.monotonic()
+    queue._wait_for_work()
+    assert time.monotonic() - started < 1.0
@@ -0,0 +1,46 @@
+from sqlalchemy import text
+
+from app.db import migrations
+from app.db.migrations import run_migrations
+from app.services.changelog_search import SEARCH_TABLE, changelog_search
+
+
+def insert_entry(engine, entry_id: int) -> None:
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO changelog_entries (id, repository, description, change_type, impact, commit_count) "
+            "VALUES (:id, 'owner/repo', 'Faster search', 'feature', 'Search is faster', 0)"
+        ), {"id": entry_id})
+
+
+def indexed(engine) -> int:
+    with engine.connect() as connection:
+        return connection.execute(text(f"SELECT count(*) FROM {SEARCH_TABLE}")).scalar()
+
+
+def test_backfills_run_once(db, monkeypatch):
+    run_migrations(db)
+    calls = []
+    monkeypatch.setattr(migrations, "_backfill_changelog_commits", lambda connection: calls.append("commits"))
+    monkeypatch.setattr(migrations, "_backfill_changelog_headlines", lambda connection: calls.append("headlines"))
+    monkeypatch.setattr(changelog_search, "backfill", lambda connection: calls.append("search"))
+
+    run_migrations(db)
+
+    assert calls == []
+
+
+def test_search_index_is_rebuilt_when_its_table_is_recreated(db):
+    with db.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+    run_migrations(db)
+    insert_entry(db, 1)
+    assert indexed(db) == 0
+
+    with db.begin() as connection:
+        connection.execute(text(f"DROP TABLE {SEARCH_TABLE}"))
+    run_migrations(db)
+
+    assert indexed(db) == 1
+    with db.begin() as connection:
+        connection.execute(text(f"DROP TABLE {SEARCH_TABLE}"))
@@ -0,0 +1,70 @@
+from app.services.prompt_builder import PromptBuilder, estimate_tokens, fair_share
+
+
+def test_fair_share_meets_small_demands_and_splits_the_rest():
+    assert fair_share([10, 100, 100], 110) == [10, 50, 50]
+    assert fair_share([10, 20], 100) == [10, 20]
+    assert fair_share([30, 30, 30], 10) == [3, 3, 4]
+    assert fair_share([5, 5], -3) == [0, 0]
+    assert fair_share([], 100) == []
+
+
+def test_fair_share_never_exceeds_the_budget():
+    demands = [7, 300, 41, 0, 120, 9]
+    for budget in (0, 1, 50, 200, 1000):
+        allocations = fair_share(demands, budget)
+        assert sum(allocations) <= budget
+        assert all(0 <= allocation <= demand for allocation, demand in zip(allocations, demands))
+
+
+def commit(n: int, message: str = "Add retry support to the HTTP client\n\nLonger body text explaining why."):
+    return {
+        "sha": f"{n:040x}",
+        "url": f"https://github.com/owner/repo/commit/{n:040x}",
+        "author": "octocat",
+        "date": "2025-01-01T00:00:00Z",
+        "message": message,
+        "files": [
+            {
+                "filename": "app/http.py",
+                "status": "modified",
+                "additions": 2,
+                "deletions": 1,
+                "changes": ["+def retry(request):", "+    return send(request)", "-    return None"],
+                "total_changes": 3
+            },
+            {"filename": "package-lock.json", "status": "modified", "additions": 400, "deletions": 380, "changes": []}
+        ]
+    }
+
+
+def test_generous_budget_includes_summaries_and_diffs():
+    prompt = PromptBuilder(budget=10_000).build("owner/repo", [commit(1), commit(2)])
+    assert prompt.count("Changes Summary:") == 2
+    assert prompt.count("+def retry(request):") == 2
+    assert "Lockfiles/generated: 1 files (+400/-380 lines)" in prompt
+    assert "Longer body text" in prompt
+
+
+def test_prompt_degrades_from_diffs_to_summaries_to_messages():
+    commits = [commit(n) for n in range(4)]
+
+    def build(budget: int) -> str:
+        prompt = PromptBuilder(budget=budget).build("owner/repo", commits)
+        assert estimate_tokens(prompt) <= budget
+        assert all(f"{n:040x}" in prompt for n in range(4))
+        return prompt
+
+    assert "Diff excerpts:" in build(600)
+    summaries = build(500)
+    assert "Changes Summary:" in summaries and "Diff excerpts:" not in summaries
+    messages = build(400)
+    assert "Changes Summary:" not in messages and "Longer body text" in messages
+    # Not even full messages fit: subjects only
+    subjects = build(300)
+    assert "Longer body text" not in subjects and "Add retry support" in subjects
+
+
+def test_routine_lines_are_listed_once():
+    prompt = PromptBuilder(budget=10_000).build("owner/repo", [commit(1)], routine_lines=["3 dependency updates"])
+    assert prompt.count("- 3 dependency updates\n") == 1
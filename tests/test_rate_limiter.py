@@ -0,0 +1,163 @@
+import calendar
+import time
+from datetime import datetime, timedelta
+
+import pytest
+import requests
+
+from app.db.session import SessionLocal
+from app.exceptions import ChangelogError
+from app.models.changelog import GitHubRateLimit
+from app.services import rate_limiter as rate_limiter_module
+from app.services.rate_limiter import GitHubRateLimiter, _Budget, credentials_key
+
+TOKEN = "token test"
+
+
+def limiter(**overrides) -> GitHubRateLimiter:
+    options = dict(reserve=10, pace_below=0, max_wait_seconds=1, sync_every=1000, sync_interval_seconds=3600)
+    options.update(overrides)
+    return GitHubRateLimiter(**options)
+
+
+def window(minutes: int = 30) -> datetime:
+    return (datetime.utcnow() + timedelta(minutes=minutes)).replace(microsecond=0)
+
+
+def response(status: int = 200, remaining=None, reset_at=None, **headers) -> requests.Response:
+    result = requests.Response()
+    result.status_code = status
+    if remaining is not None:
+        result.headers["X-RateLimit-Limit"] = "5000"
+        result.headers["X-RateLimit-Remaining"] = str(remaining)
+    if reset_at is not None:
+        result.headers["X-RateLimit-Reset"] = str(calendar.timegm(reset_at.timetuple()))
+    result.headers.update({name.replace("_", "-"): value for name, value in headers.items()})
+    return result
+
+
+def shared_row() -> GitHubRateLimit:
+    db = SessionLocal()
+    try:
+        return db.get(GitHubRateLimit, credentials_key(TOKEN))
+    finally:
+        db.close()
+
+
+def sync(shared: GitHubRateLimiter) -> None:
+    key = credentials_key(TOKEN)
+    budget = shared._budget(key)
+    with budget.lock:
+        snapshot = budget.snapshot()
+    shared._sync(key, budget, snapshot)
+
+
+def test_merge_keeps_the_newest_window_and_the_lowest_count():
+    budget = _Budget()
+    current, newer = window(), window(60)
+    budget.merge(GitHubRateLimit(limit=5000, remaining=300, reset_at=current))
+    assert (budget.remaining, budget.reset_at) == (300, current)
+
+    budget.merge(GitHubRateLimit(remaining=400, reset_at=current))
+    assert budget.remaining == 300
+    budget.merge(GitHubRateLimit(remaining=250, reset_at=current))
+    assert budget.remaining == 250
+    budget.merge(GitHubRateLimit(remaining=10, reset_at=current - timedelta(hours=1)))
+    assert (budget.remaining, budget.reset_at) == (250, current)
+    budget.merge(GitHubRateLimit(remaining=4999, reset_at=newer))
+    assert (budget.remaining, budget.reset_at) == (4999, newer)
+
+    blocked = datetime.utcnow() + timedelta(seconds=30)
+    budget.merge(GitHubRateLimit(blocked_until=blocked))
+    budget.merge(GitHubRateLimit(blocked_until=blocked - timedelta(seconds=10)))
+    assert budget.blocked_until == blocked
+
+
+def test_shared_row_only_lowers_remaining_within_a_window(db):
+    first, second = limiter(), limiter()
+    current = window()
+    first.record(TOKEN, response(remaining=100, reset_at=current))
+    second.record(TOKEN, response(remaining=150, reset_at=current))
+
+    # Each process syncs before its first claim
+    first.acquire(TOKEN)
+    second.acquire(TOKEN)
+
+    assert shared_row().remaining == 100
+    # The second process adopted the lower count from the row before claiming
+    assert second._budget(credentials_key(TOKEN)).remaining == 99
+
+    sync(second)
+    assert shared_row().remaining == 99
+    sync(first)
+    assert shared_row().remaining == 99
+
+    newer = window(90)
+    second.record(TOKEN, response(remaining=4999, reset_at=newer))
+    sync(second)
+    assert (shared_row().remaining, shared_row().reset_at) == (4999, newer)
+
+
+def test_claims_are_written_back_every_sync_every_requests(db):
+    shared = limiter(sync_every=5)
+    shared.record(TOKEN, response(remaining=1000, reset_at=window()))
+    for _ in range(12):
+        shared.acquire(TOKEN)
+    # One initial sync plus one per five claims
+    assert shared.syncs == 3
+    assert shared_row().remaining == 990
+
+
+def test_exhausted_budget_waits_then_fails_at_the_deadline(db):
+    shared = limiter(max_wait_seconds=0.3)
+    shared.record(TOKEN, response(remaining=11, reset_at=window()))
+    shared.acquire(TOKEN)
+
+    started = time.monotonic()
+    with pytest.raises(ChangelogError) as error:
+        shared.acquire(TOKEN)
+    assert 0.25 <= time.monotonic() - started < 2
+    assert error.value.error_type == "github_rate_limit"
+    assert error.value.details["retry_after_seconds"] > 60
+    assert shared.waits == 1
+
+
+def test_retry_after_blocks_every_process(db):
+    first, second = limiter(max_wait_seconds=0.1), limiter(max_wait_seconds=0.1)
+    first.record(TOKEN, response(429, Retry_After="30"))
+
+    assert shared_row().blocked_until > datetime.utcnow() + timedelta(seconds=25)
+    with pytest.raises(ChangelogError):
+        second.acquire(TOKEN)
+
+
+def test_not_modified_refunds_the_claimed_request(db):
+    shared = limiter()
+    current = window()
+    shared.record(TOKEN, response(remaining=500, reset_at=current))
+    shared.acquire(TOKEN)
+    budget = shared._budget(credentials_key(TOKEN))
+    assert budget.remaining == 499
+
+    shared.record(TOKEN, response(304, remaining=500, reset_at=current))
+    assert budget.remaining == 500
+    shared.record(TOKEN, response(200, remaining=498, reset_at=current))
+    assert budget.remaining == 498
+
+
+def test_shared_row_is_written_outside_the_budget_lock(db, monkeypatch):
+    shared = limiter(sync_every=1)
+    shared.record(TOKEN, response(remaining=1000, reset_at=window()))
+    budget = shared._budget(credentials_key(TOKEN))
+    sessions = []
+
+    def session():
+        assert not budget.lock.locked()
+        sessions.append(1)
+        return SessionLocal()
+
+    monkeypatch.setattr(rate_limiter_module, "SessionLocal", session)
+    for _ in range(3):
+        shared.acquire(TOKEN)
+    shared.record(TOKEN, response(403, remaining=0, reset_at=window()))
+    assert len(sessions) >= 4
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.services import changelog_generator
+from app.services.changelog_generator import _drain
+from app.services.prompt_builder import PromptBuilder
+
+REPO = "owner/repo"
+
+
+def commit(n: int):
+    return {
+        "sha": f"{n:040x}",
+        "url": f"https://github.com/{REPO}/commit/{n:040x}",
+        "author": "octocat",
+        "date": f"2025-01-{n:02d}T00:00:00Z",
+        "message": f"Add export format {n} to the report module",
+        "files": [
+            {
+                "filename": f"app/reports/format_{n}.py",
+                "status": "added",
+                "additions": 2,
+                "deletions": 0,
+                "changes": [f"+def export_{n}(report):", "+    return render(report)"],
+                "total_changes": 2
+            }
+        ]
+    }
+
+
+COMMITS = [commit(n) for n in range(1, 8)]
+
+
+@pytest.fixture
+def two_per_shard(monkeypatch):
+    tokens = PromptBuilder(changelog_generator.PROMPT_INPUT_TOKEN_BUDGET).compact_tokens(COMMITS[0])
+    monkeypatch.setattr(settings, "CLAUDE_SHARDING_ENABLED", True)
+    monkeypatch.setattr(changelog_generator, "CLAUDE_SHARD_MAX_INPUT_TOKENS", 2 * tokens + 1)
+
+
+def test_commits_are_split_into_bounded_shards_in_order(generator, two_per_shard):
+    shards = generator._shard_commits(COMMITS)
+
+    assert [len(shard) for shard in shards] == [2, 2, 2, 1]
+    assert [c["sha"] for shard in shards for c in shard] == [c["sha"] for c in COMMITS]
+
+
+def test_oversized_commit_gets_a_shard_of_its_own(generator, monkeypatch):
+    monkeypatch.setattr(changelog_generator, "CLAUDE_SHARD_MAX_INPUT_TOKENS", 1)
+    assert [len(shard) for shard in generator._shard_commits(COMMITS[:3])] == [1, 1, 1]
+
+
+def test_sharding_can_be_disabled(generator, two_per_shard, monkeypatch):
+    monkeypatch.setattr(settings, "CLAUDE_SHARDING_ENABLED", False)
+    assert generator._shard_commits(COMMITS) == [COMMITS]
+
+
+def test_shards_are_summarized_then_merged(generator, two_per_shard, claude):
+    changelog = _drain(generator._iter_generate(REPO, COMMITS))
+
+    # Four shard calls, then one reduce call over their partial summaries
+    assert len(claude.requests) == 5
+    shard_requests, reduce_request = claude.requests[:4], claude.requests[4]
+    assert all(request["system"] == generator.shard_system_prompt for request in shard_requests)
+    assert reduce_request["system"] == generator.reduce_system_prompt
+
+    shard_prompts = sorted(request["messages"][0]["content"] for request in shard_requests)
+    for c in COMMITS:
+        assert sum(c["sha"] in prompt for prompt in shard_prompts) == 1
+
+    reduce_prompt = reduce_request["messages"][0]["content"]
+    summaries = json.loads(reduce_prompt[reduce_prompt.index("["):reduce_prompt.rindex("]") + 1])
+    assert [summary["commit_count"] for summary in summaries] == [2, 2, 2, 1]
+
+    # The commit list is assembled locally rather than echoed back by the reduce call
+    assert [c["sha"] for c in changelog["commits"]] == [c["sha"] for c in COMMITS]
+    assert changelog["type"] == "Feature"
+
+
+def test_shard_progress_is_reported_before_the_merged_output(generator, two_per_shard):
+    events = []
+    stream = generator._iter_generate(REPO, COMMITS, stream=True)
+    changelog = None
+    while changelog is None:
+        try:
+            events.append(next(stream))
+        except StopIteration as stop:
+            changelog = stop.value
+
+    # Every shard reports in before the reduce call streams its output
+    assert [event["data"] for event in events[:4]] == [
+        {"stage": "shards", "completed": n, "total": 4} for n in range(1, 5)
+    ]
+    assert events[4:] and all(event["event"] == "token" for event in events[4:])
+    assert json.loads("".join(event["data"]["text"] for event in events[4:]))["type"] == "Feature"
+    assert len(changelog["commits"]) == len(COMMITS)
+
+
+def test_single_shard_uses_one_call(generator, claude):
+    changelog = _drain(generator._iter_generate(REPO, COMMITS[:3]))
+
+    assert len(claude.requests) == 1
+    assert claude.requests[0]["system"] == generator.system_prompt
+    assert changelog["commit_count"] == 3